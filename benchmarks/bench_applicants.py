@@ -0,0 +1,53 @@
+"""Multi-applicant turns: parallel tool calls in one model response vs. one call per round trip.
+
+Asks "Evaluate these N applicants" against the fake chat-model server twice:
+"parallel" answers with N evaluate calls at once (what the bound
+`parallel_tool_calls` and the prompt ask of the model), "sequential" with one
+call per reply, the loop a model falls back to when it evaluates applicants
+one at a time. Reports wall time, LLM round trips and decisions returned.
+
+    python -m benchmarks.bench_applicants [APPLICANTS] [TURNS] [LATENCY_S]
+"""
+from __future__ import annotations
+import os
+import statistics
+import sys
+import time
+
+from benchmarks import fake_openai_server
+
+
+def _use_server(server) -> None:
+    import uw_chains
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    for fn in (uw_chains.get_chat_model, uw_chains.get_uw_llm, uw_chains.get_uw_chain, uw_chains.get_agent_chain):
+        fn.cache_clear()
+
+
+def main(applicants: int = 4, turns: int = 5, latency: float = 0.2) -> None:
+    os.environ.update({"OPENAI_API_KEY": "fake", "GPT_MODEL": "fake-model", "UW_DECISION_DB": "",
+                       "UW_LLM_CACHE_DB": "", "UW_CHECKPOINT_DB": ""})
+    from uw_graph_flow import run_graph
+
+    print(f"applicants={applicants} turns={turns} fake model latency={latency * 1000:.0f}ms")
+    for mode, parallel in (("parallel", True), ("sequential", False)):
+        server = fake_openai_server.start(latency=latency, parallel_tools=parallel)
+        try:
+            _use_server(server)
+            run_graph("warm-up")
+            walls, calls, decisions = [], [], []
+            for _ in range(turns):
+                t0 = time.perf_counter()
+                result = run_graph(f"Evaluate these {applicants} applicants")
+                walls.append(time.perf_counter() - t0)
+                calls.append(result["uw_metrics"]["llmCalls"])
+                decisions.append(len(result["uw_decisions"]))
+            print(f"{mode:<11} turn p50={statistics.median(walls) * 1000:7.1f}ms  "
+                  f"llm calls/turn={statistics.median(calls):.0f}  decisions/turn={statistics.median(decisions):.0f}")
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 4, int(args[1]) if len(args) > 1 else 5, float(args[2]) if len(args) > 2 else 0.2)
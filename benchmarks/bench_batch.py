@@ -0,0 +1,53 @@
+"""Parity check and throughput benchmark for `uw_batch.evaluate_batch`.
+
+Run from the repo root:  python -m benchmarks.bench_batch [N]
+(`perf_rules.test_batch_parity` checks the golden cases under pytest.)
+"""
+from __future__ import annotations
+import sys
+import time
+
+import uw_rules_engine as engine
+from uw_batch import evaluate_batch
+from uw_decision_store import MemoryDecisionStore
+from benchmarks.synthetic import make_requests
+
+
+def _strip(response: dict) -> dict:
+    response = dict(response)
+    response.pop("decisionId")
+    response["audit"] = {k: v for k, v in response["audit"].items() if k != "evaluatedAt"}
+    return response
+
+
+def check_parity(requests) -> None:
+    scalar = [_strip(engine.evaluate_request(r)) for r in requests]
+    batch = [_strip(r) for r in evaluate_batch(requests, store=False)]
+    mismatches = [i for i, (a, b) in enumerate(zip(scalar, batch)) if a != b]
+    if mismatches:
+        i = mismatches[0]
+        raise AssertionError(f"{len(mismatches)} rows differ; first row {i}:\n{scalar[i]}\n{batch[i]}")
+
+
+def main(n: int = 20000) -> None:
+    engine.set_decision_store(MemoryDecisionStore())
+    engine.configure_evaluation_cache(0)
+    requests = make_requests(n)
+    check_parity(requests[:2000])
+
+    t0 = time.perf_counter()
+    for r in requests:
+        engine.evaluate_request(r)
+    scalar_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    evaluate_batch(requests, store=False)
+    batch_s = time.perf_counter() - t0
+
+    print(f"rows={n}")
+    print(f"scalar: {scalar_s:.3f}s  ({n / scalar_s:,.0f} rows/s)")
+    print(f"batch:  {batch_s:.3f}s  ({n / batch_s:,.0f} rows/s)  speedup x{scalar_s / batch_s:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
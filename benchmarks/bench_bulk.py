@@ -0,0 +1,55 @@
+"""Core-scaling benchmark for `uw_bulk.run_bulk` (the `uw-agent batch` command).
+
+Writes N synthetic requests to a temporary JSONL file, runs the bulk job with
+1, 2, 4, ... up to MAX_WORKERS processes (default: every core), checks every
+run's output matches the single-worker run row for row, and prints throughput
+and speedup. Run from the repo root:
+
+    python -m benchmarks.bench_bulk [N] [MAX_WORKERS]
+"""
+from __future__ import annotations
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.synthetic import make_requests
+from uw_bulk import run_bulk
+
+
+def _outcomes(path: Path) -> list:
+    out = []
+    with path.open() as fh:
+        for line in fh:
+            response = json.loads(line)
+            out.append((response["applicationId"], response["status"], response["audit"]["matchedRules"]))
+    return out
+
+
+def main(n: int = 50000, max_workers: int | None = None) -> None:
+    max_workers = max_workers or os.cpu_count() or 1
+    counts = sorted({1, max_workers} | {2 ** k for k in range(max_workers.bit_length()) if 2 ** k <= max_workers})
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "requests.jsonl"
+        with source.open("w") as fh:
+            for request in make_requests(n):
+                fh.write(request.model_dump_json() + "\n")
+
+        print(f"rows={n}  cores={os.cpu_count()}")
+        baseline = serial_s = None
+        for workers in counts:
+            output = Path(tmp) / f"out-{workers}.jsonl"
+            result = run_bulk(source, output, workers=workers)
+            outcomes = _outcomes(output)
+            if baseline is None:
+                baseline, serial_s = outcomes, result.seconds
+            elif outcomes != baseline:
+                raise AssertionError(f"workers={workers}: output differs from the single-worker run")
+            print(f"workers={workers:<3} {result.seconds:7.2f}s  {result.records_per_second:>10,.0f} rows/s  "
+                  f"speedup x{serial_s / result.seconds:.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else None)
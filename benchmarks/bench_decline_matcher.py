@@ -0,0 +1,69 @@
+"""Scaling benchmark for the compiled R-410 matcher versus the nested substring scan.
+
+Run from the repo root:  python -m benchmarks.bench_decline_matcher
+"""
+from __future__ import annotations
+import random
+import string
+import time
+
+from uw_decline_matcher import DeclineMatcher
+
+
+def legacy_hits(conditions: dict, disclosed: list, oxygen: bool) -> list:
+    """The R-410 scan as it was written inline in `evaluate`."""
+    conds = set([c.upper() for c in disclosed])
+    hits = []
+    for code, item in conditions.items():
+        labels = [item.get('label', '').upper(), item.get('description', '').upper()]
+        if any(lbl and any(lbl in c for c in conds) for lbl in labels):
+            hits.append(code)
+    if ("CHF" in conds and oxygen) or ("ESRD" in conds) or ("ALZHEIMER" in conds) or ("DEMENTIA" in conds):
+        hits.append("AUTO")
+    return hits
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+
+
+def make_table(n: int, rng: random.Random) -> dict:
+    return {f"C{i:04d}": {"code": f"C{i:04d}", "label": f"{_word(rng)} {_word(rng)}",
+                          "description": f"history of {_word(rng)}"} for i in range(n)}
+
+
+def make_disclosures(table: dict, n_items: int, rng: random.Random) -> list:
+    labels = [item["label"] for item in table.values()]
+    items = [f"{_word(rng)} {_word(rng)}" for _ in range(n_items)]
+    for i in rng.sample(range(n_items), k=max(1, n_items // 5)):
+        items[i] = f"chronic {rng.choice(labels)}"
+    if rng.random() < 0.3:
+        items.append(rng.choice(["CHF", "ESRD", "Dementia"]))
+    return items
+
+
+def main(applicants: int = 500) -> None:
+    rng = random.Random(0)
+    print(f"{'conditions':>10} {'items':>6} {'legacy ms':>10} {'compiled ms':>12} {'speedup':>8}")
+    for n_conditions in (5, 50, 200, 800):
+        table = make_table(n_conditions, rng)
+        matcher = DeclineMatcher(table)
+        for n_items in (2, 10, 40):
+            cases = [(make_disclosures(table, n_items, rng), rng.random() < 0.5) for _ in range(applicants)]
+            for disclosed, oxygen in cases:
+                assert matcher.match(disclosed, oxygen) == legacy_hits(table, disclosed, oxygen)
+
+            t0 = time.perf_counter()
+            for disclosed, oxygen in cases:
+                legacy_hits(table, disclosed, oxygen)
+            legacy = (time.perf_counter() - t0) * 1000 / applicants
+
+            t0 = time.perf_counter()
+            for disclosed, oxygen in cases:
+                matcher.match(disclosed, oxygen)
+            compiled = (time.perf_counter() - t0) * 1000 / applicants
+            print(f"{n_conditions:>10} {n_items:>6} {legacy:>10.4f} {compiled:>12.4f} {legacy / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Peak-RSS benchmark for `uw_ingest.ingest`: memory must not grow with input size.
+
+For each input size, runs the streaming pipeline and, for contrast, an eager
+load (every row into a list of `EvaluateRequest`, one `evaluate_batch` call)
+in a fresh interpreter and reports its peak RSS. Exits non-zero when the
+streaming peak for the largest input is more than 15% above the smallest.
+Run from the repo root:
+
+    python -m benchmarks.bench_ingest [SIZE ...]
+"""
+from __future__ import annotations
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+MAX_GROWTH = 1.15
+
+
+def _write_input(path: Path, rows: int) -> None:
+    from benchmarks.synthetic import make_requests
+    template = [r.model_dump_json() for r in make_requests(min(rows, 5000))]
+    with path.open("w") as fh:
+        for i in range(rows):
+            fh.write(template[i % len(template)] + "\n")
+
+
+def _child(mode: str, source: str, output: str) -> None:
+    if mode == "stream":
+        from uw_ingest import ingest
+        ingest(source, output)
+    else:
+        from uw_batch import evaluate_batch
+        from uw_models import EvaluateRequest
+        with open(source, "rb") as fh:
+            requests = [EvaluateRequest.model_validate_json(line) for line in fh]
+        with open(output, "w") as fh:
+            for response in evaluate_batch(requests, store=False):
+                fh.write(json.dumps(response) + "\n")
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024)  # Linux reports KiB
+
+
+def _peak_mb(mode: str, source: Path, output: Path) -> int:
+    proc = subprocess.run([sys.executable, "-m", "benchmarks.bench_ingest", "--child", mode, str(source), str(output)],
+                          capture_output=True, text=True, check=True, env={**os.environ, "UW_DECISION_DB": ""})
+    return int(proc.stdout.split()[-1])
+
+
+def main(sizes: list[int]) -> int:
+    peaks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'rows':>9} {'MB in':>7} {'stream MB':>10} {'eager MB':>9}")
+        for rows in sizes:
+            source = Path(tmp) / f"in-{rows}.jsonl"
+            _write_input(source, rows)
+            stream = _peak_mb("stream", source, Path(tmp) / "out.jsonl")
+            eager = _peak_mb("eager", source, Path(tmp) / "out.jsonl")
+            peaks.append(stream)
+            print(f"{rows:>9,} {source.stat().st_size / 2**20:>7.0f} {stream:>10} {eager:>9}")
+            source.unlink()
+    growth = peaks[-1] / peaks[0]
+    print(f"streaming peak growth x{growth:.2f} over x{sizes[-1] / sizes[0]:.0f} input (limit x{MAX_GROWTH})")
+    return 0 if growth <= MAX_GROWTH else 1
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        _child(*sys.argv[2:5])
+    else:
+        sys.exit(main([int(a) for a in sys.argv[1:]] or [10_000, 40_000, 160_000]))
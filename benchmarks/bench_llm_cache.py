@@ -0,0 +1,69 @@
+"""LLM response cache: repeated agent questions against the fake chat-model server.
+
+Runs the same workload (N questions drawn from a small pool of distinct
+questions, skewed toward the popular ones) with the cache disabled and
+enabled, and reports wall time, hit rate and model latency saved.
+
+    python -m benchmarks.bench_llm_cache [QUESTIONS] [DISTINCT] [LATENCY_S]
+"""
+from __future__ import annotations
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks import fake_openai_server
+
+
+def _workload(questions: int, distinct: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    pool = [f"Evaluate applicant #{i} for a Plan G application" for i in range(distinct)]
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    return rng.choices(pool, weights=weights, k=questions)
+
+
+def _run(queries: list, cache_db: str) -> tuple:
+    import uw_chains
+    os.environ["UW_LLM_CACHE_DB"] = cache_db
+    uw_chains.get_llm_cache.cache_clear()
+    uw_chains.get_agent_chain.cache_clear()
+    from uw_graph_flow import run_graph
+
+    t0 = time.perf_counter()
+    answers = [run_graph(q)["answer"] for q in queries]
+    return time.perf_counter() - t0, answers, uw_chains.get_llm_cache()
+
+
+def main(questions: int = 200, distinct: int = 20, latency: float = 0.05) -> None:
+    server = fake_openai_server.start(latency=latency)
+    os.environ.update({
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{server.server_port}/v1",
+        "OPENAI_API_KEY": "fake",
+        "GPT_MODEL": "fake-model",
+        "UW_DECISION_DB": "",
+    })
+    queries = _workload(questions, distinct)
+    print(f"{questions} questions, {distinct} distinct, fake model latency={latency * 1000:.0f}ms")
+
+    cold, _, _ = _run(queries, "")
+    print(f"no cache  {cold:7.2f}s  {questions / cold:7.1f} questions/s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        warm, answers, cache = _run(queries, os.path.join(tmp, "llm_cache.db"))
+        stats = cache.stats()
+        print(f"cached    {warm:7.2f}s  {questions / warm:7.1f} questions/s  "
+              f"hit rate {stats['hitRate']:.1%}  latency saved {stats['latencySavedMs'] / 1000:.2f}s  "
+              f"entries {stats['entries']}")
+
+        # Each distinct question must give the same answer whether or not it was served from cache
+        first = {}
+        for q, a in zip(queries, answers):
+            assert first.setdefault(q, a) == a, f"cached answer differs for {q!r}"
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 200, int(args[1]) if len(args) > 1 else 20,
+         float(args[2]) if len(args) > 2 else 0.05)
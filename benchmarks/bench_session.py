@@ -0,0 +1,73 @@
+"""Per-turn latency over long checkpointed sessions, with and without history compaction.
+
+Each turn of a SESSION_TURNS-long session calls the evaluate tool through
+the fake chat-model server and is checkpointed to SQLite. "full" keeps every
+turn in state and in the prompt; "compact" uses the default window
+(UW_HISTORY_TURNS / UW_HISTORY_TOKENS). The fake server's latency does not
+depend on prompt size, so "full" understates the growth seen with a real model.
+
+    python -m benchmarks.bench_session [TURNS] [SESSIONS] [LATENCY_S]
+"""
+from __future__ import annotations
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks import fake_openai_server
+
+
+def _session(turns: int, thread_id: str) -> tuple:
+    from uw_graph_flow import get_session_graph, run_graph
+    latencies = []
+    for turn in range(turns):
+        t0 = time.perf_counter()
+        run_graph(f"Follow-up #{turn}: evaluate the next applicant", thread_id=thread_id)
+        latencies.append(time.perf_counter() - t0)
+    state = get_session_graph().get_state({"configurable": {"thread_id": thread_id}}).values
+    return latencies, len(state["messages"]), len(state.get("uw_summary", []))
+
+
+def _run(name: str, turns: int, sessions: int) -> None:
+    import uw_graph_flow
+    uw_graph_flow.get_session_graph.cache_clear()
+    per_turn = [[] for _ in range(turns)]
+    for s in range(sessions):
+        latencies, kept, summaries = _session(turns, f"{name}-{s}")
+        for turn, took in enumerate(latencies):
+            per_turn[turn].append(took)
+    means = [statistics.mean(xs) * 1000 for xs in per_turn]
+    tenth = max(1, turns // 10)
+    print(f"{name:<8} first {tenth} turns {statistics.mean(means[:tenth]):7.1f}ms  "
+          f"last {tenth} turns {statistics.mean(means[-tenth:]):7.1f}ms  "
+          f"growth x{statistics.mean(means[-tenth:]) / statistics.mean(means[:tenth]):.2f}  "
+          f"messages kept {kept}  summaries {summaries}")
+
+
+def main(turns: int = 50, sessions: int = 3, latency: float = 0.02) -> None:
+    server = fake_openai_server.start(latency=latency)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{server.server_port}/v1",
+            "OPENAI_API_KEY": "fake",
+            "GPT_MODEL": "fake-model",
+            "UW_DECISION_DB": "",
+            "UW_LLM_CACHE_DB": "",
+            "UW_CHECKPOINT_DB": os.path.join(tmp, "checkpoints.db"),
+        })
+        import uw_graph_flow
+        print(f"{turns}-turn sessions x{sessions}, fake model latency={latency * 1000:.0f}ms")
+        window = uw_graph_flow.HISTORY_TURNS, uw_graph_flow.HISTORY_TOKENS
+        uw_graph_flow.run_graph("warm-up")  # graph build, client creation
+        uw_graph_flow.HISTORY_TURNS, uw_graph_flow.HISTORY_TOKENS = 10 ** 6, 10 ** 9
+        _run("full", turns, sessions)
+        uw_graph_flow.HISTORY_TURNS, uw_graph_flow.HISTORY_TOKENS = window
+        _run("compact", turns, sessions)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 50, int(args[1]) if len(args) > 1 else 3,
+         float(args[2]) if len(args) > 2 else 0.02)
@@ -0,0 +1,72 @@
+"""Streamlit rerun time of `main.py` against chat-history length.
+
+Seeds the session with MESSAGES alternating user/assistant turns (each
+assistant turn carrying a real evaluate audit) and times `AppTest.run()`,
+which executes the whole script the way a browser interaction does.
+"default" renders the latest UW_UI_RECENT_MESSAGES messages with older
+audits collapsed; "all shown" raises that window past the history length,
+so only the per-message table caching helps. No service is started: the
+sidebar's /health call fails fast against a closed port.
+
+    python -m benchmarks.bench_ui [MESSAGES ...]      # default 10 100 500
+"""
+from __future__ import annotations
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import make_requests
+
+APP = Path(__file__).resolve().parent.parent / "main.py"
+RUNS = 5
+
+
+def _history(n: int, audits: list) -> list:
+    messages = []
+    for i in range(n):
+        if i % 2 == 0:
+            messages.append({"role": "user", "content": f"Evaluate applicant #{i}", "audit": []})
+        else:
+            messages.append({"role": "assistant", "content": "The applicant is accepted with underwriting. " * 10,
+                             "audit": audits[i % len(audits)]})
+    return messages
+
+
+def _rerun_ms(n: int, audits: list) -> float:
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(str(APP), default_timeout=120)
+    app.session_state["messages"] = _history(n, audits)
+    app.session_state["thread_id"] = "bench-ui"
+    app.run()  # first run builds the per-message tables
+    if app.exception:
+        raise RuntimeError(app.exception)
+    times = []
+    for _ in range(RUNS):
+        t0 = time.perf_counter()
+        app.run()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000
+
+
+def main(sizes: list) -> None:
+    import uw_rules_engine as engine
+    from uw_decision_store import MemoryDecisionStore
+    engine.set_decision_store(MemoryDecisionStore())
+    audits = [engine.evaluate_request(r)["audit"] for r in make_requests(50)]
+    os.environ["UW_SERVICE_URL"] = "http://127.0.0.1:9"
+
+    window = os.environ.get("UW_UI_RECENT_MESSAGES", "20")
+    print(f"{'messages':>8}  {'default':>10}  {'all shown':>10}   (median of {RUNS} reruns, window={window})")
+    for n in sizes:
+        os.environ["UW_UI_RECENT_MESSAGES"] = window
+        default = _rerun_ms(n, audits)
+        os.environ["UW_UI_RECENT_MESSAGES"] = str(n + 1)
+        shown = _rerun_ms(n, audits)
+        print(f"{n:>8}  {default:>8.1f}ms  {shown:>8.1f}ms")
+    os.environ["UW_UI_RECENT_MESSAGES"] = window
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10, 100, 500])
@@ -0,0 +1,48 @@
+"""Fixtures for the pytest-benchmark suite (`python uw_cli.py perf`)."""
+from __future__ import annotations
+import os
+import random
+
+import pytest
+
+from benchmarks.synthetic import SCENARIOS, make_request
+
+# Keep decisions and LLM responses in memory; nothing under test should touch disk
+os.environ.setdefault("UW_DECISION_DB", "")
+os.environ.setdefault("UW_LLM_CACHE_DB", "")
+os.environ.setdefault("UW_CHECKPOINT_DB", "")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def engine():
+    import uw_rules_engine
+    from uw_decision_store import MemoryDecisionStore
+    uw_rules_engine.set_decision_store(MemoryDecisionStore())
+    uw_rules_engine.configure_evaluation_cache(0)
+    uw_rules_engine.get_rule_config()
+    return uw_rules_engine
+
+
+@pytest.fixture(scope="session")
+def requests_by_scenario():
+    """50 synthetic requests per rule path."""
+    rng = random.Random(14)
+    return {scenario: [make_request(scenario, rng) for _ in range(50)] for scenario in SCENARIOS}
+
+
+@pytest.fixture
+def fake_chat_model(requests_by_scenario):
+    """Swap the OpenAI client for the deterministic FakeUwChatModel for one test."""
+    import uw_chains
+    import uw_graph_flow
+    from benchmarks.fake_chat_model import FakeUwChatModel
+    model = FakeUwChatModel(payload=requests_by_scenario["UW_DECLINE"][0].model_dump(mode="json"))
+    cached = (uw_chains.get_chat_model, uw_chains.get_uw_llm, uw_chains.get_uw_chain, uw_chains.get_agent_chain)
+    for fn in cached[1:]:
+        fn.cache_clear()
+    uw_chains.get_chat_model = lambda: model
+    yield model
+    uw_chains.get_chat_model = cached[0]
+    for fn in cached[1:]:
+        fn.cache_clear()
+    uw_graph_flow.get_graph.cache_clear()
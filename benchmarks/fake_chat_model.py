@@ -0,0 +1,49 @@
+"""Deterministic in-process chat model for graph benchmarks.
+
+The first turn calls `evaluate` with a fixed payload (`applicants` parallel
+calls, with applicationIds suffixed -1, -2, ... when more than one); once the
+tool results are in the history it answers with a fixed summary. No network,
+no randomness.
+"""
+from __future__ import annotations
+import itertools
+from typing import Any, List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+ANSWER = "Typically this application would be handled as shown in the audit, subject to underwriting review."
+
+_CALL_IDS = itertools.count()
+
+
+class FakeUwChatModel(BaseChatModel):
+    payload: dict
+    applicants: int = 1
+    model_name: str = "fake-uw"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-uw"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeUwChatModel":
+        return self
+
+    def _generate(self, messages: List[BaseMessage], stop: Any = None, run_manager: Any = None,
+                  **kwargs: Any) -> ChatResult:
+        usage = {"input_tokens": 900, "output_tokens": 60, "total_tokens": 960}
+        if messages and messages[-1].type == "tool":
+            message = AIMessage(content=ANSWER, usage_metadata=usage)
+        else:
+            message = AIMessage(content="", usage_metadata=usage, tool_calls=[
+                {"name": "evaluate", "args": {"payload": payload}, "id": f"call_{next(_CALL_IDS)}"}
+                for payload in self._payloads()])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _payloads(self) -> List[dict]:
+        if self.applicants == 1:
+            return [self.payload]
+        application = self.payload["application"]
+        return [{**self.payload, "application": {**application, "applicationId": f"{application['applicationId']}-{i}"}}
+                for i in range(1, self.applicants + 1)]
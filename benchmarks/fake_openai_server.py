@@ -0,0 +1,128 @@
+"""Local OpenAI-compatible chat-completions server for load tests.
+
+The first turn of a conversation answers with an `evaluate` tool call built
+from a synthetic request; once a tool result is in the history it answers
+with a short text. A user message mentioning "N applicants" gets N evaluate
+calls: all in the first reply, or with `parallel_tools=False` one per reply
+(a model that calls tools one at a time). `latency` seconds of sleep stand in
+for model time, and streamed replies (`"stream": true`) pause `token_latency`
+between chunks.
+
+    python -m benchmarks.fake_openai_server [PORT] [LATENCY_S]
+"""
+from __future__ import annotations
+import itertools
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synthetic import SCENARIOS, make_request
+
+_IDS = itertools.count()
+
+
+def _completion(message: dict, model: str) -> dict:
+    return {
+        "id": f"chatcmpl-fake-{next(_IDS)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if message.get("tool_calls") else "stop"}],
+        "usage": {"prompt_tokens": 900, "completion_tokens": 60, "total_tokens": 960},
+    }
+
+
+_APPLICANTS = re.compile(r"(\d+) applicants")
+
+
+def _turn(messages: list) -> tuple:
+    """(applicants asked about, tool results so far) for the conversation's latest user turn."""
+    start = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+    match = _APPLICANTS.search(str(messages[start].get("content") or "")) if start >= 0 else None
+    return int(match.group(1)) if match else 1, sum(m.get("role") == "tool" for m in messages[start + 1:])
+
+
+def fake_reply(body: dict, rng: random.Random, parallel_tools: bool = True) -> dict:
+    messages = body.get("messages", [])
+    model = body.get("model") or "fake-model"
+    applicants, done = _turn(messages)
+    if messages and messages[-1].get("role") == "tool" and done >= applicants:
+        return _completion({"role": "assistant", "content": "Typically this application would be "
+                            "handled as shown in the audit, subject to underwriting review."}, model)
+    calls = []
+    for _ in range(applicants - done if parallel_tools else 1):
+        payload = make_request(rng.choice(SCENARIOS), rng).model_dump()
+        calls.append({"id": f"call_{next(_IDS)}", "type": "function",
+                      "function": {"name": "evaluate", "arguments": json.dumps({"payload": payload})}})
+    return _completion({"role": "assistant", "content": None, "tool_calls": calls}, model)
+
+
+def stream_chunks(reply: dict) -> list:
+    """Split a completion into chat.completion.chunk payloads (one per word of text)."""
+    message = reply["choices"][0]["message"]
+    base = {k: reply[k] for k in ("id", "created", "model")} | {"object": "chat.completion.chunk"}
+    deltas = [{"role": "assistant", "content": ""}]
+    if message.get("tool_calls"):
+        deltas += [{"tool_calls": [{"index": i, **call}]} for i, call in enumerate(message["tool_calls"])]
+    else:
+        words = message["content"].split(" ")
+        deltas += [{"content": w if i == 0 else " " + w} for i, w in enumerate(words)]
+    chunks = [base | {"choices": [{"index": 0, "delta": d, "finish_reason": None}]} for d in deltas]
+    chunks.append(base | {"choices": [{"index": 0, "delta": {}, "finish_reason": reply["choices"][0]["finish_reason"]}]})
+    return chunks
+
+
+def make_handler(latency: float, token_latency: float = 0.0, parallel_tools: bool = True):
+    rng = random.Random(0)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(latency)
+            with lock:
+                reply = fake_reply(body, rng, parallel_tools)
+            if body.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for chunk in stream_chunks(reply) + ["[DONE]"]:
+                    data = f"data: {chunk if isinstance(chunk, str) else json.dumps(chunk)}\n\n".encode()
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+                    time.sleep(token_latency)
+                self.wfile.write(b"0\r\n\r\n")
+                return
+            reply = json.dumps(reply).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(reply)))
+            self.end_headers()
+            self.wfile.write(reply)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start(port: int = 0, latency: float = 0.05, token_latency: float = 0.0,
+          parallel_tools: bool = True) -> ThreadingHTTPServer:
+    """Start the server on a background thread; `server.server_port` has the bound port."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency, token_latency, parallel_tools))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-openai", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    srv = start(int(sys.argv[1]) if len(sys.argv) > 1 else 8765, float(sys.argv[2]) if len(sys.argv) > 2 else 0.05)
+    print(f"fake OpenAI server on http://127.0.0.1:{srv.server_port}/v1")
+    threading.Event().wait()
@@ -0,0 +1,89 @@
+"""Golden `evaluate` outputs for rule-engine refactors.
+
+`benchmarks/golden/evaluate.jsonl` holds synthetic requests for every rule
+path with the responses the engine gave when they were recorded. Volatile
+fields (decision id, timestamps, config version, cache/debug extras) are
+left out of the comparison, and the disallowed plan letters compare as a set.
+
+    python -m benchmarks.golden            # check the current engine against the file
+    python -m benchmarks.golden --record   # re-record after an intended behaviour change
+"""
+from __future__ import annotations
+import json
+import sys
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from benchmarks.synthetic import make_requests
+
+GOLDEN_PATH = Path(__file__).resolve().parent / "golden" / "evaluate.jsonl"
+PER_SCENARIO = 20
+_VOLATILE_AUDIT = ("evaluatedAt", "configVersion", "cachedFrom", "ruleTimingsMs")
+
+
+def canonical(response: dict) -> dict:
+    response = {k: v for k, v in response.items() if k != "decisionId"}
+    response["audit"] = {k: v for k, v in response["audit"].items() if k not in _VOLATILE_AUDIT}
+    response = json.loads(json.dumps(response))
+    plans = response.get("planRestrictions") or {}
+    if "disallowedPlanLetters" in plans:  # built from a set on the GI path; order carries no meaning
+        plans["disallowedPlanLetters"] = sorted(plans["disallowedPlanLetters"])
+    return response
+
+
+def _evaluate(request: dict) -> dict:
+    from uw_models import EvaluateRequest
+    from uw_rules_engine import evaluate_request
+    return canonical(evaluate_request(EvaluateRequest.model_validate(request)))
+
+
+def record(path: Path = GOLDEN_PATH) -> int:
+    from benchmarks.synthetic import SCENARIOS
+    requests = [r.model_dump(mode="json") for r in make_requests(PER_SCENARIO * len(SCENARIOS), seed=2026)]
+    # Cross MACRA eligibility and C/F requests with every other path (R-210, filtered plan lists)
+    for i, request in enumerate(requests):
+        if i % 3 == 0:
+            request["applicant"]["medicareEligibilityDate"] = "2021-03-01"
+        if i % 5 == 0:
+            request["coverage"]["requestedPlanLetter"] = "F"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as fh:
+        for request in requests:
+            fh.write(json.dumps({"request": request, "response": _evaluate(request)}, sort_keys=True) + "\n")
+    return len(requests)
+
+
+def cases(path: Path = GOLDEN_PATH) -> Iterator[Tuple[dict, dict]]:
+    with path.open() as fh:
+        for line in fh:
+            case = json.loads(line)
+            yield case["request"], case["response"]
+
+
+def mismatches(path: Path = GOLDEN_PATH) -> List[Tuple[dict, dict, dict]]:
+    """(request, expected, actual) for every case the current engine answers differently."""
+    out = []
+    for request, expected in cases(path):
+        actual = _evaluate(request)
+        if actual != expected:
+            out.append((request, expected, actual))
+    return out
+
+
+def main(argv: List[str]) -> int:
+    import uw_rules_engine as engine
+    from uw_decision_store import MemoryDecisionStore
+    engine.set_decision_store(MemoryDecisionStore())
+    engine.configure_evaluation_cache(0)
+    if "--record" in argv:
+        print(f"Recorded {record()} cases to {GOLDEN_PATH}")
+        return 0
+    diffs = mismatches()
+    for request, expected, actual in diffs[:3]:
+        print(f"{request['application']['applicationId']}:\n  expected {expected}\n  actual   {actual}")
+    print(f"{len(diffs)} mismatches")
+    return 1 if diffs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
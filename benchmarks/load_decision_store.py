@@ -0,0 +1,61 @@
+"""Load test for the decision store: memory stays flat while millions of decisions are written.
+
+Run from the repo root:  python -m benchmarks.load_decision_store [N] [DB_PATH]
+"""
+from __future__ import annotations
+import os
+import random
+import sys
+import tempfile
+import time
+
+from uw_decision_store import SqliteDecisionStore
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as fh:
+        return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def fake_response(i: int) -> dict:
+    return {
+        "decisionId": f"DEC-LOAD-{i:09d}",
+        "status": "ACCEPT_WITH_UW",
+        "underwritingRequired": True,
+        "reasons": [{"code": "R-400", "message": "Outside OE/GI; medical underwriting required."}],
+        "planRestrictions": {"allowedPlanLetters": ["A", "B", "G", "N"], "disallowedPlanLetters": []},
+        "waitingPeriod": {"applies": True, "months": 3, "reason": "Pre-existing condition waiting period"},
+        "ratingGuidance": {"class": "STANDARD", "suggestedFactor": 1.1},
+        "audit": {"evaluatedAt": "2026-01-01T00:00:00Z", "configVersion": "load",
+                  "matchedRules": [{"ruleId": "R-400", "outcome": "FIRED", "details": "Proceed to UW checks."}]},
+    }
+
+
+def main(n: int = 1_000_000, path: str | None = None) -> None:
+    path = path or os.path.join(tempfile.mkdtemp(), "decisions.db")
+    store = SqliteDecisionStore(path, maxsize=10_000)
+    step = max(n // 10, 1)
+    print(f"db={path}")
+    print(f"{'written':>10} {'rss MB':>8} {'writes/s':>10}")
+    t0 = time.perf_counter()
+    # put_many waits for the writer, so memory stays bounded; a tight `put` loop would
+    # overflow past the queue and drop writes to disk instead of slowing down
+    for start in range(0, n, 1000):
+        store.put_many(fake_response(i) for i in range(start, min(start + 1000, n)))
+        done = min(start + 1000, n)
+        if done // step > start // step:
+            print(f"{done:>10} {rss_mb():>8.1f} {done / (time.perf_counter() - t0):>10,.0f}")
+    store.flush()
+
+    rng = random.Random(0)
+    ids = [f"DEC-LOAD-{rng.randrange(n):09d}" for _ in range(10_000)]
+    t0 = time.perf_counter()
+    for decision_id in ids:
+        assert store.get(decision_id) is not None
+    per_lookup = (time.perf_counter() - t0) / len(ids) * 1e6
+    print(f"random lookups: {per_lookup:.1f} us each (memory tier {store.cache.stats()['hitRate']:.0%} hit)")
+    store.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000, sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,81 @@
+"""Load test: sync `run_graph` on a thread pool vs `arun_graph` on one event loop.
+
+Both paths talk to the local fake chat-model server, so the numbers measure
+graph/tool/client overhead and concurrency, not a real model.
+
+    python -m benchmarks.load_graph [SESSIONS] [CONCURRENCY] [LATENCY_S]
+"""
+from __future__ import annotations
+import asyncio
+import os
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import fake_openai_server
+
+
+def _cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _report(name: str, latencies: list, wall: float, cpu: float) -> None:
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:<6} sessions={len(latencies)} p50={statistics.median(latencies) * 1000:7.1f}ms "
+          f"p99={p99 * 1000:7.1f}ms throughput={len(latencies) / wall:7.1f}/s "
+          f"sessions-per-cpu-second={len(latencies) / cpu:7.1f}")
+
+
+def run_sync(sessions: int, concurrency: int) -> None:
+    from uw_graph_flow import run_graph
+
+    def one(i: int) -> float:
+        t0 = time.perf_counter()
+        run_graph(f"Evaluate applicant #{i}")
+        return time.perf_counter() - t0
+
+    one(-1)  # warm-up: graph build, client creation
+    cpu0, t0 = _cpu_seconds(), time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(sessions)))
+    _report("sync", latencies, time.perf_counter() - t0, _cpu_seconds() - cpu0)
+
+
+async def run_async(sessions: int, concurrency: int) -> None:
+    from uw_graph_flow import arun_graph, get_limiter
+    limiter = get_limiter()
+    limiter.max_queue = sessions
+
+    async def one(i: int) -> float:
+        t0 = time.perf_counter()
+        await arun_graph(f"Evaluate applicant #{i}")
+        return time.perf_counter() - t0
+
+    await one(-1)
+    cpu0, t0 = _cpu_seconds(), time.perf_counter()
+    latencies = await asyncio.gather(*(one(i) for i in range(sessions)))
+    _report("async", list(latencies), time.perf_counter() - t0, _cpu_seconds() - cpu0)
+
+
+def main(sessions: int = 200, concurrency: int = 32, latency: float = 0.05) -> None:
+    server = fake_openai_server.start(latency=latency)
+    os.environ.update({
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{server.server_port}/v1",
+        "OPENAI_API_KEY": "fake",
+        "GPT_MODEL": "fake-model",
+        "UW_DECISION_DB": "",
+        "UW_GRAPH_CONCURRENCY": str(concurrency),
+    })
+    print(f"fake model latency={latency * 1000:.0f}ms concurrency={concurrency}")
+    run_sync(sessions, concurrency)
+    asyncio.run(run_async(sessions, concurrency))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 200, int(args[1]) if len(args) > 1 else 32, float(args[2]) if len(args) > 2 else 0.05)
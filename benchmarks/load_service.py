@@ -0,0 +1,147 @@
+"""Load test for `uw_service`: throughput and tail latency per endpoint.
+
+Starts the local fake chat-model server, runs `uw_cli.py serve` with WORKERS
+uvicorn workers against it, then drives each endpoint in turn with
+CONCURRENCY closed-loop clients for DURATION seconds over keep-alive
+connections:
+
+    evaluate      POST /evaluate, one synthetic request
+    batch         POST /evaluate/batch, 100 requests per call
+    chat          POST /chat (two fake LLM round trips and one evaluate)
+    chat-stream   POST /chat with "stream": true; `first` is time to the first event
+
+    python -m benchmarks.load_service [DURATION_S] [CONCURRENCY] [WORKERS] [LATENCY_S]
+"""
+from __future__ import annotations
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks import fake_openai_server
+from benchmarks.synthetic import make_requests
+
+ROOT = Path(__file__).resolve().parent.parent
+BATCH = 100
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _pct(values: list, q: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+def _report(name: str, latencies: list, firsts: list, errors: int, wall: float) -> None:
+    latencies = sorted(latencies)
+    first = f" first-p50={_pct(sorted(firsts), 0.5):6.1f}ms" if firsts else ""
+    if not latencies:
+        print(f"{name:<12} no successful requests, errors={errors}")
+        return
+    print(f"{name:<12} requests={len(latencies):>6} errors={errors:<4} throughput={len(latencies) / wall:8.1f}/s "
+          f"p50={_pct(latencies, 0.5):7.1f}ms p95={_pct(latencies, 0.95):7.1f}ms "
+          f"p99={_pct(latencies, 0.99):7.1f}ms{first}")
+
+
+async def _drive(client: httpx.AsyncClient, name: str, send, duration: float, concurrency: int) -> None:
+    latencies, firsts, errors = [], [], [0]
+    deadline = time.perf_counter() + duration
+
+    async def worker(k: int) -> None:
+        i = k
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                first = await send(client, i)
+            except (httpx.HTTPError, AssertionError):
+                errors[0] += 1
+            else:
+                latencies.append(time.perf_counter() - t0)
+                if first is not None:
+                    firsts.append(first - t0)
+            i += concurrency
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(k) for k in range(concurrency)))
+    _report(name, latencies, firsts, errors[0], time.perf_counter() - t0)
+
+
+async def run(base_url: str, duration: float, concurrency: int) -> None:
+    bodies = [r.model_dump_json().encode() for r in make_requests(2000)]
+    batches = [b"[" + b",".join(bodies[i:i + BATCH]) + b"]" for i in range(0, len(bodies), BATCH)]
+    headers = {"Content-Type": "application/json"}
+
+    async def evaluate(client, i):
+        (await client.post("/evaluate", content=bodies[i % len(bodies)], headers=headers)).raise_for_status()
+
+    async def batch(client, i):
+        (await client.post("/evaluate/batch", content=batches[i % len(batches)], headers=headers)).raise_for_status()
+
+    async def chat(client, i):
+        (await client.post("/chat", json={"query": f"Evaluate applicant #{i}"})).raise_for_status()
+
+    async def chat_stream(client, i):
+        first = None
+        async with client.stream("POST", "/chat", json={"query": f"Evaluate applicant #{i}", "stream": True}) as r:
+            r.raise_for_status()
+            async for line in r.aiter_lines():
+                if line.startswith("data:"):
+                    first = first or time.perf_counter()
+                    assert '"type":"error"' not in line, line
+        return first
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await evaluate(client, 0)
+        for name, send in (("evaluate", evaluate), ("batch", batch), ("chat", chat), ("chat-stream", chat_stream)):
+            await _drive(client, name, send, duration, concurrency)
+
+
+def _wait_ready(base_url: str, proc: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"service exited with {proc.returncode}")
+        try:
+            if httpx.get(base_url + "/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("service did not become ready")
+
+
+def main(duration: float = 10, concurrency: int = 32, workers: int = 2, latency: float = 0.05) -> None:
+    server = fake_openai_server.start(latency=latency)
+    port = _free_port()
+    env = {**os.environ,
+           "OPENAI_BASE_URL": f"http://127.0.0.1:{server.server_port}/v1", "OPENAI_API_KEY": "fake",
+           "GPT_MODEL": "fake-model", "UW_DECISION_DB": "", "UW_CHECKPOINT_DB": "", "UW_LLM_CACHE_DB": "",
+           "UW_GRAPH_CONCURRENCY": str(concurrency), "UW_GRAPH_QUEUE": str(concurrency * 4)}
+    proc = subprocess.Popen([sys.executable, str(ROOT / "uw_cli.py"), "serve", "--port", str(port),
+                             "--workers", str(workers), "--no-access-log"],
+                            cwd=ROOT, env=env, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_ready(base_url, proc)
+        print(f"workers={workers} concurrency={concurrency} duration={duration:.0f}s "
+              f"fake model latency={latency * 1000:.0f}ms cores={os.cpu_count()}")
+        asyncio.run(run(base_url, duration, concurrency))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(float(args[0]) if args else 10, int(args[1]) if len(args) > 1 else 32,
+         int(args[2]) if len(args) > 2 else 2, float(args[3]) if len(args) > 3 else 0.05)
@@ -0,0 +1,98 @@
+"""`uw_dates` micro-benchmarks, and edge cases checked against the `relativedelta` rules they replace."""
+from __future__ import annotations
+import random
+from datetime import date, timedelta
+
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from uw_dates import (age_years, age_years_np, days_between, days_between_np, in_open_enrollment,
+                      in_open_enrollment_np, parse_date, to_datetime64)
+
+
+def _reference_oe(dob: date, partb: date, asof: date) -> bool:
+    # The engine's original relativedelta implementation
+    if relativedelta(asof, dob).years < 65:
+        return False
+    start = date(partb.year, partb.month, 1)
+    return start <= asof <= start + relativedelta(months=+6) - relativedelta(days=+1)
+
+
+# Leap days, month ends and year ends, on both sides of a comparison
+EDGE_DATES = [date(y, m, d) for y in (1959, 1960, 2023, 2024, 2025, 2100)
+              for m, d in ((1, 1), (1, 31), (2, 28), (2, 29), (3, 1), (3, 31), (6, 30), (8, 31), (12, 31))
+              if not (m == 2 and d == 29 and y % 4) and not (y == 2100 and (m, d) == (2, 29))]
+
+
+def _grid(n: int = 4000):
+    """(dob, asof, partb) rows: every ordered pair of edge dates, then random dates around age 65."""
+    rng = random.Random(18)
+    rows = [(dob, asof, asof) for dob in EDGE_DATES for asof in EDGE_DATES if dob <= asof]
+    for _ in range(n):
+        asof = date(2020, 1, 1) + timedelta(days=rng.randint(0, 365 * 8))
+        rows.append((asof - timedelta(days=rng.randint(365 * 63, 365 * 67)), asof,
+                     date(2018 + rng.randint(0, 8), rng.randint(1, 12), rng.randint(1, 28))))
+    return rows
+
+
+@pytest.mark.parametrize("dob,asof", [
+    (date(1960, 2, 29), date(2025, 2, 28)),   # leap-day birthday, non-leap year: turns 65 on Feb 28
+    (date(1960, 2, 29), date(2025, 2, 27)),
+    (date(1960, 2, 29), date(2024, 2, 28)),   # leap year: still 63 until Feb 29
+    (date(1960, 2, 29), date(2024, 2, 29)),
+    (date(1960, 3, 31), date(2025, 3, 30)),
+    (date(1960, 1, 31), date(2025, 2, 28)),   # month-end birthday, shorter month
+    (date(1959, 12, 31), date(2024, 12, 31)),
+    (date(1959, 12, 31), date(2025, 1, 1)),
+])
+def test_age_edges(dob, asof):
+    assert age_years(dob, asof) == relativedelta(asof, dob).years
+    assert age_years_np(to_datetime64([dob]), to_datetime64([asof]))[0] == relativedelta(asof, dob).years
+
+
+def test_dates_match_relativedelta():
+    for dob, asof, partb in _grid():
+        assert age_years(dob, asof) == relativedelta(asof, dob).years, (dob, asof)
+        assert in_open_enrollment(dob, partb, asof) == _reference_oe(dob, partb, asof), (dob, partb, asof)
+        for partb_edge in (date(asof.year, asof.month, 1), asof - relativedelta(months=5), asof - relativedelta(months=6)):
+            assert in_open_enrollment(dob, partb_edge, asof) == _reference_oe(dob, partb_edge, asof)
+
+
+def test_vectorized_match_scalar():
+    dobs, asofs, partbs = (to_datetime64(col) for col in zip(*_grid()))
+    rows = _grid()
+    assert age_years_np(dobs, asofs).tolist() == [age_years(d, a) for d, a, _ in rows]
+    assert in_open_enrollment_np(dobs, partbs, asofs).tolist() == [in_open_enrollment(d, p, a) for d, a, p in rows]
+    assert days_between_np(partbs, asofs).tolist() == [days_between(p, a) for _, a, p in rows]
+    assert not in_open_enrollment_np(to_datetime64([None]), partbs[:1], asofs[:1])[0]
+
+
+def test_parse_date():
+    assert parse_date("2024-02-29") == date(2024, 2, 29)
+    assert parse_date("2026-1-5") == date(2026, 1, 5)
+    for bad in ("2025-02-29", "2026-04-31", "2026-13-01", "02/03/2026"):
+        with pytest.raises(ValueError):
+            parse_date(bad)
+    assert to_datetime64(["2026-1-5", "", None]).astype(str).tolist() == ["2026-01-05", "NaT", "NaT"]
+
+
+def test_parse_date_cached(benchmark):
+    benchmark(parse_date, "2026-02-15")
+
+
+def test_parse_date_uncached(benchmark):
+    benchmark(parse_date.__wrapped__, "2026-02-15")
+
+
+def test_age_years(benchmark):
+    benchmark(age_years, date(1960, 2, 29), date(2025, 2, 28))
+
+
+def test_in_open_enrollment_np(benchmark):
+    dobs, asofs, partbs = (to_datetime64(col) for col in zip(*_grid()))
+    benchmark(in_open_enrollment_np, dobs, partbs, asofs)
+
+
+def test_to_datetime64(benchmark):
+    values = [d.isoformat() for d, _, _ in _grid()]
+    benchmark(to_datetime64, values)
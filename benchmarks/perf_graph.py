@@ -0,0 +1,34 @@
+"""End-to-end graph benchmarks against the deterministic fake chat model."""
+from __future__ import annotations
+
+from benchmarks.fake_chat_model import ANSWER
+
+
+def test_run_graph(benchmark, fake_chat_model):
+    from uw_graph_flow import run_graph
+    result = benchmark(run_graph, "Evaluate this applicant")
+    assert result["answer"] == ANSWER
+    assert result["uw_audit"]["matchedRules"]
+
+
+def test_stream_graph(benchmark, fake_chat_model):
+    from uw_graph_flow import stream_graph
+    events = benchmark(lambda: list(stream_graph("Evaluate this applicant")))
+    assert events[-1]["type"] == "done" and events[-1]["answer"] == ANSWER
+
+
+def test_run_graph_applicants(benchmark, fake_chat_model):
+    # Four applicants in one question: one model response with four evaluate calls, one round trip
+    from uw_graph_flow import run_graph
+    fake_chat_model.applicants = 4
+    result = benchmark(run_graph, "Evaluate these 4 applicants")
+    base = fake_chat_model.payload["application"]["applicationId"]
+    assert sorted(result["uw_decisions"]) == [f"{base}-{i}" for i in range(1, 5)]
+    assert all(d["audit"]["matchedRules"] for d in result["uw_decisions"].values())
+    assert result["uw_metrics"]["llmCalls"] == 2
+
+
+def test_evaluate_structured(benchmark, engine, requests_by_scenario):
+    from uw_fast_path import evaluate_structured
+    payload = requests_by_scenario["UW_CLEAN"][0].model_dump_json()
+    benchmark(evaluate_structured, payload)
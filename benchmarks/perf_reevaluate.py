@@ -0,0 +1,93 @@
+"""Incremental re-evaluation after a rule-data edit vs. re-running every stored decision."""
+from __future__ import annotations
+import json
+
+import pytest
+
+from benchmarks.synthetic import make_requests
+from uw_config import (CONFIG_FILES, DATA_DIR, DecisionTableFile, DeclineConditionFile, GiScenarioFile,
+                       StateOverrideFile, compile_rule_config)
+from uw_decision_store import MemoryDecisionStore
+from uw_reevaluate import reevaluate
+
+
+def _flip_ga(files):
+    next(s for s in files["state_overrides.json"]["items"] if s["state"] == "GA")["continuousGi"] = True
+
+
+def _shorten_ma_lookback(files):
+    next(g for g in files["gi_scenarios.json"]["items"] if g["code"] == "MA_PLAN_TERMINATION")["lookbackDaysDefault"] = 30
+
+
+def _decline_hypertension(files):
+    files["decline_conditions.json"]["items"].append(
+        {"code": "HTN", "label": "Hypertension", "description": "Uncontrolled hypertension"})
+
+
+def _reword_r400(files):
+    files["decision_table.json"]["rules"][-1]["outcome"]["reason"] = "Medical underwriting required."
+
+
+EDITS = {"state": _flip_ga, "gi-lookback": _shorten_ma_lookback, "decline": _decline_hypertension,
+         "decision-table": _reword_r400}
+
+
+def _config(edit=None, version="base"):
+    files = {name: json.loads((DATA_DIR / name).read_text()) for name in CONFIG_FILES}
+    if edit:
+        edit(files)
+    return compile_rule_config(StateOverrideFile.model_validate(files["state_overrides.json"]),
+                               DeclineConditionFile.model_validate(files["decline_conditions.json"]),
+                               GiScenarioFile.model_validate(files["gi_scenarios.json"]),
+                               DecisionTableFile.model_validate(files["decision_table.json"]), fingerprint=version)
+
+
+@pytest.fixture(scope="module")
+def book(engine):
+    """2,000 decisions under the base config: half scalar, half batch, all indexed."""
+    from uw_batch import evaluate_batch
+    store = MemoryDecisionStore(maxsize=10_000, ttl=None)
+    previous, previous_cfg = engine.get_decision_store(), engine.get_rule_config()
+    engine.set_decision_store(store)
+    engine.install_rule_config(_config())
+    requests = make_requests(2000, seed=23)
+    for request in requests[:1000]:
+        engine.evaluate_request(request)
+    evaluate_batch(requests[1000:])
+    engine.set_decision_store(previous)
+    engine.install_rule_config(previous_cfg)
+    return store
+
+
+def _full_rerun(engine, store, cfg):
+    """Every stored decision through the rule chain again; ids whose status or reasons changed."""
+    changed = set()
+    for decision_id in store.indexed_ids():
+        decision, _ = engine._decide(engine.RequestRecord.from_row(store.get_inputs(decision_id)[0]), cfg)
+        previous = store.get(decision_id)
+        if decision["status"] != previous["status"] or decision["reasons"] != previous["reasons"]:
+            changed.add(decision_id)
+    return changed
+
+
+@pytest.mark.parametrize("edit", EDITS)
+def test_reevaluate_finds_every_change(engine, book, edit):
+    old, new = _config(), _config(EDITS[edit], edit)
+    report = reevaluate(old, new, book)
+    assert {c["decisionId"] for c in report.changes} == _full_rerun(engine, book, new)
+    assert report.changes and report.missing == report.errors == 0
+    if edit == "decision-table":
+        assert report.keys is None and report.reevaluated == len(book.inputs)
+    else:
+        assert report.reevaluated < len(book.inputs) / 2, report.reevaluated
+
+
+@pytest.mark.parametrize("edit", ["state", "gi-lookback", "decline"])
+def test_reevaluate_incremental(benchmark, book, edit):
+    old, new = _config(), _config(EDITS[edit], edit)
+    benchmark(reevaluate, old, new, book)
+
+
+def test_reevaluate_full(benchmark, engine, book):
+    new = _config(_flip_ga, "state")
+    benchmark(_full_rerun, engine, book, new)
@@ -0,0 +1,43 @@
+"""Validated vs. trusted request ingestion: JSON line -> engine record, and on through `evaluate_request`."""
+from __future__ import annotations
+
+import orjson
+import pytest
+
+from benchmarks.golden import canonical
+from benchmarks.synthetic import SCENARIOS
+from uw_models import REQUEST_ADAPTER
+
+
+@pytest.fixture(scope="module")
+def request_lines(requests_by_scenario):
+    return [r.model_dump_json().encode() for scenario in SCENARIOS for r in requests_by_scenario[scenario]]
+
+
+def _validated(engine, line: bytes):
+    return engine.RequestRecord.from_request(REQUEST_ADAPTER.validate_json(line))
+
+
+def _trusted(engine, line: bytes):
+    return engine.RequestRecord.from_dict(orjson.loads(line))
+
+
+PATHS = {"validated": _validated, "trusted": _trusted}
+
+
+def test_trusted_matches_validated(engine, request_lines):
+    for line in request_lines:
+        validated, trusted = (engine.evaluate_request(parse(engine, line)) for parse in PATHS.values())
+        assert canonical(trusted) == canonical(validated), orjson.loads(line)["application"]["applicationId"]
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_parse(benchmark, engine, request_lines, path):
+    parse = PATHS[path]
+    benchmark(lambda: [parse(engine, line) for line in request_lines])
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_parse_and_evaluate(benchmark, engine, request_lines, path):
+    parse = PATHS[path]
+    benchmark(lambda: [engine.evaluate_request(parse(engine, line)) for line in request_lines])
@@ -0,0 +1,171 @@
+"""Rules-engine benchmarks: `evaluate` per rule path and the hot helpers."""
+from __future__ import annotations
+from datetime import date
+
+import pytest
+
+from benchmarks.golden import canonical, cases, mismatches
+from benchmarks.synthetic import SCENARIOS
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_evaluate_request(benchmark, engine, requests_by_scenario, scenario):
+    requests = requests_by_scenario[scenario]
+
+    def run():
+        for request in requests:
+            engine.evaluate_request(request)
+
+    benchmark(run)
+
+
+def test_is_open_enrollment(benchmark, engine):
+    benchmark(engine._is_open_enrollment, date(1960, 8, 14), date(2025, 8, 1), date(2026, 1, 15))
+
+
+def test_gi_applies(benchmark, engine):
+    cfg = engine.get_rule_config()
+    events = [{"type": "MA_PLAN_TERMINATION", "triggeringDate": "2025-12-20"},
+              {"type": "EMPLOYER_GROUP_ENDING", "triggeringDate": "2026-01-05"}]
+    benchmark(engine._gi_applies, events, date(2026, 2, 1), cfg.gi_lookback_days, cfg.default_lookback_days)
+
+
+def test_rating_guidance(benchmark, engine):
+    benchmark(engine._rating_guidance, True, 68, 240, True)
+
+
+def test_decline_match(benchmark, engine):
+    matcher = engine.get_rule_config().decline_matcher
+    conditions = ["Hypertension", "Type 2 diabetes", "History of congestive heart failure", "Asthma"]
+    benchmark(matcher.match, conditions, True)
+
+
+def _scan_hits(conditions: dict, rules: list, disclosed: list, oxygen: bool) -> list:
+    """Per-condition substring scan over labels, descriptions and synonyms, then the exact-term rules."""
+    items = {c.upper() for c in disclosed}
+    hits = [code for code, item in conditions.items()
+            if any(p and any(p.upper() in c for c in items)
+                   for p in [item.get("label"), item.get("description"), *(item.get("synonyms") or [])])]
+    for rule in rules:
+        if (not rule.get("oxygenUse") or oxygen) and items & {t.upper() for t in rule["conditions"]} \
+                and rule["code"] not in hits:
+            hits.append(rule["code"])
+    return hits
+
+
+@pytest.mark.parametrize("n_conditions", [5, 50, 200])
+def test_decline_matcher_parity(n_conditions):
+    import random
+    from benchmarks.bench_decline_matcher import legacy_hits, make_disclosures, make_table, _word
+    from uw_decline_matcher import DEFAULT_AUTO_DECLINE_RULES, DeclineMatcher
+    rng = random.Random(n_conditions)
+    table = make_table(n_conditions, rng)
+    plain = DeclineMatcher(table)
+    for code in rng.sample(sorted(table), k=max(1, n_conditions // 3)):
+        table[code] = {**table[code], "synonyms": [_word(rng), f"{_word(rng)} {_word(rng)}"]}
+    with_synonyms = DeclineMatcher(table)
+    synonyms = [s for item in table.values() for s in item.get("synonyms", [])]
+    for _ in range(300):
+        disclosed, oxygen = make_disclosures(table, rng.randint(1, 12), rng), rng.random() < 0.5
+        assert plain.match(disclosed, oxygen) == legacy_hits({c: {k: v for k, v in i.items() if k != "synonyms"}
+                                                              for c, i in table.items()}, disclosed, oxygen)
+        disclosed.append(f"recent {rng.choice(synonyms).upper()} episode")
+        assert with_synonyms.match(disclosed, oxygen) == \
+            _scan_hits(table, DEFAULT_AUTO_DECLINE_RULES, disclosed, oxygen)
+
+
+def test_decline_matcher_parity_config(engine):
+    import random
+    from uw_config import as_legacy_tables
+    cfg = engine.get_rule_config()
+    table = as_legacy_tables(cfg)[1]
+    terms = [t for item in table.values() for t in [item.get("label"), item.get("description"),
+                                                   *(item.get("synonyms") or [])] if t]
+    terms += [t for rule in cfg.decline_matcher.rules for t in rule["conditions"]] + ["Hypertension", "Asthma"]
+    rng = random.Random(2)
+    for _ in range(500):
+        disclosed = [rng.choice(terms).lower() if rng.random() < 0.5 else rng.choice(terms)
+                     for _ in range(rng.randint(1, 4))]
+        oxygen = rng.random() < 0.5
+        assert cfg.decline_matcher.match(disclosed, oxygen) == \
+            _scan_hits(table, list(cfg.decline_matcher.rules), disclosed, oxygen)
+
+
+def test_decision_table(benchmark, engine):
+    from uw_batch import _RowFacts
+    table = engine.get_rule_config().decision_table
+    facts = _RowFacts("GA", True, False, False, "MA_PLAN_TERMINATION", False)
+    benchmark(table.decide, facts)
+
+
+def test_golden_parity(engine):
+    diffs = mismatches()
+    assert not diffs, f"{len(diffs)} golden cases differ; first: {diffs[0][0]['application']['applicationId']}"
+
+
+def _batch_input(form, requests):
+    import pandas as pd
+    from uw_models import EvaluateRequest
+    if form == "models":
+        return [EvaluateRequest.model_validate(r) for r in requests]
+    if form == "nested-frame":
+        return pd.DataFrame(requests)
+    if form == "flat-frame":
+        return pd.json_normalize(requests, max_level=1)
+    if form == "arrow":
+        pa = pytest.importorskip("pyarrow")
+        return pa.Table.from_pylist(requests)
+    return requests
+
+
+@pytest.mark.parametrize("form", ["models", "dicts", "nested-frame", "flat-frame", "arrow"])
+def test_batch_parity(engine, form):
+    from uw_batch import evaluate_batch
+    requests, expected = zip(*cases())
+    actual = [canonical(r) for r in evaluate_batch(_batch_input(form, list(requests)), store=False)]
+    diffs = [request["application"]["applicationId"]
+             for request, want, got in zip(requests, expected, actual) if want != got]
+    assert len(actual) == len(expected)
+    assert not diffs, f"{len(diffs)} golden cases differ; first: {diffs[0]}"
+
+
+def test_evaluation_cache_hits_are_copies(engine, requests_by_scenario):
+    request = requests_by_scenario["UW_DECLINE"][0]
+    engine.configure_evaluation_cache(16, None)
+    try:
+        first = engine.evaluate_request(request)
+        hit = engine.evaluate_request(request)
+        assert hit["audit"]["cachedFrom"] == first["decisionId"]
+        assert {k: v for k, v in hit.items() if k not in ("decisionId", "audit")} == \
+            {k: v for k, v in first.items() if k not in ("decisionId", "audit")}
+        assert hit["audit"]["matchedRules"] == first["audit"]["matchedRules"]
+        for response in (first, hit):
+            response["reasons"].append({"code": "X", "message": "mutated"})
+            response["audit"]["matchedRules"].clear()
+        again = engine.evaluate_request(request)
+        assert [r["code"] for r in again["reasons"]] == [r["code"] for r in first["reasons"][:-1]]
+        assert again["audit"]["matchedRules"]
+    finally:
+        engine.configure_evaluation_cache(0)
+
+
+def test_first_rule_config_load_compiles_once(engine, monkeypatch):
+    import threading
+    import time
+    loads = []
+
+    def slow_load():
+        loads.append(1)
+        time.sleep(0.05)
+        return previous
+
+    previous = engine.get_rule_config()
+    monkeypatch.setattr(engine, "load_rule_config", slow_load)
+    monkeypatch.setattr(engine, "_RULE_CONFIG", None)
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(engine.get_rule_config())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(loads) == 1 and len(seen) == 8 and all(cfg is previous for cfg in seen)
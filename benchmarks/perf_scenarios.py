@@ -0,0 +1,55 @@
+"""What-if sweeps: `evaluate_scenarios_request` vs. one `evaluate_request` per variant."""
+from __future__ import annotations
+from itertools import product
+
+import pytest
+
+from benchmarks.synthetic import SCENARIOS
+from uw_models import GiEvent, ScenarioGrid
+
+PLANS = ["C", "F", "G", "HDG", "N", "K"]
+DATES = ["2026-01-15", "2026-02-01", "2026-03-01", "2026-06-30", "2026-09-01"]
+GI_SETS = [[], [GiEvent(type="MA_PLAN_TERMINATION", triggeringDate="2026-01-10")],
+           [GiEvent(type="EMPLOYER_GROUP_ENDING", triggeringDate="2025-11-01")]]
+GRID = ScenarioGrid(requestedPlanLetters=PLANS, receivedDates=DATES, giEventSets=GI_SETS)  # 90 variants
+
+
+def _variants(request):
+    """The grid as independent requests, in evaluate_scenarios_request's row order."""
+    out = []
+    for received, gi_events, plan in product(DATES, GI_SETS, PLANS):
+        out.append(request.model_copy(update={
+            "application": request.application.model_copy(update={"receivedDate": received}),
+            "coverage": request.coverage.model_copy(update={"requestedPlanLetter": plan}),
+            "giEvents": gi_events,
+        }))
+    for variant in out:  # model_copy skips model_post_init; re-parse the dates it caches
+        variant.application.model_post_init(None)
+    return out
+
+
+@pytest.fixture(scope="module")
+def base_requests(requests_by_scenario):
+    return [requests_by_scenario[scenario][0] for scenario in SCENARIOS]
+
+
+def test_scenarios_match_independent_calls(engine, base_requests):
+    for request in base_requests:
+        rows = engine.evaluate_scenarios_request(request, GRID)["scenarios"]
+        responses = [engine.evaluate_request(v) for v in _variants(request)]
+        assert len(rows) == len(responses)
+        for row, response in zip(rows, responses):
+            assert row["status"] == response["status"], row
+            assert row["reasons"] == [r["code"] for r in response["reasons"]], row
+            assert row["allowedPlanLetters"] == response["planRestrictions"]["allowedPlanLetters"], row
+            assert row["waitingPeriodMonths"] == response["waitingPeriod"]["months"], row
+            assert row["ratingClass"] == response["ratingGuidance"]["class"], row
+
+
+def test_scenarios_sweep(benchmark, engine, base_requests):
+    benchmark(lambda: [engine.evaluate_scenarios_request(r, GRID) for r in base_requests])
+
+
+def test_scenarios_independent(benchmark, engine, base_requests):
+    variants = [v for r in base_requests for v in _variants(r)]
+    benchmark(lambda: [engine.evaluate_request(v) for v in variants])
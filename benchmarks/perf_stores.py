@@ -0,0 +1,208 @@
+"""Persistent stores on throwaway SQLite files: round trips, eviction, writer back-pressure."""
+from __future__ import annotations
+import threading
+import time
+
+from benchmarks.synthetic import make_requests
+from uw_decision_store import SqliteDecisionStore
+
+
+def _responses(engine, n, seed=5):
+    from uw_decision_store import MemoryDecisionStore
+    previous = engine.set_decision_store(MemoryDecisionStore())
+    try:
+        return [engine.evaluate_request(r) for r in make_requests(n, seed=seed)]
+    finally:
+        engine.set_decision_store(previous)
+
+
+def test_sqlite_store_round_trip(engine, tmp_path):
+    path = tmp_path / "decisions.db"
+    responses = _responses(engine, 20)
+    store = SqliteDecisionStore(path, maxsize=5, flush_interval=0.01)
+    for response in responses:
+        store.put(response["decisionId"], response, ([1, 2], ["state:GA"]))
+    store.flush()
+    assert len(store) == 20
+    # The memory tier holds the last 5; the rest come back from disk
+    assert all(store.get(r["decisionId"]) == r for r in responses)
+    assert store.cache.stats()["evictions"] > 0
+    assert store.get_inputs(responses[0]["decisionId"]) == ([1, 2], ["state:GA"])
+    assert store.dependents(["state:GA"]) == {r["decisionId"] for r in responses}
+    store.close()
+
+    reopened = SqliteDecisionStore(path)
+    assert reopened.get(responses[-1]["decisionId"]) == responses[-1]
+    assert set(reopened.indexed_ids()) == {r["decisionId"] for r in responses}
+    reopened.close()
+
+
+def _stall_writer(store):
+    release = threading.Event()
+    write = store._write
+
+    def stalled_write(conn, batch):
+        release.wait(10)
+        write(conn, batch)
+
+    store._write = stalled_write
+    return release
+
+
+def test_sqlite_store_put_does_not_block_on_a_full_queue(engine, tmp_path):
+    responses = _responses(engine, 50)
+    store = SqliteDecisionStore(tmp_path / "decisions.db", batch_size=1, queue_size=2, overflow_size=100,
+                                flush_interval=0.01)
+    release = _stall_writer(store)
+    t0 = time.perf_counter()
+    for response in responses:
+        store.put(response["decisionId"], response)
+    rewritten = {**responses[0], "status": "REWRITTEN"}
+    store.put(rewritten["decisionId"], rewritten)
+    assert time.perf_counter() - t0 < 1.0
+    assert store.overflowed > 0 and store.dropped == 0
+    # Held writes are still readable before they reach disk
+    assert store.get(responses[-1]["decisionId"]) == responses[-1]
+
+    release.set()
+    store.flush()
+    assert not store._overflow and not store._pending
+    store.cache.clear()
+    assert len(store) == 50
+    assert all(store.get(r["decisionId"]) == r for r in responses[1:])
+    # The later write of the same id lands last
+    assert store.get(rewritten["decisionId"])["status"] == "REWRITTEN"
+    store.close()
+
+
+def test_sqlite_store_drops_past_the_overflow_bound(engine, tmp_path):
+    responses = _responses(engine, 20)
+    store = SqliteDecisionStore(tmp_path / "decisions.db", batch_size=1, queue_size=2, overflow_size=5,
+                                flush_interval=0.01)
+    release = _stall_writer(store)
+    for response in responses:
+        store.put(response["decisionId"], response)
+    assert store.overflowed == 5 and store.dropped >= 10
+    # Dropped decisions stay readable from the memory tier
+    assert all(store.get(r["decisionId"]) == r for r in responses)
+    release.set()
+    store.flush()
+    assert len(store) == 20 - store.dropped
+    store.close()
+
+
+def _llm_cache(tmp_path, **kwargs):
+    from uw_llm_cache import LlmResponseCache
+    return LlmResponseCache(str(tmp_path / "llm.db"), **kwargs)
+
+
+def test_llm_cache_key_normalization(tmp_path):
+    from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+    cache = _llm_cache(tmp_path)
+    call = {"name": "evaluate", "args": {"payload": {"a": 1}}, "id": "call_1", "type": "tool_call"}
+    history = [HumanMessage("Evaluate  this\napplicant"), AIMessage("", tool_calls=[call]),
+               ToolMessage('{"status": "ACCEPT", "decisionId": "DEC-1", "audit": {"evaluatedAt": "t1"}}',
+                           tool_call_id="call_1", name="evaluate")]
+    cache.store(history, "m", "p1", "v1", AIMessage("Accepted."), 120.0)
+
+    same = [HumanMessage("evaluate this applicant"), AIMessage("", tool_calls=[{**call, "id": "call_9"}]),
+            ToolMessage('{"audit": {"evaluatedAt": "t2"}, "decisionId": "DEC-2", "status": "ACCEPT"}',
+                        tool_call_id="call_9", name="evaluate")]
+    assert cache.lookup(same, "m", "p1", "v1").content == "Accepted."
+    different = same[:2] + [ToolMessage('{"status": "DECLINE"}', tool_call_id="call_9", name="evaluate")]
+    assert cache.lookup(different, "m", "p1", "v1") is None
+    assert cache.lookup(same, "m", "p2", "v1") is None  # prompt version is part of the key
+    assert cache.stats()["exactHits"] == 1 and cache.stats()["latencySavedMs"] == 120.0
+
+
+def test_llm_cache_ttl_and_config_version_purge(tmp_path, monkeypatch):
+    from langchain_core.messages import AIMessage, HumanMessage
+    cache = _llm_cache(tmp_path, ttl=60)
+    question = [HumanMessage("What is R-400?")]
+    cache.lookup(question, "m", "p", "v1")
+    cache.store(question, "m", "p", "v1", AIMessage("Medical underwriting."), 50.0)
+    assert cache.lookup(question, "m", "p", "v1") is not None
+
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 61)
+    assert cache.lookup(question, "m", "p", "v1") is None
+    cache.evict()
+    assert cache.stats()["entries"] == 0
+    monkeypatch.setattr(time, "time", real_time)
+
+    cache.store(question, "m", "p", "v1", AIMessage("Medical underwriting."), 50.0)
+    assert cache.lookup(question, "m", "p", "v2") is None  # a new rule config purges older versions
+    assert cache.stats()["entries"] == 0
+    cache.store(question, "m", "p", "v2", AIMessage("Still medical underwriting."), 50.0)
+    assert cache.lookup(question, "m", "p", "v2").content == "Still medical underwriting."
+
+
+def test_llm_cache_evicts_least_recently_hit(tmp_path):
+    from langchain_core.messages import AIMessage, HumanMessage
+    cache = _llm_cache(tmp_path, max_entries=3)
+    questions = [[HumanMessage(f"question {i}")] for i in range(5)]
+    for i, question in enumerate(questions):
+        cache.store(question, "m", "p", "v", AIMessage(f"answer {i}"), 1.0)
+        time.sleep(0.002)
+    cache.lookup(questions[0], "m", "p", "v")
+    cache.evict()
+    kept = [i for i, q in enumerate(questions) if cache.lookup(q, "m", "p", "v") is not None]
+    assert kept == [0, 3, 4]
+
+
+def test_llm_cache_semantic_tier(tmp_path):
+    from langchain_core.messages import AIMessage, HumanMessage
+    vectors = {"what is r-400?": [1.0, 0.0, 0.1], "explain rule r-400": [0.99, 0.0, 0.12],
+               "what is r-500?": [0.0, 1.0, 0.0], "evaluate applicant 7": [1.0, 0.01, 0.1]}
+    cache = _llm_cache(tmp_path, embedder=lambda text: vectors[text.casefold()], similarity=0.95)
+    cache.store([HumanMessage("What is R-400?")], "m", "p", "v", AIMessage("Medical underwriting."), 1.0)
+    call = {"name": "evaluate", "args": {}, "id": "c", "type": "tool_call"}
+    cache.store([HumanMessage("Evaluate applicant 7")], "m", "p", "v", AIMessage("", tool_calls=[call]), 1.0)
+    assert cache.lookup([HumanMessage("Explain rule R-400")], "m", "p", "v").content == "Medical underwriting."
+    assert cache.lookup([HumanMessage("What is R-500?")], "m", "p", "v") is None
+    assert cache.semantic_hits == 1
+
+
+def test_session_checkpoints_survive_reopen_and_compact(fake_chat_model, tmp_path, monkeypatch):
+    import uw_graph_flow
+    monkeypatch.setenv("UW_CHECKPOINT_DB", str(tmp_path / "checkpoints.db"))
+    monkeypatch.setattr(uw_graph_flow, "HISTORY_TURNS", 2)
+    uw_graph_flow.get_session_graph.cache_clear()
+    try:
+        for turn in range(4):
+            assert uw_graph_flow.run_graph(f"Turn {turn}: evaluate this applicant", thread_id="t-1")["answer"]
+        uw_graph_flow.get_session_graph().checkpointer.conn.close()
+        uw_graph_flow.get_session_graph.cache_clear()
+
+        # A fresh connection, as after a restart, sees the compacted session
+        state = uw_graph_flow.get_session_graph().get_state({"configurable": {"thread_id": "t-1"}}).values
+        humans = [m.content for m in state["messages"] if m.type == "human"]
+        assert humans == ["Turn 2: evaluate this applicant", "Turn 3: evaluate this applicant"]
+        assert len(state["uw_summary"]) == 2
+        assert uw_graph_flow.get_session_graph().get_state({"configurable": {"thread_id": "t-2"}}).values == {}
+        uw_graph_flow.get_session_graph().checkpointer.conn.close()
+    finally:
+        uw_graph_flow.get_session_graph.cache_clear()
+
+
+def test_async_session_graph_opens_one_connection(tmp_path, monkeypatch):
+    import asyncio
+    import aiosqlite
+    import uw_graph_flow
+    monkeypatch.setenv("UW_CHECKPOINT_DB", str(tmp_path / "checkpoints.db"))
+    opened = []
+    connect = aiosqlite.connect
+
+    def counting_connect(*args, **kwargs):
+        opened.append(args)
+        return connect(*args, **kwargs)
+
+    monkeypatch.setattr(aiosqlite, "connect", counting_connect)
+
+    async def main():
+        graphs = await asyncio.gather(*(uw_graph_flow.aget_session_graph() for _ in range(8)))
+        assert all(graph is graphs[0] for graph in graphs)
+        await uw_graph_flow.aclose_session_graph()
+
+    asyncio.run(main())
+    assert len(opened) == 1
@@ -0,0 +1,66 @@
+"""Synthetic `EvaluateRequest` generator covering each rule path."""
+from __future__ import annotations
+import random
+from datetime import date, timedelta
+from typing import List
+
+from uw_models import EvaluateRequest
+
+SCENARIOS = ("CONTINUOUS_GI_STATE", "OPEN_ENROLLMENT", "GI_EVENT", "ON_MA", "UW_DECLINE", "UW_CLEAN", "MACRA_CF")
+
+RECEIVED = date(2026, 2, 15)
+
+
+def _iso(d: date) -> str:
+    return d.isoformat()
+
+
+def make_request(scenario: str, rng: random.Random) -> EvaluateRequest:
+    received = RECEIVED + timedelta(days=rng.randint(-30, 30))
+    dob = date(1950 + rng.randint(0, 8), rng.randint(1, 12), rng.randint(1, 28))
+    partb = date(2018 + rng.randint(0, 4), rng.randint(1, 12), 1)
+    elig = None
+    state = rng.choice(["GA", "TX", "FL", "OH"])
+    plan = rng.choice(["G", "N", "A", "K"])
+    gi_events = []
+    conditions = rng.sample(["Asthma", "Hypertension", "Diabetes"], rng.randint(0, 2))
+    on_ma = False
+    oxygen = False
+
+    if scenario == "CONTINUOUS_GI_STATE":
+        state = rng.choice(["NY", "CT"])
+    elif scenario == "OPEN_ENROLLMENT":
+        dob = date(received.year - 65 - rng.randint(0, 1), 1, 1)
+        partb = date(received.year, received.month, 1) - timedelta(days=rng.randint(0, 60))
+        partb = partb.replace(day=1)
+    elif scenario == "GI_EVENT":
+        gi_events = [{"type": rng.choice(["MA_PLAN_TERMINATION", "EMPLOYER_GROUP_ENDING"]),
+                      "triggeringDate": _iso(received - timedelta(days=rng.randint(0, 60)))}]
+    elif scenario == "ON_MA":
+        on_ma = True
+    elif scenario == "UW_DECLINE":
+        conditions = conditions + [rng.choice(["Congestive Heart Failure", "ESRD", "History of CHF", "Stroke"])]
+        if rng.random() < 0.5:
+            conditions.append("CHF")
+            oxygen = True
+    elif scenario == "MACRA_CF":
+        elig = date(2020 + rng.randint(0, 3), rng.randint(1, 12), 1)
+        plan = rng.choice(["C", "F", "HDF"])
+
+    return EvaluateRequest(**{
+        "application": {"applicationId": f"APP-{rng.randint(0, 10**9):09d}", "receivedDate": _iso(received),
+                        "requestedEffectiveDate": _iso(received + timedelta(days=30))},
+        "applicant": {"dateOfBirth": _iso(dob), "state": state, "tobaccoUse": rng.random() < 0.2,
+                      "heightInches": rng.randint(60, 76), "weightPounds": rng.randint(110, 300),
+                      "partAEffectiveDate": _iso(partb), "partBEffectiveDate": _iso(partb),
+                      "currentlyOnMA": on_ma, "medicareEligibilityDate": _iso(elig) if elig else None},
+        "coverage": {"requestedPlanLetter": plan, "priorCreditableCoverageMonths": rng.randint(0, 12),
+                     "gapSinceCreditableCoverageEndDays": rng.randint(0, 120)},
+        "giEvents": gi_events,
+        "health": {"conditions": conditions, "oxygenUse": oxygen},
+    })
+
+
+def make_requests(n: int, seed: int = 0) -> List[EvaluateRequest]:
+    rng = random.Random(seed)
+    return [make_request(SCENARIOS[i % len(SCENARIOS)], rng) for i in range(n)]
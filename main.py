@@ -1,31 +1,96 @@
+import uuid
 import streamlit as st
-import pandas as pd
 from typing import Any, Dict, List
-from uw_graph_flow import uw_flow, run_graph
-from langchain_core.messages import BaseMessage, HumanMessage
+from uw_client import ServiceClient
 
 from dotenv import load_dotenv
 load_dotenv()
 import os
 
-os.environ["LANGCHAIN_TRACING_V2"] = "false"
-os.environ["LANGCHAIN_PROJECT"] = "uw-agent"
-
 st.set_page_config(page_title="Agent Underwriting Helper", layout="centered")
 st.title("Agent Underwriting Helper")
 
 LAST = -1
 
 
-def highlight_fired(row):
-    color = "#ffe6e6" if row["outcome"] == "FIRED" else "white"
-    return [f"background-color: {color}"] * len(row)
+@st.cache_resource
+def get_client() -> ServiceClient:
+    # Rules, graph and LLM clients live in uw_service (python uw_cli.py serve); this app only
+    # renders. One keep-alive connection pool per Streamlit server process.
+    return ServiceClient()
+
+
+client = get_client()
+
+# Older turns collapse behind "Show earlier"; each click reveals this many more messages
+RECENT_MESSAGES = int(os.environ.get("UW_UI_RECENT_MESSAGES", 20))
+
+
+def highlight_fired(df):
+    """Styler.apply(axis=None) callback: every cell's CSS in one vectorized pass, FIRED rows tinted."""
+    import numpy as np
+    import pandas as pd
+    fired = df["outcome"].to_numpy() == "FIRED"
+    css = np.where(fired, "background-color: #ffe6e6", "background-color: white")
+    return pd.DataFrame(np.repeat(css[:, None], df.shape[1], axis=1), index=df.index, columns=df.columns)
+
+
+def audit_table(audit):
+    import pandas as pd  # deferred until an audit table is actually rendered
+    return pd.DataFrame(audit["matchedRules"]).style.apply(highlight_fired, axis=None)
+
+
+def message_audits(msg):
+    """applicationId -> audit for a message: one per applicant evaluated in the turn (key None for a lone audit)."""
+    return msg.get("audits") or ({None: msg["audit"]} if msg.get("audit") else {})
+
+
+def show_audit(audit, msg=None, application_id=None):
+    # Styled tables are built once and kept on their message, per applicant; reruns reuse them
+    tables = msg.setdefault("tables", {}) if msg is not None else {}
+    table = tables.get(application_id)
+    if table is None:
+        table = tables[application_id] = audit_table(audit)
+    if application_id:
+        st.caption(f"Application {application_id}")
+    st.dataframe(table, use_container_width=True)
+
+
+def show_message(msg, collapsed=False):
+    with st.chat_message(msg["role"]):
+        st.markdown(msg["content"])
+        for application_id, audit in message_audits(msg).items():
+            if collapsed:
+                # Older audits render from HTML built once; st.dataframe would re-serialize them every rerun
+                html = msg.setdefault("tables_html", {}).get(application_id)
+                if html is None:
+                    html = msg["tables_html"][application_id] = audit_table(audit).hide(axis="index").to_html()
+                with st.expander(f"Matched rules: {application_id}" if application_id else "Matched rules"):
+                    st.html(html)
+            else:
+                show_audit(audit, msg, application_id)
 
 with st.sidebar:
     st.subheader("Session")
     if st.button("Clear chat", use_container_width=True):
         st.session_state.pop("messages", None)
+        st.session_state.pop("thread_id", None)
+        st.session_state.pop("shown_messages", None)
         st.rerun()
+    try:
+        health = client.health()
+    except Exception as e:
+        st.error(f"Service unavailable at {client.base_url}: {e}")
+    else:
+        st.caption(f"Rules {health['rulesVersion']} loaded from {health['rulesSource']} "
+                   f"in {health['rulesLoadSeconds'] * 1000:.1f} ms")
+        stats = health["llmCache"]
+        if stats is not None:
+            st.caption(f"LLM cache: {stats['hitRate']:.0%} hit rate, {stats['latencySavedMs'] / 1000:.1f} s saved")
+
+# Checkpointed graph session; follow-up questions keep the earlier turns' context
+if "thread_id" not in st.session_state:
+    st.session_state.thread_id = uuid.uuid4().hex
 
 # Adding an initial msg into the st session_state
 if "messages" not in st.session_state:
@@ -51,14 +116,19 @@ if "messages" not in st.session_state:
         }
     ]
 
-# displaying the messages of the session_state in ui
-for msg in st.session_state.messages:
-    with st.chat_message(msg["role"]):
-        st.markdown(msg["content"])
-        if msg.get("audit"):
-            audit=msg["audit"]
-            df = pd.DataFrame(audit["matchedRules"])
-            st.dataframe(df.style.apply(highlight_fired, axis=1), use_container_width=True)
+def show_earlier():
+    st.session_state.shown_messages += RECENT_MESSAGES
+
+
+# displaying the messages of the session_state in ui: the latest RECENT_MESSAGES, plus any
+# earlier pages the user opened; only the newest audit is shown as an interactive table
+messages = st.session_state.messages
+hidden = max(0, len(messages) - st.session_state.setdefault("shown_messages", RECENT_MESSAGES))
+if hidden:
+    st.button(f"Show earlier messages ({hidden} hidden)", on_click=show_earlier, use_container_width=True)
+last_audit = max((i for i, m in enumerate(messages) if message_audits(m)), default=-1)
+for i in range(hidden, len(messages)):
+    show_message(messages[i], collapsed=i != last_audit)
 
 prompt = st.chat_input("Ask a question about Underwriting...")
 
@@ -70,19 +140,52 @@ if prompt:
 
     with st.chat_message("assistant"):
         try:
-            with st.spinner("Retrieving docs and generating answer…"):
-                result = run_graph(prompt)
-                answer = str(result.get("answer", "")).strip() or "(No answer returned.)"
-                uw_audit = result.get("uw_audit", {})
-                st.markdown(answer)   # display the answer and audit information
-                if uw_audit:
-                    # audit = uw_audit["audit"]
-                    df = pd.DataFrame(uw_audit["matchedRules"])
-                    st.dataframe(df.style.apply(highlight_fired, axis=1), use_container_width=True)
-                # append the assistant answer to session state
-                st.session_state.messages.append(
-                    {"role": "assistant", "content": answer, "audit": uw_audit}
-                )
+            status = st.empty()
+            status.caption("Retrieving docs and generating answer…")
+            answer_box = st.container()   # tokens stream in here
+            audit_box = st.container()    # one audit table per applicant, as each tool result lands
+            final = {}
+            streamed_audits = {}
+            reply = {"role": "assistant"}
+
+            def answer_tokens():
+                for event in client.stream_chat(prompt, thread_id=st.session_state.thread_id):
+                    if event["type"] == "token":
+                        status.empty()
+                        yield event["content"]
+                    elif event["type"] == "tool_start":
+                        status.caption(f"Running `{event['name']}`…")
+                    elif event["type"] == "tool_end":
+                        status.caption("Explaining the decision…")
+                        if event["audit"]:
+                            application_id = event.get("applicationId") or event["id"]
+                            streamed_audits[application_id] = event["audit"]
+                            with audit_box:
+                                show_audit(event["audit"], reply, application_id)
+                    elif event["type"] == "done":
+                        final["done"] = event
+
+            with answer_box:
+                streamed = st.write_stream(answer_tokens())
+            status.empty()
+            result = final.get("done", {})
+            answer = str(result.get("answer") or streamed or "").strip() or "(No answer returned.)"
+            if not streamed:
+                answer_box.markdown(answer)
+            uw_audit = result.get("uw_audit", {})
+            run = result.get("uw_metrics")
+            if run:
+                status.caption(f"{run['totalMs'] / 1000:.1f} s, {run['llmCalls']} LLM calls, "
+                               f"{run['promptTokens'] + run['completionTokens']} tokens")
+            audits = ({k: d["audit"] for k, d in result.get("uw_decisions", {}).items()} or streamed_audits
+                      or ({None: uw_audit} if uw_audit else {}))
+            for application_id, audit in audits.items():
+                if application_id not in streamed_audits:
+                    with audit_box:
+                        show_audit(audit, reply, application_id)
+            # append the assistant answer to session state, with the tables built above
+            reply.update(content=answer, audit=uw_audit, audits=audits)
+            st.session_state.messages.append(reply)
         except Exception as e:
             st.error("Failed to generate a response.")
             st.exception(e)
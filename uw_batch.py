@@ -0,0 +1,262 @@
+"""Columnar batch evaluation for the rules engine.
+
+`evaluate_batch` runs the same rule chain as `uw_rules_engine.evaluate` over a
+whole book of applications. Date parsing, age/OE/GI math and the rule
+predicates are computed as pandas/NumPy array operations (dates as
+`datetime64[D]` arrays, see `uw_dates`); only the final per-row response
+dicts are built in Python.
+"""
+from __future__ import annotations
+from datetime import date
+from typing import Any, List, Sequence
+import numpy as np
+import pandas as pd
+
+from uw_models import EvaluateRequest
+import uw_rules_engine as engine
+from uw_config import RuleConfig
+from uw_decision_table import MACRA_CUTOFF, MACRA_PLANS
+from uw_dates import days_between_np, in_open_enrollment_np, parse_date, to_datetime64
+
+
+class _RowFacts:
+    """Decision-table facts for one row, precomputed by the columnar pass."""
+
+    __slots__ = ("state", "macra", "continuous_gi_state", "open_enrollment", "gi_type", "currently_on_ma")
+
+    def __init__(self, state, macra, continuous_gi_state, open_enrollment, gi_type, currently_on_ma):
+        self.state = state
+        self.macra = macra
+        self.continuous_gi_state = continuous_gi_state
+        self.open_enrollment = open_enrollment
+        self.gi_type = gi_type
+        self.currently_on_ma = currently_on_ma
+
+
+# Request fields the rule chain reads, as flattened column names
+_COLUMNS = (
+    "application.applicationId", "application.receivedDate",
+    "applicant.dateOfBirth", "applicant.state", "applicant.tobaccoUse", "applicant.heightInches",
+    "applicant.weightPounds", "applicant.partBEffectiveDate", "applicant.currentlyOnMA",
+    "applicant.medicareEligibilityDate",
+    "coverage.requestedPlanLetter", "coverage.priorCreditableCoverageMonths",
+    "coverage.gapSinceCreditableCoverageEndDays",
+    "giEvents", "health.conditions", "health.oxygenUse",
+)
+
+
+def _field(obj: Any, path: str) -> Any:
+    for key in path.split("."):
+        if obj is None:
+            return None
+        obj = obj.get(key) if isinstance(obj, dict) else getattr(obj, key, None)
+    if isinstance(obj, list) and obj and not isinstance(obj[0], (str, dict)):
+        obj = [o.model_dump() for o in obj]
+    return obj
+
+
+def _to_frame(batch: Any) -> pd.DataFrame:
+    """Normalize a batch into a flat frame with dotted columns (e.g. `applicant.state`)."""
+    if isinstance(batch, pd.DataFrame):
+        if "applicant" in batch.columns:
+            return _to_frame(batch.to_dict("records"))
+        return batch.reset_index(drop=True)
+    if hasattr(batch, "to_pandas") and hasattr(batch, "schema"):
+        # pyarrow.Table: flatten nested structs into dotted columns first
+        table = batch
+        while any(str(f.type).startswith("struct") for f in table.schema):
+            table = table.flatten()
+        return table.to_pandas()
+    rows = list(batch)
+    return pd.DataFrame({name: [_field(r, name) for r in rows] for name in _COLUMNS})
+
+
+def _col(frame: pd.DataFrame, name: str, default: Any = None) -> pd.Series:
+    if name in frame.columns:
+        col = frame[name]
+        return col.where(col.notna(), default) if default is not None else col
+    return pd.Series([default] * len(frame), index=frame.index, dtype=object)
+
+
+def _dates(col: pd.Series) -> np.ndarray:
+    return to_datetime64(col.to_numpy())
+
+
+def _values(frame: pd.DataFrame, name: str) -> list:
+    """Column as Python values with missing entries (None/NaN) as None."""
+    return [None if v is None or (isinstance(v, float) and np.isnan(v)) else v for v in _col(frame, name).tolist()]
+
+
+def _epoch_days(values: np.ndarray) -> List[int | None]:
+    days = values.astype("int64").tolist()
+    return [None if nat else d for d, nat in zip(days, np.isnat(values).tolist())]
+
+
+def _gi_day(value: str | date) -> int:
+    return engine._days(value if isinstance(value, date) else parse_date(value))
+
+
+def _request_rows(frame: pd.DataFrame, states: List[str], asof: np.ndarray, dob: np.ndarray, partb: np.ndarray,
+                  medicare_elig: np.ndarray, tobacco: np.ndarray, on_ma: List[bool], oxygen: np.ndarray,
+                  prior: np.ndarray, gap: np.ndarray) -> List[list]:
+    """`RequestRecord.to_row` layout for every row, built from the batch columns."""
+    gi_rows = [[[ev["type"], _gi_day(ev["triggeringDate"])] for ev in (events if events is not None else ())]
+               for events in _values(frame, "giEvents")]
+    conditions = [list(c) if c is not None else [] for c in _values(frame, "health.conditions")]
+    return [list(row) for row in zip(
+        _values(frame, "application.applicationId"), _epoch_days(asof), _epoch_days(dob), _epoch_days(partb),
+        _epoch_days(medicare_elig), states, tobacco.tolist(), _values(frame, "applicant.heightInches"),
+        _values(frame, "applicant.weightPounds"), on_ma, _values(frame, "coverage.requestedPlanLetter"),
+        prior.tolist(), gap.tolist(), gi_rows, conditions, oxygen.tolist())]
+
+
+def _gi_applies(gi_events: pd.Series, asof: np.ndarray, cfg: RuleConfig) -> List[str | None]:
+    """Type of the first GI event within lookback for each row, else None."""
+    rows, types, trigs = [], [], []
+    for i, events in enumerate(gi_events):
+        if events is None or (isinstance(events, float) and np.isnan(events)):
+            continue
+        for ev in events:
+            rows.append(i)
+            types.append(ev["type"])
+            trigs.append(ev["triggeringDate"])
+    first: List[str | None] = [None] * len(gi_events)
+    if not rows:
+        return first
+    diff = days_between_np(to_datetime64(trigs), asof[rows])
+    lookback = np.array([cfg.gi_lookback_days.get(t, cfg.default_lookback_days) for t in types])
+    for row, gi_type, hit in zip(rows, types, ((diff >= 0) & (diff <= lookback)).tolist()):
+        if hit and first[row] is None:
+            first[row] = gi_type
+    return first
+
+
+def _decline_hits(conditions: pd.Series, oxygen: np.ndarray, mask: np.ndarray, cfg: RuleConfig) -> List[List[str]]:
+    """R-410 decline hits for the rows selected by `mask`."""
+    matcher = cfg.decline_matcher
+    hits: List[List[str]] = [[] for _ in range(len(conditions))]
+    values = conditions.tolist()
+    for row in np.flatnonzero(mask).tolist():
+        conds = values[row]
+        if conds is not None and not isinstance(conds, float):
+            hits[row] = matcher.match(conds, oxygen[row])
+    return hits
+
+
+def _rating(tobacco: np.ndarray, height: np.ndarray, weight: np.ndarray, uw_required: np.ndarray):
+    measured = (height != 0) & (weight != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bmi = np.where(measured, (weight / 2.20462) / ((height * 0.0254) ** 2), 25)
+    cls = np.select(
+        [~uw_required, tobacco | (bmi >= 35), bmi >= 30],
+        ["PREFERRED", "RATED", "STANDARD"], "PREFERRED"
+    )
+    factor = np.select(
+        [~uw_required, tobacco | (bmi >= 35), bmi >= 30],
+        [1.0, 1.25, 1.10], 1.0
+    )
+    return cls.tolist(), factor.tolist()
+
+
+def evaluate_batch(batch: Sequence[EvaluateRequest] | Sequence[dict] | Any, store: bool = True,
+                   id_suffix: str = "") -> List[dict]:
+    """
+    Evaluate a book of applications in one columnar pass.
+
+    `batch` may be a list of `EvaluateRequest` models or plain request dicts,
+    a pandas DataFrame (nested request dicts or flattened `applicant.state`
+    style columns) or a pyarrow Table. Returns one response per row with the
+    same decision and audit the scalar `evaluate` tool would produce.
+    `id_suffix` is appended to the batch's decision-id stamp; parallel
+    workers pass a chunk number so their ids cannot collide.
+    """
+    frame = _to_frame(batch)
+    n = len(frame)
+    if n == 0:
+        return []
+    cfg = engine.get_rule_config()
+
+    asof = _dates(_col(frame, "application.receivedDate"))
+    dob = _dates(_col(frame, "applicant.dateOfBirth"))
+    partb = _dates(_col(frame, "applicant.partBEffectiveDate"))
+    medicare_elig = _dates(_col(frame, "applicant.medicareEligibilityDate"))
+    macra = medicare_elig >= np.datetime64(MACRA_CUTOFF)  # NaT compares False
+
+    states = _col(frame, "applicant.state", "").astype(str).str.upper()
+
+    # R-600 -> R-100 -> R-200 -> R-300 -> R-400: facts as columns, precedence from the compiled decision table
+    continuous = states.isin(cfg.continuous_gi_states).tolist()
+    oe = in_open_enrollment_np(dob, partb, asof).tolist()
+    gi_types = _gi_applies(_col(frame, "giEvents"), asof, cfg)
+    on_ma = _col(frame, "applicant.currentlyOnMA", False).astype(bool).tolist()
+    table = cfg.decision_table
+    states = states.tolist()
+    chain = [table.decide(_RowFacts(*row)) for row in zip(states, macra.tolist(), continuous, oe, gi_types, on_ma)]
+    decisions = [decision or engine._undecided() for decision, _ in chain]
+    status = np.array([d["status"] for d in decisions], dtype=object)
+    uw_required = np.array([d["underwritingRequired"] for d in decisions], dtype=bool)
+
+    # R-700 / R-410 inputs
+    r700 = _col(frame, "coverage.requestedPlanLetter").isin(MACRA_PLANS).to_numpy() & macra
+    accept = (status == "ACCEPT_NO_UW") | (status == "ACCEPT_WITH_UW")
+    oxygen = _col(frame, "health.oxygenUse", False).astype(bool).to_numpy()
+    r410_eval = uw_required & (status != "PENDED") & ~(r700 & accept)
+    decline = _decline_hits(_col(frame, "health.conditions"), oxygen, r410_eval, cfg)
+
+    # R-500 inputs
+    prior = pd.to_numeric(_col(frame, "coverage.priorCreditableCoverageMonths", 0)).fillna(0).astype(int).to_numpy()
+    gap = pd.to_numeric(_col(frame, "coverage.gapSinceCreditableCoverageEndDays", 0)).fillna(0).astype(int).to_numpy()
+    no_wait = (gap <= cfg.default_lookback_days) & (prior >= 6)
+    wp_months = np.where(no_wait, 0, np.maximum(0, 6 - prior)).tolist()
+
+    tobacco = _col(frame, "applicant.tobaccoUse", False).astype(bool).to_numpy()
+    height = pd.to_numeric(_col(frame, "applicant.heightInches", 0)).fillna(0).to_numpy(dtype=float)
+    weight = pd.to_numeric(_col(frame, "applicant.weightPounds", 0)).fillna(0).to_numpy(dtype=float)
+    rg_class, rg_factor = _rating(tobacco, height, weight, uw_required)
+
+    stamp = engine._new_decision_id(id_suffix)
+    evaluated_at = engine._utc_timestamp()
+    responses = []
+    for i, decision in enumerate(decisions):
+        audit = chain[i][1]
+
+        # R-700
+        if r700[i]:
+            audit.append({"ruleId": "R-700", "outcome": "FIRED", "details": "Requested C/F not allowed for newly eligible."})
+            if decision["status"] in ("ACCEPT_NO_UW", "ACCEPT_WITH_UW"):
+                decision["status"] = "PENDED"
+                decision.setdefault("requestsForInformation", [])
+                decision["reasons"].append({"code": "R-700", "message": "Requested plan not available for newly eligible (MACRA). Suggest G/HDG."})
+        else:
+            audit.append({"ruleId": "R-700", "outcome": "SKIPPED", "details": "MACRA not applicable to requested plan."})
+
+        # R-410
+        if r410_eval[i]:
+            if decline[i]:
+                decision["status"] = "DECLINE"
+                decision["reasons"].insert(0, {"code": "R-410", "message": "Automatic decline based on health conditions."})
+                audit.append({"ruleId": "R-410", "outcome": "FIRED", "details": f"Decline hits: {decline[i]}"})
+            else:
+                audit.append({"ruleId": "R-410", "outcome": "SKIPPED", "details": "No automatic decline condition matched."})
+
+        # R-500
+        if decision["status"] == "ACCEPT_NO_UW":
+            decision["waitingPeriod"] = {"applies": False, "months": 0, "reason": None}
+            audit.append({"ruleId": "R-500", "outcome": "SKIPPED", "details": "Waiting period months=0"})
+        elif decision["status"] == "ACCEPT_WITH_UW":
+            months = wp_months[i]
+            decision["waitingPeriod"] = {
+                "applies": months > 0, "months": months,
+                "reason": "Pre-existing condition waiting period per federal baseline" if months > 0 else None
+            }
+            audit.append({"ruleId": "R-500", "outcome": "FIRED" if months > 0 else "SKIPPED", "details": f"Waiting period months={months}"})
+
+        decision["ratingGuidance"] = {"class": rg_class[i], "suggestedFactor": rg_factor[i]}
+
+        responses.append(engine._assemble_response(f"{stamp}-{i:06d}", decision, audit, cfg.version, evaluated_at))
+    if store:
+        rows = _request_rows(frame, states, asof, dob, partb, medicare_elig, tobacco, on_ma, oxygen, prior, gap)
+        engine.get_decision_store().put_many(responses, [
+            (row, engine.decision_dependencies(row[5], [gi_type for gi_type, _ in row[13]], row[14], chain[i][1]))
+            for i, row in enumerate(rows)])
+    return responses
@@ -0,0 +1,352 @@
+"""Parallel bulk evaluation: stream a JSONL/CSV book of applications through the rules engine.
+
+    python uw_cli.py batch applications.jsonl --output decisions.jsonl [--workers 8]
+    python uw_cli.py batch book.csv --output decisions.parquet --resume
+
+Input records are read lazily in chunks of `chunk_size` and sent to a
+`ProcessPoolExecutor` as raw JSONL lines or CSV row dicts, so pydantic
+validation happens in the workers, which then run `uw_batch.evaluate_batch`
+on the chunk. Each worker installs the parent's compiled `RuleConfig` once,
+from the pool initializer. Workers return ready-to-write JSONL bytes or
+Parquet columns, and the parent writes them in input order with at most
+`2 * workers` chunks in flight, so memory stays flat for any input size.
+
+CSV headers are dotted request paths (`applicant.state`); list and object
+cells (`giEvents`, `health.conditions`) hold JSON. Parquet output is a
+directory of `part-NNNNN.parquet` files (read it with `pd.read_parquet`).
+
+Rejected records (bad JSON, schema errors) go to `<output>.errors.jsonl` with
+their 1-based record number. `<output>.checkpoint.json` records, after every
+written chunk (JSONL) or closed part file (Parquet), how many input records
+are done, the last applicationId and the output sizes. `resume=True` checks
+that the input still has that applicationId at that position, drops any
+partial tail and carries on from the next record.
+
+`trusted=True` is for JSONL produced by an upstream system that already
+validated it against `EvaluateRequest`: lines are only JSON-decoded and go
+to `evaluate_batch` as plain dicts, skipping pydantic. Malformed JSON is
+still rejected; schema errors are not detected. CSV is always validated,
+since its cells need coercion.
+"""
+from __future__ import annotations
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator, List, Tuple
+
+CHUNK_SIZE = 2000
+PART_ROWS = 250_000
+CHECKPOINT_FORMAT = 1
+
+
+@dataclass
+class BulkResult:
+    records: int = 0   # input records done, including those a resumed run skipped
+    errors: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        return (self.records - self.skipped) / self.seconds if self.seconds else 0.0
+
+
+def _input_format(path: Path, fmt: str | None) -> str:
+    fmt = fmt or ("csv" if path.suffix.lower() == ".csv" else "jsonl")
+    if fmt not in ("jsonl", "csv"):
+        raise ValueError(f"unknown input format {fmt!r}; expected jsonl or csv")
+    return fmt
+
+
+def _output_format(path: Path, fmt: str | None) -> str:
+    fmt = fmt or ("parquet" if path.suffix.lower() == ".parquet" else "jsonl")
+    if fmt not in ("jsonl", "parquet"):
+        raise ValueError(f"unknown output format {fmt!r}; expected jsonl or parquet")
+    return fmt
+
+
+def _records(path: Path, fmt: str) -> Iterator[Any]:
+    """Raw input records: JSONL lines as bytes, CSV rows as flat dicts."""
+    if fmt == "csv":
+        with path.open(newline="", encoding="utf-8") as fh:
+            yield from csv.DictReader(fh)
+        return
+    with path.open("rb") as fh:
+        for line in fh:
+            if line.strip():
+                yield line
+
+
+def _application_id(record: Any, fmt: str) -> str | None:
+    try:
+        if fmt == "csv":
+            return record.get("application.applicationId") or None
+        return json.loads(record)["application"]["applicationId"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _unflatten(row: dict) -> dict:
+    out: dict = {}
+    for key, value in row.items():
+        if key is None or value is None or value == "":
+            continue
+        if value[0] in "[{":  # list/object cells (giEvents, health.conditions, ...) hold JSON
+            value = json.loads(value)
+        *parents, leaf = key.split(".")
+        node = out
+        for name in parents:
+            node = node.setdefault(name, {})
+        node[leaf] = value
+    return out
+
+
+# -- worker side --------------------------------------------------------------
+
+def _init_worker(cfg) -> None:
+    import uw_rules_engine
+    uw_rules_engine.install_rule_config(cfg)
+
+
+def _parquet_columns(ids: List[str], responses: List[dict]) -> dict:
+    return {
+        "applicationId": ids,
+        "decisionId": [r["decisionId"] for r in responses],
+        "status": [r["status"] for r in responses],
+        "underwritingRequired": [r["underwritingRequired"] for r in responses],
+        "reasonCodes": [[reason["code"] for reason in r["reasons"]] for r in responses],
+        "allowedPlanLetters": [r["planRestrictions"]["allowedPlanLetters"] for r in responses],
+        "configVersion": [r["audit"]["configVersion"] for r in responses],
+        "evaluatedAt": [r["audit"]["evaluatedAt"] for r in responses],
+        "decision": [json.dumps({k: v for k, v in r.items() if k != "audit"}) for r in responses],
+        "audit": [json.dumps(r["audit"]["matchedRules"]) for r in responses],
+    }
+
+
+def _evaluate_chunk(index: int, first: int, records: List[Any], fmt: str, output: str,
+                    trusted: bool = False) -> Tuple[Any, List[dict]]:
+    """Validate and evaluate one chunk; returns the encoded output and the rejected records."""
+    import orjson
+    from pydantic import ValidationError
+    from uw_batch import evaluate_batch
+    from uw_models import REQUEST_ADAPTER
+
+    requests, errors = [], []
+    for number, record in enumerate(records, first):
+        try:
+            if fmt == "csv":
+                requests.append(REQUEST_ADAPTER.validate_python(_unflatten(record)))
+            elif trusted:
+                requests.append(orjson.loads(record))
+            else:
+                requests.append(REQUEST_ADAPTER.validate_json(record))
+        except ValidationError as ex:
+            errors.append({"record": number, "applicationId": _application_id(record, fmt),
+                           "error": ex.errors(include_url=False, include_context=False, include_input=False)})
+        except ValueError as ex:
+            errors.append({"record": number, "applicationId": _application_id(record, fmt), "error": str(ex)})
+
+    responses = evaluate_batch(requests, store=False, id_suffix=f"-{index:06d}")
+    ids = [r["application"]["applicationId"] if trusted and fmt != "csv" else r.application.applicationId
+           for r in requests]
+    if output == "parquet":
+        return _parquet_columns(ids, responses), errors
+    lines = [json.dumps({"applicationId": app_id, **response}) for app_id, response in zip(ids, responses)]
+    return ("\n".join(lines) + "\n").encode() if lines else b"", errors
+
+
+# -- parent side --------------------------------------------------------------
+
+def _open_truncated(path: Path, size: int | None) -> BinaryIO:
+    if size is None or not path.exists():
+        return path.open("wb")
+    fh = path.open("r+b")
+    fh.truncate(size)
+    fh.seek(0, os.SEEK_END)
+    return fh
+
+
+class _JsonlSink:
+    def __init__(self, path: Path, state: dict | None, part_rows: int):
+        self.fh = _open_truncated(path, state["outputBytes"] if state else None)
+
+    def write(self, payload: bytes) -> None:
+        self.fh.write(payload)
+
+    def commit(self) -> dict | None:
+        self.fh.flush()
+        return {"outputBytes": self.fh.tell()}
+
+    def close(self) -> dict:
+        state = self.commit()
+        self.fh.close()
+        return state
+
+    def abort(self) -> None:
+        self.fh.close()
+
+
+class _ParquetSink:
+    """Row group per chunk; a checkpoint can only land on a closed part file."""
+
+    def __init__(self, path: Path, state: dict | None, part_rows: int):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as ex:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)") from ex
+        self.pa, self.pq = pa, pq
+        self.schema = pa.schema([
+            ("applicationId", pa.string()), ("decisionId", pa.string()), ("status", pa.string()),
+            ("underwritingRequired", pa.bool_()), ("reasonCodes", pa.list_(pa.string())),
+            ("allowedPlanLetters", pa.list_(pa.string())), ("configVersion", pa.string()),
+            ("evaluatedAt", pa.string()), ("decision", pa.string()), ("audit", pa.string()),
+        ])
+        self.path = path
+        self.part_rows = part_rows
+        self.parts = state["parts"] if state else 0
+        self.writer = None
+        self.rows = 0
+        path.mkdir(parents=True, exist_ok=True)
+        for part in path.glob("part-*.parquet"):
+            if int(part.stem[5:]) >= self.parts:
+                part.unlink()
+
+    def write(self, columns: dict) -> None:
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path / f"part-{self.parts:05d}.parquet", self.schema)
+        table = self.pa.table(columns, schema=self.schema)
+        self.writer.write_table(table)
+        self.rows += table.num_rows
+
+    def _close_part(self) -> dict:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            self.parts += 1
+            self.rows = 0
+        return {"parts": self.parts}
+
+    def commit(self) -> dict | None:
+        return self._close_part() if self.rows >= self.part_rows else None
+
+    def close(self) -> dict:
+        return self._close_part()
+
+    def abort(self) -> None:
+        # The unfinished part is past the checkpoint; a resumed run deletes it
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _read_checkpoint(path: Path) -> dict | None:
+    if not path.exists():
+        return None
+    state = json.loads(path.read_text())
+    return state if state.get("format") == CHECKPOINT_FORMAT else None
+
+
+def _write_checkpoint(path: Path, state: dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state, indent=1))
+    tmp.replace(path)
+
+
+def run_bulk(input_path: str | Path, output_path: str | Path, *, input_format: str | None = None,
+             output_format: str | None = None, workers: int | None = None, chunk_size: int = CHUNK_SIZE,
+             part_rows: int = PART_ROWS, resume: bool = False, snapshot: str | Path | None = None,
+             progress: Callable[[BulkResult], None] | None = None, trusted: bool = False) -> BulkResult:
+    """
+    Evaluate every record in `input_path` and write the responses, in input
+    order, to `output_path`. `workers=1` evaluates in-process (no IPC);
+    `None` uses every core. `snapshot` is a rule-config snapshot path as for
+    `load_rule_config`. `progress` is called after each written chunk.
+    `trusted` skips pydantic validation of JSONL records (see module doc).
+    """
+    import uw_rules_engine as engine
+    from uw_config import load_rule_config
+
+    input_path, output_path = Path(input_path), Path(output_path)
+    fmt = _input_format(input_path, input_format)
+    out_fmt = _output_format(output_path, output_format)
+    workers = workers or os.cpu_count() or 1
+    checkpoint_path = output_path.with_name(output_path.name + ".checkpoint.json")
+    errors_path = output_path.with_name(output_path.name + ".errors.jsonl")
+    cfg = load_rule_config(snapshot=snapshot) if snapshot else engine.get_rule_config()
+
+    state = _read_checkpoint(checkpoint_path) if resume else None
+    if state and (state["input"], state["outputFormat"]) != (str(input_path.resolve()), out_fmt):
+        raise ValueError(f"{checkpoint_path} belongs to a different input or output format; rerun without resume")
+    if state and state["configVersion"] != cfg.version:
+        raise ValueError(f"rule config changed since {checkpoint_path} was written; rerun without resume")
+
+    records = _records(input_path, fmt)
+    result = BulkResult()
+    if state and state["records"]:
+        deque(islice(records, state["records"] - 1), maxlen=0)
+        last = next(records, None)
+        if last is None or _application_id(last, fmt) != state["lastApplicationId"]:
+            raise ValueError(f"input no longer has applicationId {state['lastApplicationId']!r} at record "
+                             f"{state['records']}; rerun without resume")
+        result = BulkResult(records=state["records"], errors=state["errors"], skipped=state["records"])
+    last_id = state["lastApplicationId"] if state else None
+
+    sink = (_ParquetSink if out_fmt == "parquet" else _JsonlSink)(output_path, state, part_rows)
+    errors_fh = _open_truncated(errors_path, state["errorBytes"] if state else None)
+
+    def checkpoint(sink_state: dict) -> None:
+        errors_fh.flush()
+        _write_checkpoint(checkpoint_path, {
+            "format": CHECKPOINT_FORMAT, "input": str(input_path.resolve()), "outputFormat": out_fmt,
+            "configVersion": cfg.version, "records": result.records, "lastApplicationId": last_id,
+            "errors": result.errors, "errorBytes": errors_fh.tell(), **sink_state,
+        })
+
+    started = time.perf_counter()
+    # A single worker runs in this process: same code path, no pickling
+    pool_cls = ProcessPoolExecutor if workers > 1 else ThreadPoolExecutor
+    pending: deque = deque()
+    try:
+        with pool_cls(max_workers=workers, initializer=_init_worker, initargs=(cfg,)) as pool:
+            def drain() -> None:
+                nonlocal last_id
+                future, count, chunk_last_id = pending.popleft()
+                payload, errors = future.result()
+                sink.write(payload)
+                for error in errors:
+                    errors_fh.write(json.dumps(error).encode() + b"\n")
+                result.records += count
+                result.errors += len(errors)
+                last_id = chunk_last_id
+                sink_state = sink.commit()
+                if sink_state is not None:
+                    checkpoint(sink_state)
+                if progress:
+                    result.seconds = time.perf_counter() - started
+                    progress(result)
+
+            try:
+                first = result.records + 1
+                for index, chunk in enumerate(iter(lambda: list(islice(records, chunk_size)), [])):
+                    future = pool.submit(_evaluate_chunk, index, first, chunk, fmt, out_fmt, trusted)
+                    pending.append((future, len(chunk), _application_id(chunk[-1], fmt)))
+                    first += len(chunk)
+                    if len(pending) >= 2 * workers:
+                        drain()
+                while pending:
+                    drain()
+            except BaseException:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+        checkpoint(sink.close())
+    finally:
+        errors_fh.close()
+        sink.abort()
+    result.seconds = time.perf_counter() - started
+    return result
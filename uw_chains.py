@@ -1,8 +1,8 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_openai import ChatOpenAI
+from functools import lru_cache
+import hashlib
+import json
 import os
-from uw_rules_engine import uw_tools
-from langgraph.graph import MessagesState
 
 uw_prompt = ChatPromptTemplate.from_messages(
     [
@@ -20,6 +20,8 @@ uw_prompt = ChatPromptTemplate.from_messages(
             "If the user’s request is incomplete, ask clarifying questions."
             "If the user provides all required fields, proceed with the tool call."
             "If the user provides contradictory or ambiguous data, ask for clarification."
+            "If the user describes several applicants, call evaluate once per applicant, all in the same response,"
+            " rather than one applicant at a time; then explain each decision by applicationId."
             "Explain"
             "- Whether this sounds like Open Enrollment, Guaranteed Issue, or Underwritten"
             "- Any key considerations or typical knock-out conditions"
@@ -30,5 +32,98 @@ uw_prompt = ChatPromptTemplate.from_messages(
     ]
 )
 
-uw_llm = ChatOpenAI(model=os.environ.get("GPT_MODEL"), temperature=0, api_key=os.environ.get("OPENAI_API_KEY")).bind_tools(uw_tools)
-uw_chain = uw_prompt | uw_llm
\ No newline at end of file
+
+@lru_cache(maxsize=1)
+def get_http_clients():
+    """
+    Process-wide pooled HTTP clients for the chat model (keep-alive, bounded pool).
+
+    UW_LLM_MAX_CONNECTIONS / UW_LLM_MAX_KEEPALIVE / UW_LLM_TIMEOUT tune the pool.
+    The async client is bound to the event loop that first uses it, so async
+    callers should share one long-lived loop (e.g. the ASGI worker's).
+    """
+    import httpx
+    limits = httpx.Limits(
+        max_connections=int(os.environ.get("UW_LLM_MAX_CONNECTIONS", 100)),
+        max_keepalive_connections=int(os.environ.get("UW_LLM_MAX_KEEPALIVE", 20)),
+    )
+    timeout = httpx.Timeout(float(os.environ.get("UW_LLM_TIMEOUT", 60)), connect=10.0)
+    return httpx.Client(limits=limits, timeout=timeout), httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+@lru_cache(maxsize=1)
+def get_chat_model():
+    """Shared ChatOpenAI client; langchain_openai is imported and the client built on first use."""
+    from langchain_openai import ChatOpenAI
+    http_client, http_async_client = get_http_clients()
+    return ChatOpenAI(model=os.environ.get("GPT_MODEL"), temperature=0, api_key=os.environ.get("OPENAI_API_KEY"),
+                      http_client=http_client, http_async_client=http_async_client)
+
+
+@lru_cache(maxsize=1)
+def get_uw_llm():
+    """Chat model with the UW tools bound; one response may call evaluate for several applicants."""
+    from uw_rules_engine import uw_tools
+    return get_chat_model().bind_tools(uw_tools, parallel_tool_calls=True)
+
+
+@lru_cache(maxsize=1)
+def get_uw_chain():
+    return uw_prompt | get_uw_llm()
+
+
+def prompt_version() -> str:
+    """Short hash of the agent prompt and tool schemas; part of every LLM cache key."""
+    from langchain_core.utils.function_calling import convert_to_openai_tool
+    from uw_rules_engine import uw_tools
+    text = json.dumps([uw_prompt.messages[0].prompt.template,
+                       [convert_to_openai_tool(t) for t in uw_tools]], sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache():
+    """Process-wide LLM response cache, or None when UW_LLM_CACHE_DB is empty."""
+    from uw_llm_cache import default_llm_cache
+    return default_llm_cache()
+
+
+@lru_cache(maxsize=1)
+def get_agent_chain():
+    """`uw_chain` behind the LLM response cache (when enabled); used by the agent node."""
+    cache = get_llm_cache()
+    if cache is None:
+        return get_uw_chain()
+    from uw_llm_cache import CachedChain
+    from uw_rules_engine import get_rule_config
+    return CachedChain(get_uw_chain(), cache, model=get_chat_model().model_name,
+                       prompt_version=prompt_version(), config_version=lambda: get_rule_config().version)
+
+
+uw_narrative_prompt = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            "You are a Medicare Supplement underwriting assistant for internal agents."
+            "Explain the underwriting decision below to the agent in a few short paragraphs."
+            "Use only the facts in the decision and its audit; do not create new underwriting rules."
+            "Do not promise approval; say 'typically' or 'subject to underwriting review'.",
+        ),
+        ("human", "Decision:\n{decision}"),
+    ]
+)
+
+
+@lru_cache(maxsize=1)
+def get_narrative_chain():
+    """Tool-free chain that turns an evaluate response into a narrative explanation."""
+    return uw_narrative_prompt | get_chat_model()
+
+
+def __getattr__(name):
+    # `uw_llm` / `uw_chain` used to be built at import time; keep them importable, lazily
+    if name == "uw_llm":
+        return get_uw_llm()
+    if name == "uw_chain":
+        return get_uw_chain()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,250 @@
+"""Command-line entry point for uw-agent maintenance tasks.
+
+    python uw_cli.py draw-graph [--output uw_flow.png] [--mermaid]
+    python uw_cli.py importtime [--module uw_graph_flow ...]
+    python uw_cli.py evaluate request.json [--narrative] [--json]
+    python uw_cli.py perf [--save] [-- PYTEST_ARGS]
+    python uw_cli.py batch applications.jsonl --output decisions.jsonl [--workers N] [--resume]
+    python uw_cli.py ingest dump.jsonl[.gz] --output decisions.jsonl [--batch-size N]
+    python uw_cli.py serve [--host 127.0.0.1] [--port 8000] [--workers N]
+    python uw_cli.py reevaluate OLD_DATA_DIR [--data data/] [--apply] [--output report.json]
+"""
+from __future__ import annotations
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import tomllib
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent
+
+
+def draw_graph(args: argparse.Namespace) -> int:
+    from uw_graph_flow import build_graph
+    graph = build_graph().get_graph()
+    if args.mermaid:
+        print(graph.draw_mermaid())
+        return 0
+    # Renders through the mermaid.ink web service
+    graph.draw_mermaid_png(output_file_path=args.output)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+def _tool_config() -> dict:
+    with (ROOT / "pyproject.toml").open("rb") as fh:
+        return tomllib.load(fh).get("tool", {}).get("uw-agent", {})
+
+
+def import_budgets() -> Dict[str, float]:
+    return _tool_config().get("import-budget-ms", {})
+
+
+def measure_import_ms(module: str) -> float:
+    """Cumulative import time of `module` in a fresh interpreter, from `python -X importtime`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    for line in reversed(proc.stderr.splitlines()):
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"no importtime record for {module}")
+
+
+def importtime(args: argparse.Namespace) -> int:
+    budgets = import_budgets()
+    modules: List[str] = args.module or list(budgets)
+    failed = False
+    for module in modules:
+        took = min(measure_import_ms(module) for _ in range(args.repeat))
+        budget = budgets.get(module)
+        status = "" if budget is None else ("ok" if took <= budget else "OVER BUDGET")
+        failed |= status == "OVER BUDGET"
+        print(f"{module:<24} {took:>8.1f} ms  budget {budget if budget is not None else '-':>6}  {status}")
+    return 1 if failed else 0
+
+
+def evaluate(args: argparse.Namespace) -> int:
+    from uw_fast_path import evaluate_structured
+    payload = sys.stdin.read() if args.request == "-" else Path(args.request).read_text()
+    result = evaluate_structured(payload, narrative=args.narrative)
+    print(json.dumps(result["decision"], indent=2) if args.json else result["answer"])
+    return 0
+
+
+def _medians(report: dict) -> Dict[str, float]:
+    return {b["fullname"]: b["stats"]["median"] for b in report["benchmarks"]}
+
+
+def perf(args: argparse.Namespace) -> int:
+    """Run the pytest-benchmark suite and compare medians with the stored baseline."""
+    cfg = _tool_config().get("perf", {})
+    baseline = ROOT / cfg.get("baseline", "benchmarks/baselines/baseline.json")
+    threshold = float(cfg.get("regression-percent", 25))
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "run.json"
+        code = subprocess.call([sys.executable, "-m", "pytest", "-q", f"--benchmark-json={out}", *args.pytest_args],
+                               cwd=ROOT)
+        if code != 0:
+            return code
+        report = json.loads(out.read_text())
+    if args.save:
+        baseline.parent.mkdir(parents=True, exist_ok=True)
+        keep = ("min", "median", "mean", "stddev", "rounds")
+        report = {"machine_info": report["machine_info"], "datetime": report["datetime"], "benchmarks": [
+            {"fullname": b["fullname"], "stats": {k: b["stats"][k] for k in keep}} for b in report["benchmarks"]]}
+        baseline.write_text(json.dumps(report, indent=1, sort_keys=True) + "\n")
+        print(f"Saved baseline to {baseline.relative_to(ROOT)}")
+        return 0
+    if not baseline.exists():
+        print(f"No baseline at {baseline.relative_to(ROOT)}; record one with --save")
+        return 1
+    old, new = _medians(json.loads(baseline.read_text())), _medians(report)
+    failed = False
+    for name in sorted(new):
+        if name not in old:
+            print(f"{name:<64} {new[name] * 1e6:>10.1f} us  (new)")
+            continue
+        change = (new[name] / old[name] - 1) * 100
+        status = "REGRESSION" if change > threshold else ""
+        failed |= bool(status)
+        print(f"{name:<64} {new[name] * 1e6:>10.1f} us  {change:+6.1f}%  {status}")
+    return 1 if failed else 0
+
+
+def batch(args: argparse.Namespace) -> int:
+    from uw_bulk import run_bulk
+    last = [0.0]
+
+    def progress(result) -> None:
+        now = time.monotonic()
+        if now - last[0] >= 1.0:
+            last[0] = now
+            print(f"\r{result.records:,} records  {result.errors:,} rejected  {result.records_per_second:,.0f}/s",
+                  end="", file=sys.stderr, flush=True)
+
+    try:
+        result = run_bulk(args.input, args.output, input_format=args.input_format, output_format=args.output_format,
+                          workers=args.workers, chunk_size=args.chunk_size, resume=args.resume,
+                          snapshot=args.snapshot, progress=None if args.quiet else progress, trusted=args.trusted)
+    except ValueError as ex:
+        print(f"batch: {ex}", file=sys.stderr)
+        return 2
+    if not args.quiet:
+        print(file=sys.stderr)
+    resumed = f" (resumed after {result.skipped:,})" if result.skipped else ""
+    print(f"{result.records:,} records{resumed}, {result.errors:,} rejected, "
+          f"{result.seconds:.1f}s ({result.records_per_second:,.0f}/s) -> {args.output}")
+    return 0
+
+
+def ingest(args: argparse.Namespace) -> int:
+    from uw_ingest import ingest as run_ingest
+    stats = run_ingest(args.input, args.output, batch_size=args.batch_size, dead_letter=args.dead_letter,
+                       store=args.store, trusted=args.trusted)
+    print(f"{stats.rows:,} rows, {stats.rejected:,} rejected, {stats.seconds:.1f}s "
+          f"({stats.rows_per_second:,.0f}/s, {stats.blocked_seconds:.1f}s waiting on output) -> {args.output}")
+    return 0
+
+
+def serve(args: argparse.Namespace) -> int:
+    import uvicorn
+    uvicorn.run("uw_service:app", host=args.host, port=args.port, workers=args.workers,
+                timeout_keep_alive=args.keep_alive, timeout_graceful_shutdown=args.graceful_shutdown,
+                access_log=not args.no_access_log)
+    return 0
+
+
+def reevaluate(args: argparse.Namespace) -> int:
+    from uw_config import load_rule_config
+    from uw_reevaluate import reevaluate as run_reevaluate
+    from uw_rules_engine import get_decision_store
+    old, new = load_rule_config(args.old_data), load_rule_config(args.data)
+    report = run_reevaluate(old, new, apply=args.apply)
+    get_decision_store().flush()
+    keys = "every decision (decision table changed)" if report.keys is None else f"{len(report.keys)} keys"
+    print(f"{old.version} -> {new.version}: {keys}, {report.candidates:,} candidates, "
+          f"{report.reevaluated:,} re-evaluated, {len(report.changes):,} changed, {report.missing:,} missing, "
+          f"{report.errors:,} errors, {report.seconds:.2f}s", file=sys.stderr)
+    body = json.dumps(report.as_dict(), indent=2)
+    if args.output:
+        Path(args.output).write_text(body + "\n")
+    else:
+        print(body)
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="uw-agent")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("draw-graph", help="Render the agent graph diagram")
+    p.add_argument("--output", default=str(ROOT / "uw_flow.png"))
+    p.add_argument("--mermaid", action="store_true", help="Print mermaid source instead of rendering a PNG")
+    p.set_defaults(func=draw_graph)
+
+    p = sub.add_parser("importtime", help="Check module import times against the budget in pyproject.toml")
+    p.add_argument("--module", action="append", help="Module to measure (default: every budgeted module)")
+    p.add_argument("--repeat", type=int, default=3, help="Take the best of N fresh interpreters")
+    p.set_defaults(func=importtime)
+
+    p = sub.add_parser("evaluate", help="Evaluate a JSON EvaluateRequest directly, without the agent")
+    p.add_argument("request", help="Path to the request JSON, or - for stdin")
+    p.add_argument("--narrative", action="store_true", help="Have the chat model write the explanation")
+    p.add_argument("--json", action="store_true", help="Print the full decision JSON instead of the explanation")
+    p.set_defaults(func=evaluate)
+
+    p = sub.add_parser("perf", help="Run the benchmark suite and fail on regressions against the stored baseline")
+    p.add_argument("--save", action="store_true", help="Store this run as the new baseline instead of comparing")
+    p.add_argument("pytest_args", nargs="*", help="Extra pytest arguments (after --)")
+    p.set_defaults(func=perf)
+
+    p = sub.add_parser("batch", help="Evaluate a JSONL/CSV file of requests across worker processes")
+    p.add_argument("input", help="JSONL (one EvaluateRequest per line) or CSV with dotted column names")
+    p.add_argument("--output", required=True, help="JSONL file, or a .parquet directory of part files")
+    p.add_argument("--input-format", choices=("jsonl", "csv"), help="Default: from the input file extension")
+    p.add_argument("--output-format", choices=("jsonl", "parquet"), help="Default: from the output extension")
+    p.add_argument("--workers", type=int, help="Worker processes (default: every core; 1 runs in-process)")
+    p.add_argument("--chunk-size", type=int, default=2000, help="Records per worker task")
+    p.add_argument("--snapshot", help="Rule-config snapshot to load (and write when stale)")
+    p.add_argument("--resume", action="store_true", help="Continue from <output>.checkpoint.json")
+    p.add_argument("--quiet", action="store_true", help="No progress line on stderr")
+    p.add_argument("--trusted", action="store_true", help="JSONL input is already validated upstream; skip pydantic")
+    p.set_defaults(func=batch)
+
+    p = sub.add_parser("ingest", help="Stream a JSONL dump through the rules engine in one process, in bounded memory")
+    p.add_argument("input", help="JSONL/NDJSON file of EvaluateRequests (.gz is decompressed on the fly)")
+    p.add_argument("--output", required=True, help="JSONL file for the responses")
+    p.add_argument("--batch-size", type=int, default=1000, help="Requests per evaluate_batch call")
+    p.add_argument("--dead-letter", help="File for malformed rows (default: <output>.errors.jsonl)")
+    p.add_argument("--store", action="store_true", help="Also keep the decisions in the decision store")
+    p.add_argument("--trusted", action="store_true", help="Input is already validated upstream; skip pydantic")
+    p.set_defaults(func=ingest)
+
+    p = sub.add_parser("serve", help="Run the HTTP service (uw_service) under uvicorn")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--workers", type=int, default=1, help="Worker processes, each with its own rules and graph")
+    p.add_argument("--keep-alive", type=int, default=30, help="Seconds an idle client connection is kept open")
+    p.add_argument("--graceful-shutdown", type=int, default=30,
+                   help="Seconds to drain in-flight requests on SIGTERM before closing connections")
+    p.add_argument("--no-access-log", action="store_true", help="Skip the per-request log line")
+    p.set_defaults(func=serve)
+
+    p = sub.add_parser("reevaluate", help="Re-run the stored decisions a rule-data change can affect")
+    p.add_argument("old_data", help="Data directory with the rule files the decisions were made under")
+    p.add_argument("--data", default=str(ROOT / "data"), help="Data directory with the new rule files")
+    p.add_argument("--apply", action="store_true", help="Write the re-evaluated decisions back to the store")
+    p.add_argument("--output", help="Write the change report JSON here instead of stdout")
+    p.set_defaults(func=reevaluate)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
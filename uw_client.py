@@ -0,0 +1,89 @@
+"""Thin HTTP client for `uw_service`, used by the Streamlit app.
+
+    client = ServiceClient()          # UW_SERVICE_URL, default http://127.0.0.1:8000
+    client.evaluate(request)          # EvaluateRequest, dict or JSON text -> response dict
+    for event in client.stream_chat("...", thread_id):
+        ...                           # the stream_graph events: token, tool_start, tool_end, done
+
+One keep-alive connection pool per client; share the instance.
+"""
+from __future__ import annotations
+import os
+from typing import Any, Dict, Iterable, Iterator, List
+
+import httpx
+import orjson
+
+DEFAULT_URL = "http://127.0.0.1:8000"
+
+
+class ServiceError(RuntimeError):
+    """The service answered with an error status or an in-band SSE error event."""
+
+    def __init__(self, status: int, detail: Any):
+        super().__init__(f"{status}: {detail}")
+        self.status = status
+        self.detail = detail
+
+
+def _body(request: Any) -> bytes:
+    if isinstance(request, (str, bytes)):
+        return request.encode() if isinstance(request, str) else request
+    if hasattr(request, "model_dump_json"):
+        return request.model_dump_json().encode()
+    return orjson.dumps(request)
+
+
+def iter_sse(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """JSON payloads of the `data:` lines of a server-sent event stream."""
+    for line in lines:
+        if line.startswith("data:"):
+            yield orjson.loads(line[5:])
+
+
+class ServiceClient:
+    def __init__(self, base_url: str | None = None, timeout: float | None = None):
+        self.base_url = (base_url or os.environ.get("UW_SERVICE_URL") or DEFAULT_URL).rstrip("/")
+        timeout = timeout if timeout is not None else float(os.environ.get("UW_SERVICE_TIMEOUT", 120))
+        self._http = httpx.Client(base_url=self.base_url, timeout=httpx.Timeout(timeout, connect=5.0),
+                                  headers={"Content-Type": "application/json"})
+
+    def _post(self, path: str, body: bytes) -> Any:
+        response = self._http.post(path, content=body)
+        if response.is_error:
+            raise ServiceError(response.status_code, response.json().get("detail", response.text))
+        return orjson.loads(response.content)
+
+    def health(self) -> Dict[str, Any]:
+        return orjson.loads(self._http.get("/health").raise_for_status().content)
+
+    def evaluate(self, request: Any) -> Dict[str, Any]:
+        return self._post("/evaluate", _body(request))
+
+    def evaluate_batch(self, requests: Iterable[Any]) -> List[Dict[str, Any]]:
+        return self._post("/evaluate/batch", b"[" + b",".join(_body(r) for r in requests) + b"]")
+
+    def evaluate_scenarios(self, request: Any, grid: Any = None) -> Dict[str, Any]:
+        """What-if matrix; `grid` is a ScenarioGrid or its dict form."""
+        if hasattr(grid, "model_dump"):
+            grid = grid.model_dump(mode="json")
+        body = b'{"request":' + _body(request) + b',"grid":' + orjson.dumps(grid or {}) + b"}"
+        return self._post("/evaluate/scenarios", body)
+
+    def chat(self, query: str, thread_id: str | None = None) -> Dict[str, Any]:
+        return self._post("/chat", orjson.dumps({"query": query, "threadId": thread_id}))
+
+    def stream_chat(self, query: str, thread_id: str | None = None) -> Iterator[Dict[str, Any]]:
+        """The `stream_graph` events of one turn, as the service sends them."""
+        body = orjson.dumps({"query": query, "threadId": thread_id, "stream": True})
+        with self._http.stream("POST", "/chat", content=body) as response:
+            if response.is_error:
+                response.read()
+                raise ServiceError(response.status_code, response.json().get("detail", response.text))
+            for event in iter_sse(response.iter_lines()):
+                if event["type"] == "error":
+                    raise ServiceError(event["status"], event["detail"])
+                yield event
+
+    def close(self) -> None:
+        self._http.close()
@@ -0,0 +1,244 @@
+"""Rule configuration loader.
+
+Parses and validates `data/state_overrides.json`, `data/decline_conditions.json`,
+`data/gi_scenarios.json` and `data/decision_table.json` once into the
+`StateOverride` / `DeclineCondition` / `GiScenario` / `DecisionRule` models
+and compiles them into the read-only lookup tables the rules engine consumes. A pickled snapshot of the compiled config can be kept
+next to the data so worker processes start without re-validating.
+"""
+from __future__ import annotations
+import hashlib
+import logging
+import pickle
+import threading
+import time
+from dataclasses import dataclass, fields, replace
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, FrozenSet, List, Mapping, Tuple
+
+from pydantic import BaseModel, Field
+
+from uw_models import StateOverride, DeclineCondition, GiScenario, AutoDeclineRule, DecisionRule
+from uw_decline_matcher import DeclineMatcher
+from uw_decision_table import DecisionTable
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+CONFIG_FILES = ("state_overrides.json", "decline_conditions.json", "gi_scenarios.json", "decision_table.json")
+
+# Bump when RuleConfig's layout changes so stale snapshots are rebuilt
+SNAPSHOT_FORMAT = 2
+
+
+class StateOverrideFile(BaseModel):
+    items: List[StateOverride] = Field(default_factory=list)
+
+
+class DeclineConditionFile(BaseModel):
+    items: List[DeclineCondition] = Field(default_factory=list)
+    autoDeclineRules: List[AutoDeclineRule] | None = None
+
+
+class GiScenarioFile(BaseModel):
+    defaultLookbackDays: int = 63
+    items: List[GiScenario] = Field(default_factory=list)
+
+
+class DecisionTableFile(BaseModel):
+    rules: List[DecisionRule] | None = None
+
+
+@dataclass(frozen=True)
+class RuleConfig:
+    """Compiled, read-only rule tables. Build with `load_rule_config`."""
+    state_overrides: Mapping[str, StateOverride]
+    continuous_gi_states: FrozenSet[str]
+    decline_conditions: Mapping[str, DeclineCondition]
+    decline_matcher: DeclineMatcher
+    gi_scenarios: Mapping[str, GiScenario]
+    gi_lookback_days: Mapping[str, int]
+    gi_plan_letters: Mapping[str, FrozenSet[str]]
+    default_lookback_days: int
+    decision_table: DecisionTable
+    fingerprint: str
+    load_seconds: float = 0.0
+    source: str = "json"
+
+    @property
+    def version(self) -> str:
+        """Content version of the data files this config was compiled from."""
+        return self.fingerprint
+
+    def __reduce__(self):
+        state = {f.name: getattr(self, f.name) for f in fields(self)}
+        for name, value in state.items():
+            if isinstance(value, MappingProxyType):
+                state[name] = dict(value)
+        return _restore_config, (state,)
+
+
+def _restore_config(state: dict) -> RuleConfig:
+    return RuleConfig(**{k: MappingProxyType(v) if isinstance(v, dict) else v for k, v in state.items()})
+
+
+def fingerprint(data_dir: str | Path = DATA_DIR) -> str:
+    """Content hash of the rule data files."""
+    digest = hashlib.sha256()
+    for name in CONFIG_FILES:
+        path = Path(data_dir) / name
+        digest.update(name.encode())
+        digest.update(path.read_bytes() if path.exists() else b"")
+    return digest.hexdigest()[:16]
+
+
+def compile_rule_config(state_file: StateOverrideFile, decline_file: DeclineConditionFile,
+                        gi_file: GiScenarioFile, table_file: DecisionTableFile | None = None,
+                        fingerprint: str = "") -> RuleConfig:
+    states: Dict[str, StateOverride] = {s.state.upper(): s for s in state_file.items}
+    declines: Dict[str, DeclineCondition] = {d.code: d for d in decline_file.items}
+    rules = None
+    if decline_file.autoDeclineRules is not None:
+        rules = [r.model_dump(exclude_none=True) for r in decline_file.autoDeclineRules]
+    scenarios: Dict[str, GiScenario] = {g.code: g for g in gi_file.items}
+    gi_plan_letters = {code: frozenset(g.planLettersPermitted) for code, g in scenarios.items() if g.planLettersPermitted}
+    table_rules = None
+    if table_file is not None and table_file.rules is not None:
+        table_rules = [r.model_dump(exclude_none=True) for r in table_file.rules]
+    return RuleConfig(
+        state_overrides=MappingProxyType(states),
+        continuous_gi_states=frozenset(code for code, s in states.items() if s.continuousGi),
+        decline_conditions=MappingProxyType(declines),
+        decline_matcher=DeclineMatcher({code: d.model_dump() for code, d in declines.items()}, rules),
+        gi_scenarios=MappingProxyType(scenarios),
+        gi_lookback_days=MappingProxyType({code: g.lookbackDaysDefault for code, g in scenarios.items()}),
+        gi_plan_letters=MappingProxyType(gi_plan_letters),
+        default_lookback_days=gi_file.defaultLookbackDays,
+        decision_table=DecisionTable(table_rules, gi_plan_letters),
+        fingerprint=fingerprint,
+    )
+
+
+def _read(path: Path, model: type[BaseModel]) -> BaseModel:
+    if not path.exists():
+        return model()
+    return model.model_validate_json(path.read_bytes())
+
+
+def _load_snapshot(snapshot: Path, expected: str) -> RuleConfig | None:
+    try:
+        with snapshot.open("rb") as fh:
+            fmt, cfg = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError) as ex:
+        logger.warning("Ignoring unreadable rule snapshot %s: %s", snapshot, ex)
+        return None
+    if fmt != SNAPSHOT_FORMAT or not isinstance(cfg, RuleConfig) or cfg.fingerprint != expected:
+        return None
+    return cfg
+
+
+def save_snapshot(cfg: RuleConfig, snapshot: str | Path) -> None:
+    """Write `cfg` to `snapshot` atomically (write to a temp file, then rename)."""
+    snapshot = Path(snapshot)
+    tmp = snapshot.with_suffix(snapshot.suffix + ".tmp")
+    with tmp.open("wb") as fh:
+        pickle.dump((SNAPSHOT_FORMAT, cfg), fh, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(snapshot)
+
+
+def load_rule_config(data_dir: str | Path = DATA_DIR, snapshot: str | Path | None = None) -> RuleConfig:
+    """
+    Load and compile the rule tables in `data_dir`.
+
+    When `snapshot` is given, a pickled config whose fingerprint matches the
+    current data files is used as-is; otherwise the JSON is validated and the
+    snapshot is (re)written for the next process.
+    """
+    started = time.perf_counter()
+    data_dir = Path(data_dir)
+    current = fingerprint(data_dir)
+
+    cfg = _load_snapshot(Path(snapshot), current) if snapshot and Path(snapshot).exists() else None
+    source = "snapshot"
+    if cfg is None:
+        source = "json"
+        cfg = compile_rule_config(
+            _read(data_dir / "state_overrides.json", StateOverrideFile),
+            _read(data_dir / "decline_conditions.json", DeclineConditionFile),
+            _read(data_dir / "gi_scenarios.json", GiScenarioFile),
+            _read(data_dir / "decision_table.json", DecisionTableFile),
+            fingerprint=current,
+        )
+        if snapshot:
+            save_snapshot(cfg, snapshot)
+
+    elapsed = time.perf_counter() - started
+    cfg = replace(cfg, load_seconds=elapsed, source=source)
+    logger.info("Loaded rule config %s from %s in %.1f ms", cfg.fingerprint, source, elapsed * 1000)
+    return cfg
+
+
+def as_legacy_tables(cfg: RuleConfig) -> Tuple[Dict[str, dict], Dict[str, dict], Dict[str, dict]]:
+    """Plain-dict views of the config, keyed like STATE_OVERRIDES/DECLINE_CONDITIONS/GI_SCENARIOS."""
+    return (
+        {k: v.model_dump() for k, v in cfg.state_overrides.items()},
+        {k: v.model_dump() for k, v in cfg.decline_conditions.items()},
+        {k: v.model_dump() for k, v in cfg.gi_scenarios.items()},
+    )
+
+
+class RuleConfigWatcher:
+    """
+    Background thread that reloads the rule data when a file in `data_dir` changes.
+
+    Files are polled by mtime every `interval` seconds. A changed fingerprint
+    triggers a full load; if it validates, `on_change` receives the new
+    RuleConfig, otherwise the error is logged and the current config stays.
+    """
+
+    def __init__(self, on_change: Callable[[RuleConfig], object], data_dir: str | Path = DATA_DIR,
+                 snapshot: str | Path | None = None, interval: float = 2.0, current: str | None = None):
+        self.on_change = on_change
+        self.data_dir = Path(data_dir)
+        self.snapshot = snapshot
+        self.interval = interval
+        self._version = current
+        self._mtimes = self._stat()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="uw-rule-config-watcher", daemon=True)
+
+    def _stat(self) -> Tuple[float, ...]:
+        return tuple((self.data_dir / name).stat().st_mtime if (self.data_dir / name).exists() else 0.0
+                     for name in CONFIG_FILES)
+
+    def start(self) -> "RuleConfigWatcher":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def check(self) -> RuleConfig | None:
+        """Reload once if the files changed; returns the new config when one was installed."""
+        mtimes = self._stat()
+        if mtimes == self._mtimes:
+            return None
+        self._mtimes = mtimes
+        if fingerprint(self.data_dir) == self._version:
+            return None
+        try:
+            cfg = load_rule_config(self.data_dir, self.snapshot)
+        except Exception:
+            logger.exception("Rule config reload failed; keeping version %s", self._version)
+            return None
+        self._version = cfg.version
+        self.on_change(cfg)
+        logger.info("Rule config reloaded: now version %s", cfg.version)
+        return cfg
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
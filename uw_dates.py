@@ -0,0 +1,106 @@
+"""Date helpers for the rules engine: memoized ISO parsing and epoch-day arithmetic.
+
+Scalar functions work on `datetime.date`; the `*_np` variants take NumPy
+`datetime64[D]` arrays (see `to_datetime64`) and return arrays, for
+`uw_batch`. Both follow the engine's original `relativedelta` semantics:
+
+    age_years            whole years, a Feb 29 birthday falls on Feb 28 in non-leap years
+    in_open_enrollment   age >= 65 and within the 6 calendar months starting with the
+                         Part B effective month
+    days_between         signed whole days, as epoch-day (or ordinal) differences
+"""
+from __future__ import annotations
+from calendar import isleap
+from datetime import date, datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Iterable
+
+if TYPE_CHECKING:  # numpy is imported lazily; uw_models uses this module and stays numpy-free
+    import numpy as np
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=16384)
+def parse_date(s: str) -> date:
+    """`YYYY-MM-DD` -> date. Memoized: receipt, Part B and GI dates repeat heavily across a book."""
+    if len(s) == 10:
+        return date.fromisoformat(s)
+    # Unpadded forms such as 2026-1-5, which the engine has always accepted
+    return datetime.strptime(s, "%Y-%m-%d").date()
+
+
+def epoch_days(d: date) -> int:
+    return d.toordinal() - EPOCH_ORDINAL
+
+
+def days_between(start: date, end: date) -> int:
+    return end.toordinal() - start.toordinal()
+
+
+def age_years(dob: date, asof: date) -> int:
+    bday = 28 if dob.month == 2 and dob.day == 29 and not isleap(asof.year) else dob.day
+    return asof.year - dob.year - ((asof.month, asof.day) < (dob.month, bday))
+
+
+def months_between(start: date, end: date) -> int:
+    """Calendar months from `start`'s month to `end`'s month."""
+    return (end.year - start.year) * 12 + end.month - start.month
+
+
+def in_open_enrollment(dob: date, partb: date, asof: date) -> bool:
+    return age_years(dob, asof) >= 65 and 0 <= months_between(partb, asof) <= 5
+
+
+# -- vectorized --------------------------------------------------------------
+
+def to_datetime64(values: Iterable[Any]) -> np.ndarray:
+    """ISO strings, dates or datetime64 values -> `datetime64[D]` array; None, "" and NaN become NaT."""
+    import numpy as np
+    arr = values if isinstance(values, np.ndarray) else np.asarray(list(values), dtype=object)
+    if arr.dtype.kind == "M":
+        return arr.astype("datetime64[D]")
+    cleaned = [v if isinstance(v, (str, date)) and v != "" else None for v in arr.tolist()]
+    try:
+        return np.array(cleaned, dtype="datetime64[D]")
+    except ValueError:  # unpadded strings; parse them one by one
+        return np.array([parse_date(v) if isinstance(v, str) else v for v in cleaned], dtype="datetime64[D]")
+
+
+def _ymd(days: np.ndarray):
+    import numpy as np
+    years = days.astype("datetime64[Y]")
+    months = days.astype("datetime64[M]")
+    return (years.astype(np.int64) + 1970, (months - years).astype(np.int64) + 1,
+            (days - months).astype(np.int64) + 1)
+
+
+def _is_leap_np(year: np.ndarray) -> np.ndarray:
+    return (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+
+
+def age_years_np(dob: np.ndarray, asof: np.ndarray) -> np.ndarray:
+    """Element-wise `age_years`; meaningless where either side is NaT."""
+    import numpy as np
+    dy, dm, dd = _ymd(dob)
+    ay, am, ad = _ymd(asof)
+    bday = np.where((dm == 2) & (dd == 29) & ~_is_leap_np(ay), 28, dd)
+    return ay - dy - ((am < dm) | ((am == dm) & (ad < bday)))
+
+
+def months_between_np(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    import numpy as np
+    return end.astype("datetime64[M]").astype(np.int64) - start.astype("datetime64[M]").astype(np.int64)
+
+
+def days_between_np(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    import numpy as np
+    return (end - start).astype(np.int64)
+
+
+def in_open_enrollment_np(dob: np.ndarray, partb: np.ndarray, asof: np.ndarray) -> np.ndarray:
+    """Element-wise `in_open_enrollment`; False where any date is NaT."""
+    import numpy as np
+    valid = ~(np.isnat(dob) | np.isnat(partb) | np.isnat(asof))
+    months = months_between_np(partb, asof)
+    return valid & (age_years_np(dob, asof) >= 65) & (months >= 0) & (months <= 5)
@@ -0,0 +1,375 @@
+"""Decision store behind `uw_rules_engine.get_decision`.
+
+`MemoryDecisionStore` is a bounded LRU/TTL map. `SqliteDecisionStore` puts
+that map in front of an SQLite database in WAL mode: `put` only touches the
+memory tier and a bounded queue, and a background thread writes queued
+decisions to disk in batches. `put` never blocks, since the service calls it
+on its event loop: when the queue is full the write is held in a bounded
+overflow list until the writer catches up, and dropped (kept in the memory
+tier only) when that is full too; both count in
+`uw_decision_store_overflow_total`. `put_many` is for bulk callers off the
+event loop and waits for queue space instead. Lookups hit the memory tier, then the pending
+write buffer, then the `decision_id` primary key.
+
+Alongside each decision a store can keep its inputs: the compact request
+row (`RequestRecord.to_row`) and the dependency keys of the rule-config
+entries it read (`uw_rules_engine.decision_dependencies`). `dependents`
+looks decisions up by key, which is how `uw_reevaluate` finds the ones a
+rule-data change can affect.
+"""
+from __future__ import annotations
+import atexit
+import itertools
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+from uw_cache import LruTtlCache
+from uw_metrics import DECISION_OVERFLOW
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_SIZE = 10_000
+DEFAULT_MEMORY_TTL = 3600.0
+
+# (request row, dependency keys) recorded with a decision
+DecisionInputs = Tuple[list, Sequence[str]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    decision_id  TEXT PRIMARY KEY,
+    evaluated_at TEXT,
+    status       TEXT,
+    body         TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS decision_inputs (
+    decision_id  TEXT PRIMARY KEY,
+    request      TEXT NOT NULL,
+    deps         TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS decision_deps (
+    dep_key      TEXT,
+    decision_id  TEXT,
+    PRIMARY KEY (dep_key, decision_id)
+) WITHOUT ROWID;
+"""
+
+# Bound on host parameters per IN (...) query
+_IN_CHUNK = 500
+
+
+class DecisionStore:
+    """Interface for decision stores."""
+
+    def put(self, decision_id: str, response: dict, inputs: DecisionInputs | None = None) -> None:
+        raise NotImplementedError
+
+    def put_many(self, responses: Iterable[dict], inputs: Iterable[DecisionInputs] | None = None) -> None:
+        if inputs is None:
+            for response in responses:
+                self.put(response["decisionId"], response)
+        else:
+            for response, row in zip(responses, inputs):
+                self.put(response["decisionId"], response, row)
+
+    def get(self, decision_id: str) -> dict | None:
+        raise NotImplementedError
+
+    def get_inputs(self, decision_id: str) -> DecisionInputs | None:
+        """Request row and dependency keys stored with a decision, if any."""
+        return None
+
+    def dependents(self, keys: Iterable[str]) -> Set[str]:
+        """Ids of the decisions that recorded any of `keys`."""
+        return set()
+
+    def dependency_keys(self, prefix: str) -> Set[str]:
+        """Distinct recorded keys starting with `prefix`."""
+        return set()
+
+    def indexed_ids(self) -> Iterator[str]:
+        """Ids of every decision stored with inputs."""
+        return iter(())
+
+    def flush(self) -> None:
+        """Block until every accepted write is durable."""
+
+    def close(self) -> None:
+        self.flush()
+
+
+class MemoryDecisionStore(DecisionStore):
+    """Bounded in-process store; oldest decisions are evicted past `maxsize` or `ttl`."""
+
+    def __init__(self, maxsize: int = DEFAULT_MEMORY_SIZE, ttl: float | None = DEFAULT_MEMORY_TTL):
+        self.cache = LruTtlCache(maxsize, ttl)
+        # Evicts in step with `cache`; key lookups scan it, which stays cheap at `maxsize`
+        self.inputs = LruTtlCache(maxsize, ttl)
+
+    def put(self, decision_id: str, response: dict, inputs: DecisionInputs | None = None) -> None:
+        self.cache.put(decision_id, response)
+        if inputs is not None:
+            self.inputs.put(decision_id, inputs)
+        else:
+            self.inputs.pop(decision_id)
+
+    def get(self, decision_id: str) -> dict | None:
+        return self.cache.get(decision_id)
+
+    def get_inputs(self, decision_id: str) -> DecisionInputs | None:
+        return self.inputs.get(decision_id)
+
+    def dependents(self, keys: Iterable[str]) -> Set[str]:
+        keys = set(keys)
+        return {decision_id for decision_id, (_, deps) in self.inputs.items() if not keys.isdisjoint(deps)}
+
+    def dependency_keys(self, prefix: str) -> Set[str]:
+        return {key for _, (_, deps) in self.inputs.items() for key in deps if key.startswith(prefix)}
+
+    def indexed_ids(self) -> Iterator[str]:
+        return iter([decision_id for decision_id, _ in self.inputs.items()])
+
+
+class SqliteDecisionStore(DecisionStore):
+    """Memory LRU/TTL tier in front of an SQLite (WAL) database, written by a background batcher."""
+
+    def __init__(self, path: str | Path, maxsize: int = DEFAULT_MEMORY_SIZE,
+                 ttl: float | None = DEFAULT_MEMORY_TTL, batch_size: int = 500,
+                 flush_interval: float = 0.5, queue_size: int = 50_000, overflow_size: int | None = None):
+        self.path = str(path)
+        self.cache = LruTtlCache(maxsize, ttl)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Tuple[str, dict, DecisionInputs | None] | None]" = queue.Queue(maxsize=queue_size)
+        self._pending: Dict[str, dict] = {}
+        self._pending_lock = threading.Lock()
+        # Writes that found the queue full, oldest first; guarded by _pending_lock
+        self._overflow: List[Tuple[str, dict, DecisionInputs | None]] = []
+        self._overflow_unwritten = 0
+        self._overflow_written = threading.Condition(self._pending_lock)
+        self.overflow_size = queue_size if overflow_size is None else overflow_size
+        self.overflowed = 0
+        self.dropped = 0
+        self._local = threading.local()
+        self._closed = False
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+        self._writer = threading.Thread(target=self._write_loop, name="uw-decision-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def put(self, decision_id: str, response: dict, inputs: DecisionInputs | None = None) -> None:
+        if self._closed:
+            raise RuntimeError("decision store is closed")
+        self.cache.put(decision_id, response)
+        item = (decision_id, response, inputs)
+        with self._pending_lock:
+            # Once anything overflows, later writes go behind it to keep them in order
+            if not self._overflow:
+                try:
+                    self._queue.put_nowait(item)
+                    self._pending[decision_id] = response
+                    return
+                except queue.Full:
+                    pass
+            if len(self._overflow) < self.overflow_size:
+                self._overflow.append(item)
+                self._overflow_unwritten += 1
+                self._pending[decision_id] = response
+                self.overflowed += 1
+                outcome = "held"
+            else:
+                self.dropped += 1
+                dropped, outcome = self.dropped, "dropped"
+        DECISION_OVERFLOW.inc(outcome=outcome)
+        if outcome == "dropped" and dropped % 1000 == 1:
+            logger.warning("Decision writer is behind; %d decisions kept in memory only so far", dropped)
+
+    def put_many(self, responses: Iterable[dict], inputs: Iterable[DecisionInputs] | None = None) -> None:
+        """Bulk `put` that waits for the writer when the queue is full (back-pressure for batch jobs)."""
+        if self._closed:
+            raise RuntimeError("decision store is closed")
+        with self._overflow_written:
+            while self._overflow_unwritten:
+                self._overflow_written.wait(self.flush_interval)
+        rows = inputs if inputs is not None else itertools.repeat(None)
+        for response, row in zip(responses, rows):
+            decision_id = response["decisionId"]
+            self.cache.put(decision_id, response)
+            with self._pending_lock:
+                self._pending[decision_id] = response
+            self._queue.put((decision_id, response, row))
+
+    def get(self, decision_id: str) -> dict | None:
+        response = self.cache.get(decision_id)
+        if response is not None:
+            return response
+        with self._pending_lock:
+            response = self._pending.get(decision_id)
+        if response is not None:
+            return response
+        row = self._reader().execute(
+            "SELECT body FROM decisions WHERE decision_id = ?", (decision_id,)).fetchone()
+        if row is None:
+            return None
+        response = json.loads(row[0])
+        self.cache.put(decision_id, response)
+        return response
+
+    # Index lookups read the database, so they flush queued writes first
+
+    def get_inputs(self, decision_id: str) -> DecisionInputs | None:
+        self.flush()
+        row = self._reader().execute(
+            "SELECT request, deps FROM decision_inputs WHERE decision_id = ?", (decision_id,)).fetchone()
+        return None if row is None else (json.loads(row[0]), json.loads(row[1]))
+
+    def dependents(self, keys: Iterable[str]) -> Set[str]:
+        self.flush()
+        keys, found = list(keys), set()
+        conn = self._reader()
+        for i in range(0, len(keys), _IN_CHUNK):
+            chunk = keys[i:i + _IN_CHUNK]
+            found.update(decision_id for decision_id, in conn.execute(
+                f"SELECT decision_id FROM decision_deps WHERE dep_key IN ({','.join('?' * len(chunk))})", chunk))
+        return found
+
+    def dependency_keys(self, prefix: str) -> Set[str]:
+        self.flush()
+        # Range scan on the (dep_key, decision_id) primary key
+        return {key for key, in self._reader().execute(
+            "SELECT DISTINCT dep_key FROM decision_deps WHERE dep_key >= ? AND dep_key < ?",
+            (prefix, prefix + "\U0010ffff"))}
+
+    def indexed_ids(self) -> Iterator[str]:
+        self.flush()
+        for decision_id, in self._reader().execute("SELECT decision_id FROM decision_inputs"):
+            yield decision_id
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        stop = False
+        while not stop:
+            batch: List[Tuple[str, dict, DecisionInputs | None]] = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                while True:
+                    if item is None:
+                        stop = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            queued = len(batch)
+            overflow = self._take_overflow(stop)
+            batch.extend(overflow)
+            if batch:
+                self._write(conn, batch)
+            for _ in range(queued + stop):
+                self._queue.task_done()
+            if overflow:
+                with self._overflow_written:
+                    self._overflow_unwritten -= len(overflow)
+                    self._overflow_written.notify_all()
+        conn.close()
+
+    def _take_overflow(self, stop: bool) -> List[Tuple[str, dict, DecisionInputs | None]]:
+        # Overflowed writes are newer than anything still queued, so they go once the queue is drained
+        with self._pending_lock:
+            if not self._overflow or not (stop or self._queue.empty()):
+                return []
+            overflow, self._overflow = self._overflow, []
+            return overflow
+
+    def _write(self, conn: sqlite3.Connection, batch: List[Tuple[str, dict, DecisionInputs | None]]) -> None:
+        rows = [(decision_id, response.get("audit", {}).get("evaluatedAt"), response.get("status"),
+                 json.dumps(response, separators=(",", ":"))) for decision_id, response, _ in batch]
+        indexed = {decision_id: inputs for decision_id, _, inputs in batch if inputs is not None}
+        try:
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO decisions (decision_id, evaluated_at, status, body) VALUES (?, ?, ?, ?)",
+                    rows)
+                if indexed:
+                    self._write_inputs(conn, indexed)
+        except sqlite3.Error:
+            logger.exception("Failed to persist %d decisions", len(rows))
+        with self._pending_lock:
+            for decision_id, response, _ in batch:
+                if self._pending.get(decision_id) is response:
+                    del self._pending[decision_id]
+
+    @staticmethod
+    def _write_inputs(conn: sqlite3.Connection, indexed: Dict[str, DecisionInputs]) -> None:
+        # Decision ids are fresh except when uw_reevaluate rewrites one; drop the keys it had before
+        ids = list(indexed)
+        stale = []
+        for i in range(0, len(ids), _IN_CHUNK):
+            chunk = ids[i:i + _IN_CHUNK]
+            for decision_id, deps in conn.execute(
+                    f"SELECT decision_id, deps FROM decision_inputs WHERE decision_id IN ({','.join('?' * len(chunk))})",
+                    chunk):
+                stale.extend((key, decision_id) for key in json.loads(deps))
+        if stale:
+            conn.executemany("DELETE FROM decision_deps WHERE dep_key = ? AND decision_id = ?", stale)
+        conn.executemany(
+            "INSERT OR REPLACE INTO decision_inputs (decision_id, request, deps) VALUES (?, ?, ?)",
+            [(decision_id, json.dumps(row, separators=(",", ":")), json.dumps(list(deps), separators=(",", ":")))
+             for decision_id, (row, deps) in indexed.items()])
+        conn.executemany("INSERT OR IGNORE INTO decision_deps (dep_key, decision_id) VALUES (?, ?)",
+                         [(key, decision_id) for decision_id, (_, deps) in indexed.items() for key in deps])
+
+    def flush(self) -> None:
+        self._queue.join()
+        with self._overflow_written:
+            while self._overflow_unwritten:
+                self._overflow_written.wait(self.flush_interval)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._reader().execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+
+
+def default_decision_store() -> DecisionStore:
+    """
+    Store configured by the environment.
+
+    UW_DECISION_DB: SQLite path for persistent decisions ("" keeps them in memory only).
+    UW_DECISION_CACHE_SIZE / UW_DECISION_CACHE_TTL: memory tier bounds.
+    """
+    path = os.environ.get("UW_DECISION_DB", "uw_decisions.db")
+    maxsize = int(os.environ.get("UW_DECISION_CACHE_SIZE", DEFAULT_MEMORY_SIZE))
+    ttl = float(os.environ.get("UW_DECISION_CACHE_TTL", DEFAULT_MEMORY_TTL))
+    if not path:
+        return MemoryDecisionStore(maxsize, ttl)
+    store = SqliteDecisionStore(path, maxsize, ttl)
+    atexit.register(store.close)
+    return store
@@ -0,0 +1,192 @@
+"""Compiled decision table for the R-600 -> R-100 -> R-200 -> R-300 -> R-400 chain.
+
+The chain is data (`data/decision_table.json`, or `DEFAULT_DECISION_RULES`):
+an ordered list of rules, each with a predicate over the request facts, an
+outcome template and its FIRED/SKIPPED audit details. The first rule whose
+predicate holds decides; the rules before it are audited as SKIPPED.
+
+At load time every rule is compiled into a predicate closure and an outcome
+builder, and the plan-letter lists are precomputed as shared tuples for the
+MACRA and non-MACRA cases, so evaluation is a short run of predicate checks
+plus one dict build.
+
+Facts are read from an object with these attributes (evaluated lazily by the
+scalar engine, precomputed by the batch path):
+
+    state                uppercased applicant state
+    macra                newly eligible on/after MACRA_CUTOFF
+    continuous_gi_state  state has continuous GI protections
+    open_enrollment      within the 6-month Medigap OE window
+    gi_type              GI event type within its lookback, or None
+    currently_on_ma      applicant is on Medicare Advantage
+"""
+from __future__ import annotations
+from datetime import date
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Sequence, Tuple
+
+MACRA_CUTOFF = date(2020, 1, 1)
+MACRA_PLANS = ("C", "F", "HDF")
+GI_BASE_PLANS = {"A","B","C","D","F","G","K","L"}
+OPTIONAL_GI_PLANS = {"N"}  # May be carrier-dependent
+ALL_PLANS = ["A","B","C","D","F","G","K","L","M","N","HDG","HDF"]
+
+# Predicate facts a rule's `when.fact` can name
+FACTS = ("continuousGiState", "openEnrollment", "giEvent", "currentlyOnMA", "stateIn", "always")
+# Plan sets an outcome can offer: every plan, the GI event's permitted plans, or none
+PLAN_SETS = ("ALL", "GI", "NONE")
+
+# Built-in chain, used when the data directory has no decision table
+DEFAULT_DECISION_RULES: List[dict] = [
+    {"ruleId": "R-600", "when": {"fact": "continuousGiState"},
+     "outcome": {"status": "ACCEPT_NO_UW", "underwritingRequired": False,
+                 "reason": "State {state} continuous GI protections - no underwriting.",
+                 "plans": "ALL", "macraFilter": True},
+     "audit": {"fired": "Continuous GI for {state}", "skipped": "No continuous GI for {state}"}},
+    {"ruleId": "R-100", "when": {"fact": "openEnrollment"},
+     "outcome": {"status": "ACCEPT_NO_UW", "underwritingRequired": False,
+                 "reason": "Within 6-month Medigap Open Enrollment; underwriting not permitted.",
+                 "plans": "ALL", "macraFilter": True},
+     "audit": {"fired": "Age>=65 and within OE window.", "skipped": "Outside OE window."}},
+    {"ruleId": "R-200", "when": {"fact": "giEvent"},
+     "outcome": {"status": "ACCEPT_NO_UW", "underwritingRequired": False,
+                 "reason": "Guaranteed Issue applies: {giType} within lookback.",
+                 "plans": "GI", "macraFilter": True, "notes": ["Plan N availability may vary by carrier."]},
+     "audit": {"fired": "GI within lookback.", "skipped": "No GI event in lookback.",
+               "macra": {"ruleId": "R-210", "details": "MACRA removed C/F for newly eligible."}}},
+    {"ruleId": "R-300", "when": {"fact": "currentlyOnMA"},
+     "outcome": {"status": "PENDED", "underwritingRequired": True,
+                 "reason": "Currently on Medicare Advantage; require disenrollment or GI path.",
+                 "plans": "NONE", "requestsForInformation": ["Proof of MA disenrollment effective date"]},
+     "audit": {"fired": "MA present without GI.", "skipped": "Not on MA."}},
+    {"ruleId": "R-400", "when": {"fact": "always"},
+     "outcome": {"status": "ACCEPT_WITH_UW", "underwritingRequired": True,
+                 "reason": "Outside OE/GI; medical underwriting required.",
+                 "plans": "ALL", "macraFilter": False},
+     "audit": {"fired": "Proceed to UW checks.", "skipped": "Not applicable."}},
+]
+
+
+def _macra_filter(plans: Sequence[str]) -> Tuple[str, ...]:
+    return tuple(p for p in plans if p not in MACRA_PLANS)
+
+
+def _template(text: str) -> Callable[[Any], str]:
+    if "{" not in text:
+        return lambda facts: text
+    return lambda facts: text.format(state=facts.state, giType=facts.gi_type)
+
+
+def _predicate(when: Mapping[str, Any]) -> Callable[[Any], bool]:
+    fact = when["fact"]
+    if fact == "continuousGiState":
+        return lambda f: f.continuous_gi_state
+    if fact == "openEnrollment":
+        return lambda f: f.open_enrollment
+    if fact == "giEvent":
+        return lambda f: f.gi_type is not None
+    if fact == "currentlyOnMA":
+        return lambda f: bool(f.currently_on_ma)
+    if fact == "stateIn":
+        states = frozenset(s.upper() for s in when.get("states", []))
+        return lambda f: f.state in states
+    if fact == "always":
+        return lambda f: True
+    raise ValueError(f"unknown decision-table fact {fact!r}; expected one of {FACTS}")
+
+
+class _CompiledRule:
+    __slots__ = ("rule_id", "test", "build", "fired", "skipped", "macra_audit")
+
+
+class DecisionTable:
+    """Ordered first-match rule table compiled from rule dicts (see DEFAULT_DECISION_RULES)."""
+
+    def __init__(self, rules: Sequence[Mapping[str, Any]] | None = None,
+                 gi_plan_letters: Mapping[str, FrozenSet[str]] | None = None):
+        self.spec: Tuple[dict, ...] = tuple(dict(r) for r in (DEFAULT_DECISION_RULES if rules is None else rules))
+        self.gi_plan_letters: Dict[str, FrozenSet[str]] = dict(gi_plan_letters or {})
+
+        # Shared plan tuples, indexed by the MACRA flag
+        self.all_plans = {False: tuple(ALL_PLANS), True: _macra_filter(ALL_PLANS)}
+        self.gi_plans: Dict[Tuple[str | None, bool], Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+        for gi_type, permitted in [(None, frozenset(GI_BASE_PLANS)), *self.gi_plan_letters.items()]:
+            allowed = tuple(sorted(permitted | OPTIONAL_GI_PLANS))
+            for macra in (False, True):
+                plans = _macra_filter(allowed) if macra else allowed
+                self.gi_plans[gi_type, macra] = (plans, tuple(p for p in ALL_PLANS if p not in plans))
+
+        self.rules: Tuple[_CompiledRule, ...] = tuple(self._compile(r) for r in self.spec)
+        self.rule_ids: Tuple[str, ...] = tuple(r.rule_id for r in self.rules)
+
+    def __reduce__(self):
+        # Closures do not pickle; rebuild from the spec
+        return DecisionTable, (self.spec, self.gi_plan_letters)
+
+    def _plans_for(self, gi_type: str | None, macra: bool) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        plans = self.gi_plans.get((gi_type, macra))
+        return plans if plans is not None else self.gi_plans[None, macra]
+
+    def _compile(self, spec: Mapping[str, Any]) -> _CompiledRule:
+        rule_id = spec["ruleId"]
+        outcome = spec["outcome"]
+        audit = spec.get("audit", {})
+        plan_set = outcome.get("plans", "NONE")
+        if plan_set not in PLAN_SETS:
+            raise ValueError(f"{rule_id}: unknown plan set {plan_set!r}; expected one of {PLAN_SETS}")
+        status = outcome["status"]
+        uw_required = bool(outcome["underwritingRequired"])
+        reason = _template(outcome.get("reason", ""))
+        macra_filter = bool(outcome.get("macraFilter", False))
+        notes = tuple(outcome.get("notes", ()))
+        rfis = tuple(outcome.get("requestsForInformation", ()))
+        all_plans = self.all_plans
+        plans_for = self._plans_for
+
+        def build(f) -> dict:
+            macra = macra_filter and f.macra
+            if plan_set == "GI":
+                allowed, disallowed = plans_for(f.gi_type, macra)
+            elif plan_set == "ALL":
+                allowed, disallowed = all_plans[macra], ()
+            else:
+                allowed = disallowed = ()
+            restrictions = {"allowedPlanLetters": list(allowed), "disallowedPlanLetters": list(disallowed)}
+            if notes:
+                restrictions["notes"] = list(notes)
+            decision = {
+                "status": status,
+                "underwritingRequired": uw_required,
+                "reasons": [{"code": rule_id, "message": reason(f)}],
+                "planRestrictions": restrictions,
+                "waitingPeriod": {"applies": False, "months": 0},
+            }
+            if rfis:
+                decision["requestsForInformation"] = list(rfis)
+            return decision
+
+        rule = _CompiledRule()
+        rule.rule_id = rule_id
+        rule.test = _predicate(spec["when"])
+        rule.build = build
+        rule.fired = _template(audit.get("fired", ""))
+        rule.skipped = _template(audit.get("skipped", ""))
+        rule.macra_audit = audit.get("macra")
+        return rule
+
+    def decide(self, facts: Any, timer: Any = None) -> Tuple[dict | None, List[dict]]:
+        """First matching rule's decision (None when no rule matches) and the chain's audit entries."""
+        audit: List[dict] = []
+        for rule in self.rules:
+            if rule.test(facts):
+                decision = rule.build(facts)
+                audit.append({"ruleId": rule.rule_id, "outcome": "FIRED", "details": rule.fired(facts)})
+                if rule.macra_audit and facts.macra:
+                    audit.append({"ruleId": rule.macra_audit["ruleId"], "outcome": "FIRED",
+                                  "details": rule.macra_audit["details"]})
+                if timer is not None:
+                    timer.lap(rule.rule_id)
+                return decision, audit
+            audit.append({"ruleId": rule.rule_id, "outcome": "SKIPPED", "details": rule.skipped(facts)})
+            if timer is not None:
+                timer.lap(rule.rule_id)
+        return None, audit
@@ -0,0 +1,110 @@
+"""Compiled matcher for R-410 automatic decline conditions.
+
+The decline table is compiled once into an Aho-Corasick automaton over the
+upper-cased labels, descriptions and synonyms of every condition, so all hits
+for an applicant's disclosed conditions come out of one linear pass. The
+exact-term combinations (CHF with oxygen, ESRD, ...) are data as well and are
+looked up through a term index.
+"""
+from __future__ import annotations
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+# Disclosed condition items are joined with this before scanning so a pattern
+# can never match across two items.
+_SEPARATOR = "\n"
+
+# Built-in combinations, used when the decline table does not define its own
+DEFAULT_AUTO_DECLINE_RULES: List[dict] = [
+    {"code": "AUTO", "conditions": ["CHF"], "oxygenUse": True},
+    {"code": "AUTO", "conditions": ["ESRD"]},
+    {"code": "AUTO", "conditions": ["ALZHEIMER"]},
+    {"code": "AUTO", "conditions": ["DEMENTIA"]},
+]
+
+
+class DeclineMatcher:
+    """Aho-Corasick automaton over decline-condition patterns plus an exact-term rule index."""
+
+    def __init__(self, conditions: Dict[str, dict], rules: List[dict] | None = None):
+        self.codes: Tuple[str, ...] = tuple(conditions)
+        self._order = {code: i for i, code in enumerate(self.codes)}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[frozenset] = [frozenset()]
+
+        for code, item in conditions.items():
+            patterns = [item.get('label') or '', item.get('description') or '', *(item.get('synonyms') or [])]
+            for pattern in {p.upper() for p in patterns if p}:
+                self._add(pattern, code)
+        self._link()
+
+        self.rules: Tuple[dict, ...] = tuple(DEFAULT_AUTO_DECLINE_RULES if rules is None else rules)
+        self._rule_index: Dict[str, List[int]] = {}
+        for i, rule in enumerate(self.rules):
+            for term in rule.get("conditions", []):
+                self._rule_index.setdefault(term.upper(), []).append(i)
+
+    def _add(self, pattern: str, code: str) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(frozenset())
+            state = nxt
+        self._out[state] = self._out[state] | {code}
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] | self._out[self._fail[nxt]]
+
+    def scan(self, text: str) -> set:
+        """Codes of every pattern occurring anywhere in `text` (already upper-cased)."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+    def match(self, conditions: Iterable[str], oxygen_use: bool = False) -> List[str]:
+        """
+        Decline hits for a list of disclosed conditions.
+
+        Returns the matching condition codes in table order, followed by the
+        codes of any exact-term rules that fired, each code at most once.
+        """
+        items = {c.upper() for c in conditions}
+        if not items:
+            return []
+        hits = sorted(self.scan(_SEPARATOR.join(items)), key=self._order.__getitem__)
+
+        fired = set()
+        for term in items:
+            for i in self._rule_index.get(term, ()):
+                rule = self.rules[i]
+                if rule.get("oxygenUse") and not oxygen_use:
+                    continue
+                fired.add(i)
+        for i in sorted(fired):
+            code = self.rules[i]["code"]
+            if code not in hits:
+                hits.append(code)
+        return hits
+
@@ -0,0 +1,96 @@
+"""Direct, LLM-free entry point for callers that already hold a structured application.
+
+`evaluate_structured` validates an `EvaluateRequest` (JSON text, dict or
+model), or with `trusted=True` reads already-validated upstream data
+straight into the engine's `RequestRecord`, runs the rules engine directly and explains the decision from
+templates keyed on reason codes. The chat model is only called when the
+caller asks for a narrative.
+"""
+from __future__ import annotations
+import json
+from typing import Any, Dict, List
+
+import orjson
+
+from uw_models import EvaluateRequest, parse_request
+from uw_rules_engine import RequestRecord, evaluate_request
+
+STATUS_HEADLINES = {
+    "ACCEPT_NO_UW": "Accept without medical underwriting.",
+    "ACCEPT_WITH_UW": "Eligible to apply, subject to medical underwriting.",
+    "DECLINE": "Decline.",
+    "PENDED": "Pended for more information.",
+}
+
+REASON_TEMPLATES = {
+    "R-600": "{state} provides continuous guaranteed-issue protections, so underwriting does not apply.",
+    "R-100": "The applicant is 65 or older and within the 6-month Medigap Open Enrollment window; "
+             "underwriting is not permitted.",
+    "R-200": "A Guaranteed Issue event applies ({message}).",
+    "R-300": "The applicant is currently on Medicare Advantage and has no GI right; proof of MA "
+             "disenrollment or a GI path is needed.",
+    "R-400": "The application is outside Open Enrollment and has no GI right, so medical underwriting is required.",
+    "R-410": "A disclosed health condition matches an automatic decline condition.",
+    "R-700": "The requested plan (C, F or HDF) is not available to applicants newly eligible for Medicare "
+             "on or after 2020-01-01 (MACRA); Plan G or HDG is the usual alternative.",
+    "R-900": "There is not enough information to decide.",
+}
+
+
+def explain(response: Dict[str, Any], state: str | None = None) -> str:
+    """Plain-text explanation of an `evaluate` response, built from the reason-code templates."""
+    lines: List[str] = [STATUS_HEADLINES.get(response["status"], response["status"])]
+    for reason in response.get("reasons", []):
+        template = REASON_TEMPLATES.get(reason["code"])
+        text = template.format(state=state or "The state", message=reason["message"]) if template else reason["message"]
+        lines.append(f"- {reason['code']}: {text}")
+
+    plans = (response.get("planRestrictions") or {}) if response["status"] != "DECLINE" else {}
+    if plans.get("allowedPlanLetters"):
+        lines.append(f"Plans available: {', '.join(plans['allowedPlanLetters'])}.")
+    if plans.get("disallowedPlanLetters"):
+        lines.append(f"Plans not available: {', '.join(sorted(plans['disallowedPlanLetters']))}.")
+    for note in plans.get("notes", []):
+        lines.append(f"Note: {note}")
+
+    wp = response.get("waitingPeriod") or {}
+    if wp.get("applies"):
+        lines.append(f"A {wp['months']}-month pre-existing condition waiting period applies.")
+    rg = response.get("ratingGuidance") or {}
+    if response.get("underwritingRequired") and rg.get("class"):
+        lines.append(f"Typical rating guidance: {rg['class']} (factor {rg['suggestedFactor']:.2f}), "
+                     "subject to underwriting review.")
+    for rfi in response.get("requestsForInformation", []):
+        lines.append(f"Needed: {rfi}")
+    return "\n".join(lines)
+
+
+def _record(payload: str | bytes | dict | EvaluateRequest, trusted: bool) -> RequestRecord:
+    if trusted and not isinstance(payload, EvaluateRequest):
+        return RequestRecord.from_dict(orjson.loads(payload) if isinstance(payload, (str, bytes)) else payload)
+    return RequestRecord.from_request(parse_request(payload))
+
+
+def evaluate_structured(payload: str | bytes | dict | EvaluateRequest, narrative: bool = False,
+                        trusted: bool = False) -> Dict[str, Any]:
+    """
+    Evaluate a structured application without going through the agent graph.
+
+    Returns the `run_graph` result shape (`answer`, `uw_audit`) plus the full
+    `decision`. With `narrative=True` the answer is written by the chat model
+    from the decision instead of the templates. Raises pydantic's
+    ValidationError for malformed requests. `trusted=True` skips validation
+    for data an upstream system has already checked; missing fields then
+    surface as KeyError.
+    """
+    rec = _record(payload, trusted)
+    response = evaluate_request(rec)
+    answer = explain(response, rec.state)
+    if narrative:
+        from uw_chains import get_narrative_chain
+        answer = get_narrative_chain().invoke({"decision": json.dumps(response, indent=2)}).content
+    return {
+        "answer": answer,
+        "uw_audit": response["audit"],
+        "decision": response,
+    }
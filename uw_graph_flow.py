@@ -1,47 +1,261 @@
-from typing import TypedDict, Annotated, Any, Dict
-from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
-from langgraph.graph.message import add_messages
+from typing import Any, AsyncIterator, Dict, Iterator
+from contextlib import contextmanager
+from functools import lru_cache
 from dotenv import load_dotenv
-from langgraph.graph import MessagesState, StateGraph,END
 import json
+import weakref
 
-from langgraph.prebuilt import ToolNode
 load_dotenv()
 import os
 
-from uw_chains import uw_chain
-from uw_rules_engine import uw_tools
+# langgraph, langchain and the OpenAI client are imported inside build_graph/run_graph
+# so importing this module stays cheap (see `python uw_cli.py importtime`).
 
 UW_AGENT_REASON="uw_agent_reason"
 UW_TOOL_NODE= "uw_tool_node"
 
 LAST = -1
 
-class MessageGraph(TypedDict):
-    messages: Annotated[list[BaseMessage], add_messages]
 
-def uw_agent_reason(state: MessageGraph):
-    return {"messages": [uw_chain.invoke({"uw_messages": state["messages"]})]}
+UW_COMPACT_HISTORY = "uw_compact_history"
 
-uw_tool_node = ToolNode(uw_tools)
+# History window sent to the model: last N turns, then trimmed to a token budget
+HISTORY_TURNS = int(os.environ.get("UW_HISTORY_TURNS", 6))
+HISTORY_TOKENS = int(os.environ.get("UW_HISTORY_TOKENS", 6000))
+MAX_SUMMARIES = 20
 
-def should_continue(state: MessagesState) -> str:
+
+def _uw_state():
+    from typing import Annotated
+    from langgraph.graph import MessagesState
+
+    def keep_last(old: list, new: list) -> list:
+        return (old + new)[-MAX_SUMMARIES:]
+
+    class UwState(MessagesState):
+        # Compact summaries of evaluate results from turns dropped out of `messages`
+        uw_summary: Annotated[list, keep_last]
+
+    return UwState
+
+
+def _tool_response(msg: Any) -> dict | None:
+    """Full evaluate response carried by a ToolMessage: its artifact, or the parsed content of
+    messages checkpointed before the tool returned artifacts."""
+    artifact = getattr(msg, "artifact", None)
+    if isinstance(artifact, dict):
+        return artifact
+    try:
+        response = json.loads(msg.content)
+    except (TypeError, ValueError):
+        return None
+    return response if isinstance(response, dict) else None
+
+
+def _tool_calls(messages: list) -> Dict[str, dict]:
+    """tool_call_id -> tool call, over the AI messages in `messages`."""
+    return {call["id"]: call for msg in messages if msg.type == "ai" for call in getattr(msg, "tool_calls", None) or []}
+
+
+def _application_id(call: dict | None) -> str | None:
+    """applicationId of the request a tool call evaluated, from its arguments."""
+    payload = ((call or {}).get("args") or {}).get("payload")
+    application = payload.get("application") if isinstance(payload, dict) else None
+    return application.get("applicationId") if isinstance(application, dict) else None
+
+
+def _decision_entry(response: dict | None) -> dict | None:
+    """{"decision", "audit"} for an evaluate response; None for other tool results."""
+    if response is None or "status" not in response:
+        return None
+    return {"decision": {k: v for k, v in response.items() if k != "audit"}, "audit": response.get("audit", {})}
+
+
+def _summarize_evaluate(msg: Any, call: dict | None = None) -> dict | None:
+    response = _tool_response(msg)
+    if response is None or "status" not in response:
+        return None
+    plans = response.get("planRestrictions") or {}
+    return {
+        "applicationId": _application_id(call),
+        "decisionId": response.get("decisionId"),
+        "status": response["status"],
+        "reasons": [r["code"] for r in response.get("reasons", [])],
+        "underwritingRequired": response.get("underwritingRequired"),
+        "allowedPlanLetters": plans.get("allowedPlanLetters", []),
+    }
+
+
+def uw_compact_history(state: dict):
+    """
+    Runs once per turn, before the model. Messages older than the last
+    HISTORY_TURNS turns are removed from the checkpointed state; their evaluate
+    results are folded into `uw_summary`, so state size stays bounded however
+    long the session runs.
+    """
+    from langchain_core.messages import RemoveMessage
+    messages = state["messages"]
+    starts = [i for i, msg in enumerate(messages) if msg.type == "human"]
+    if len(starts) <= HISTORY_TURNS:
+        return {}
+    old = messages[:starts[-HISTORY_TURNS]]
+    calls = _tool_calls(old)
+    summaries = [s for s in (_summarize_evaluate(m, calls.get(m.tool_call_id)) for m in old if m.type == "tool") if s]
+    return {"messages": [RemoveMessage(id=m.id) for m in old], "uw_summary": summaries}
+
+
+def _context_messages(state: dict) -> list:
+    """Messages sent to the model: summary of earlier decisions plus the recent window within the token budget."""
+    from langchain_core.messages import SystemMessage, trim_messages
+    from langchain_core.messages.utils import count_tokens_approximately
+    window = trim_messages(state["messages"], max_tokens=HISTORY_TOKENS, strategy="last",
+                           token_counter=count_tokens_approximately, start_on="human", allow_partial=False)
+    if not window:  # a single turn over budget is still sent whole
+        window = state["messages"]
+    if state.get("uw_summary"):
+        summary = json.dumps(state["uw_summary"], separators=(",", ":"))
+        window = [SystemMessage(content=f"Earlier evaluate results in this session: {summary}")] + window
+    return window
+
+
+def uw_agent_reason(state: dict):
+    from uw_chains import get_agent_chain
+    return {"messages": [get_agent_chain().invoke({"uw_messages": _context_messages(state)})]}
+
+
+async def auw_agent_reason(state: dict):
+    from uw_chains import get_agent_chain
+    return {"messages": [await get_agent_chain().ainvoke({"uw_messages": _context_messages(state)})]}
+
+
+def should_continue(state: dict) -> str:
+    from langgraph.graph import END
     if not state["messages"][LAST].tool_calls:
         return END
     return UW_TOOL_NODE
 
-flow = StateGraph(MessagesState)
-flow.add_node(UW_AGENT_REASON, uw_agent_reason)
-flow.add_node(UW_TOOL_NODE, uw_tool_node)
 
-flow.set_entry_point(UW_AGENT_REASON)
-flow.add_conditional_edges(UW_AGENT_REASON, should_continue, {
-    END:END,
-    UW_TOOL_NODE:UW_TOOL_NODE})
-flow.add_edge(UW_TOOL_NODE, UW_AGENT_REASON)
+def build_graph(checkpointer: Any = None):
+    """Compile a new UW ReAct graph; with a checkpointer, runs continue the session named by `thread_id`."""
+    from langchain_core.runnables import RunnableLambda
+    from langgraph.graph import StateGraph, END
+    from langgraph.prebuilt import ToolNode
+    from uw_rules_engine import uw_tools
+
+    flow = StateGraph(_uw_state())
+    flow.add_node(UW_COMPACT_HISTORY, uw_compact_history)
+    # Sync and async bodies, so ainvoke awaits the LLM instead of parking a thread on it
+    flow.add_node(UW_AGENT_REASON, RunnableLambda(uw_agent_reason, afunc=auw_agent_reason, name=UW_AGENT_REASON))
+    flow.add_node(UW_TOOL_NODE, ToolNode(uw_tools))
+
+    flow.set_entry_point(UW_COMPACT_HISTORY)
+    flow.add_edge(UW_COMPACT_HISTORY, UW_AGENT_REASON)
+    flow.add_conditional_edges(UW_AGENT_REASON, should_continue, {
+        END:END,
+        UW_TOOL_NODE:UW_TOOL_NODE})
+    flow.add_edge(UW_TOOL_NODE, UW_AGENT_REASON)
+
+    return flow.compile(checkpointer=checkpointer)
+
+
+@lru_cache(maxsize=1)
+def get_graph():
+    """Process-wide compiled graph, built on first use."""
+    return build_graph()
+
+
+def _checkpoint_path() -> str:
+    return os.environ.get("UW_CHECKPOINT_DB", "uw_checkpoints.db")
+
+
+@lru_cache(maxsize=1)
+def _memory_saver():
+    from langgraph.checkpoint.memory import InMemorySaver
+    return InMemorySaver()
+
+
+@lru_cache(maxsize=1)
+def get_session_graph():
+    """
+    Graph with a persistent checkpointer for multi-turn sessions.
 
-uw_flow = flow.compile()
-uw_flow.get_graph().draw_mermaid_png(output_file_path="uw_flow.png")
+    UW_CHECKPOINT_DB: SQLite path for session checkpoints ("" keeps them in memory only).
+    """
+    path = _checkpoint_path()
+    if not path:
+        return build_graph(_memory_saver())
+    import sqlite3
+    from langgraph.checkpoint.sqlite import SqliteSaver
+    saver = SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+    saver.setup()
+    return build_graph(saver)
+
+
+# SqliteSaver is sync-only; async sessions get an AsyncSqliteSaver per event loop
+_ASYNC_SESSION_GRAPHS: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+_ASYNC_SESSION_LOCKS: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+
+
+async def aget_session_graph():
+    """Async counterpart of get_session_graph for the running event loop."""
+    import asyncio
+    loop = asyncio.get_running_loop()
+    graph = _ASYNC_SESSION_GRAPHS.get(loop)
+    if graph is not None:
+        return graph
+    # Opening the connection awaits; concurrent first callers wait here instead of opening their own
+    async with _ASYNC_SESSION_LOCKS.setdefault(loop, asyncio.Lock()):
+        graph = _ASYNC_SESSION_GRAPHS.get(loop)
+        if graph is None:
+            path = _checkpoint_path()
+            if not path:
+                graph = build_graph(_memory_saver())
+            else:
+                import aiosqlite
+                from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+                saver = AsyncSqliteSaver(await aiosqlite.connect(path))
+                await saver.setup()
+                graph = build_graph(saver)
+            _ASYNC_SESSION_GRAPHS[loop] = graph
+    return graph
+
+
+async def aclose_session_graph() -> None:
+    """Close the running loop's checkpoint connection; its worker thread otherwise blocks interpreter exit."""
+    import asyncio
+    graph = _ASYNC_SESSION_GRAPHS.pop(asyncio.get_running_loop(), None)
+    conn = getattr(getattr(graph, "checkpointer", None), "conn", None)
+    if conn is not None and hasattr(conn, "close"):
+        await conn.close()
+
+
+GRAPH_NODES = (UW_COMPACT_HISTORY, UW_AGENT_REASON, UW_TOOL_NODE)
+
+
+@contextmanager
+def _tracked(entry: str, thread_id: str | None):
+    """Run config with a uw_metrics handler attached; the run is counted and traced on exit."""
+    from uw_metrics import run_metrics
+    handler = run_metrics(entry, GRAPH_NODES)
+    config: Dict[str, Any] = {"callbacks": [handler]}
+    if thread_id:
+        config["configurable"] = {"thread_id": thread_id}
+    failed = True
+    try:
+        yield config, handler
+        failed = False
+    except GeneratorExit:  # a stream consumer stopped early
+        failed = False
+        raise
+    finally:
+        handler.finish(failed)
+
+
+def __getattr__(name):
+    # `uw_flow` used to be compiled at import time; keep it importable, lazily
+    if name == "uw_flow":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def has_tool_message(result):
@@ -59,19 +273,193 @@ def has_tool_message(result):
     return False
 
 
-def run_graph(query: str) -> Dict[str, Any]:
-    result = uw_flow.invoke({"messages": [HumanMessage(
-        content=query)]})
-    answer = result["messages"][LAST].content
+class GraphBusyError(RuntimeError):
+    """Raised by arun_graph when the wait queue is full."""
+
+
+class GraphLimiter:
+    """
+    Caps concurrent graph runs at `max_concurrency` and the number of callers
+    waiting for a slot at `max_queue`; callers beyond that fail fast with
+    GraphBusyError instead of piling up.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        import asyncio
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self):
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                raise GraphBusyError(f"{self.waiting} requests already queued")
+            self.waiting += 1
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+
+# One limiter per event loop; asyncio primitives cannot be shared across loops
+_LIMITERS: "weakref.WeakKeyDictionary[Any, GraphLimiter]" = weakref.WeakKeyDictionary()
+
+
+def get_limiter() -> GraphLimiter:
+    import asyncio
+    loop = asyncio.get_running_loop()
+    limiter = _LIMITERS.get(loop)
+    if limiter is None:
+        limiter = _LIMITERS[loop] = GraphLimiter(
+            int(os.environ.get("UW_GRAPH_CONCURRENCY", 16)), int(os.environ.get("UW_GRAPH_QUEUE", 64)))
+    return limiter
+
+
+def _graph_result(result: dict) -> Dict[str, Any]:
+    from langchain_core.messages import ToolMessage
+    messages = result["messages"]
+    answer = messages[LAST].content
+    # Only the current turn counts; a session's earlier turns are in `messages` too
+    start = max((i for i, msg in enumerate(messages) if msg.type == "human"), default=0)
+    turn = {"messages": messages[start:]}
     audit = {}
-    if has_tool_message(result):
-        tool_msg = next(msg for msg in result["messages"] if isinstance(msg, ToolMessage))
-        audit = json.loads(tool_msg.content)["audit"]
+    decisions: Dict[str, dict] = {}
+    if has_tool_message(turn):
+        tool_msg = next(msg for msg in turn["messages"] if isinstance(msg, ToolMessage))
+        audit = (_tool_response(tool_msg) or {}).get("audit", {})
+        calls = _tool_calls(turn["messages"])
+        for msg in turn["messages"]:
+            entry = _decision_entry(_tool_response(msg)) if isinstance(msg, ToolMessage) else None
+            if entry is not None:
+                decisions[_application_id(calls.get(msg.tool_call_id)) or msg.tool_call_id] = entry
     return {
         "answer": answer,
-        "uw_audit": audit
+        "uw_audit": audit,
+        "uw_decisions": decisions
     }
 
+
+def run_graph(query: str, thread_id: str | None = None) -> Dict[str, Any]:
+    """
+    Run one turn and return its `answer`, evaluate `uw_audit` and `uw_metrics`
+    (node timings, LLM calls and tokens). With `thread_id`, the turn continues
+    that checkpointed session.
+
+    `uw_decisions` maps each applicationId evaluated in the turn to its
+    {"decision", "audit"}. Several applicants in one question are evaluated
+    by parallel tool calls from one model response, which the tool node runs
+    concurrently on its thread pool; `uw_audit` is the first one's audit.
+    """
+    from langchain_core.messages import HumanMessage
+    graph = get_session_graph() if thread_id else get_graph()
+    with _tracked("run_graph", thread_id) as (config, metrics):
+        result = graph.invoke({"messages": [HumanMessage(
+            content=query)]}, config)
+    return _graph_result(result) | {"uw_metrics": metrics.summary()}
+
+
+async def arun_graph(query: str, thread_id: str | None = None) -> Dict[str, Any]:
+    """
+    Async `run_graph` for event-loop servers. Runs through uw_flow.ainvoke on the
+    shared pooled chat client, limited by UW_GRAPH_CONCURRENCY concurrent runs and
+    UW_GRAPH_QUEUE waiting callers (GraphBusyError beyond that).
+    """
+    from langchain_core.messages import HumanMessage
+    graph = await aget_session_graph() if thread_id else get_graph()
+    with _tracked("arun_graph", thread_id) as (config, metrics):
+        async with get_limiter():
+            result = await graph.ainvoke({"messages": [HumanMessage(
+                content=query)]}, config)
+    return _graph_result(result) | {"uw_metrics": metrics.summary()}
+
+
+def _stream_events(mode: str, chunk: Any, calls: Dict[str, dict]) -> Iterator[Dict[str, Any]]:
+    """Translate one LangGraph (stream_mode, chunk) pair into UI events; `calls` collects the turn's tool calls."""
+    from langchain_core.messages import AIMessageChunk, ToolMessage
+    if mode == "messages":
+        msg, meta = chunk
+        if meta.get("langgraph_node") == UW_AGENT_REASON and isinstance(msg, AIMessageChunk) \
+                and isinstance(msg.content, str) and msg.content:
+            yield {"type": "token", "content": msg.content}
+        return
+    for node, update in (chunk or {}).items():
+        for msg in (update or {}).get("messages", []):
+            if node == UW_AGENT_REASON:
+                for call in getattr(msg, "tool_calls", None) or []:
+                    calls[call["id"]] = call
+                    yield {"type": "tool_start", "name": call["name"], "id": call["id"],
+                           "applicationId": _application_id(call)}
+                if not getattr(msg, "tool_calls", None):
+                    yield {"type": "answer", "content": msg.content}
+            elif node == UW_TOOL_NODE and isinstance(msg, ToolMessage):
+                response = _tool_response(msg)
+                entry = _decision_entry(response)
+                yield {"type": "tool_end", "name": msg.name, "id": msg.tool_call_id,
+                       "applicationId": _application_id(calls.get(msg.tool_call_id)),
+                       "audit": (response or {}).get("audit", {}),
+                       "decision": entry["decision"] if entry else None}
+
+
+def _collect_decision(decisions: Dict[str, dict], event: Dict[str, Any]) -> None:
+    if event["decision"] is not None:
+        decisions[event["applicationId"] or event["id"]] = {"decision": event["decision"], "audit": event["audit"]}
+
+
+def stream_graph(query: str, thread_id: str | None = None) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming `run_graph`. Yields events as the ReAct loop runs:
+
+    - {"type": "token", "content"}: LLM tokens from uw_agent_reason
+    - {"type": "tool_start", "name", "id", "applicationId"}: the model issued a tool call
+    - {"type": "tool_end", "name", "id", "applicationId", "audit", "decision"}: the tool
+      result landed; "decision" is the evaluate response without its audit (None for other tools)
+    - {"type": "done", "answer", "uw_audit", "uw_decisions", "uw_metrics"}: final result, same shape as run_graph
+    """
+    from langchain_core.messages import HumanMessage
+    audit, answer, calls, decisions = {}, "", {}, {}
+    graph = get_session_graph() if thread_id else get_graph()
+    with _tracked("stream_graph", thread_id) as (config, metrics):
+        for mode, chunk in graph.stream({"messages": [HumanMessage(content=query)]}, config,
+                                        stream_mode=["messages", "updates"]):
+            for event in _stream_events(mode, chunk, calls):
+                if event["type"] == "tool_end":
+                    audit = audit or event["audit"]
+                    _collect_decision(decisions, event)
+                elif event["type"] == "answer":
+                    answer = event["content"]
+                    continue
+                yield event
+        yield {"type": "done", "answer": answer, "uw_audit": audit, "uw_decisions": decisions,
+               "uw_metrics": metrics.summary()}
+
+
+async def astream_graph(query: str, thread_id: str | None = None) -> AsyncIterator[Dict[str, Any]]:
+    """Async `stream_graph`, under the same limiter as arun_graph."""
+    from langchain_core.messages import HumanMessage
+    audit, answer, calls, decisions = {}, "", {}, {}
+    graph = await aget_session_graph() if thread_id else get_graph()
+    with _tracked("astream_graph", thread_id) as (config, metrics):
+        async with get_limiter():
+            async for mode, chunk in graph.astream({"messages": [HumanMessage(content=query)]}, config,
+                                                   stream_mode=["messages", "updates"]):
+                for event in _stream_events(mode, chunk, calls):
+                    if event["type"] == "tool_end":
+                        audit = audit or event["audit"]
+                        _collect_decision(decisions, event)
+                    elif event["type"] == "answer":
+                        answer = event["content"]
+                        continue
+                    yield event
+        yield {"type": "done", "answer": answer, "uw_audit": audit, "uw_decisions": decisions,
+               "uw_metrics": metrics.summary()}
+
 if __name__ == "__main__":
     print("Hello ReAct LangGraph with Function Calling")
     # res = uw_flow.invoke({"messages": [HumanMessage(content="Evaluate the Medicare application. Its for state of Georgia, the start date of the medicare insurance is from 1st February 2026.")]})
@@ -0,0 +1,196 @@
+"""Streaming ingestion: JSONL/NDJSON dumps -> rules engine -> JSONL decisions, in bounded memory.
+
+    python uw_cli.py ingest dump.jsonl.gz --output decisions.jsonl [--batch-size 1000]
+
+Each stage is a generator, so at most one batch of requests, one batch of
+responses and the writer's bounded queue are alive at any time, whatever the
+size of the dump:
+
+    read_lines      -> raw lines (plain or .gz), one at a time
+    read_requests   -> `EvaluateRequest`s, validated as they are pulled;
+                       malformed rows go to the dead-letter file
+    batched         -> lists of at most `batch_size` requests
+    ingest          -> `uw_batch.evaluate_batch` per batch, responses to a
+                       `BackpressureWriter`
+
+With `trusted=True` (input already validated by an upstream system) rows are
+only JSON-decoded and reach `evaluate_batch` as plain dicts; malformed JSON
+still goes to the dead-letter file, schema errors are not detected.
+
+The writer encodes and writes on a background thread behind a bounded
+queue; when the disk falls behind, `write` blocks and the reader stops
+pulling input. Dead-letter entries keep the raw row so it can be fixed and
+replayed.
+"""
+from __future__ import annotations
+import gzip
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, Tuple
+
+import orjson
+
+from uw_models import REQUEST_ADAPTER, EvaluateRequest
+
+BATCH_SIZE = 1000
+MAX_PENDING = 4
+
+
+@dataclass
+class IngestStats:
+    rows: int = 0
+    rejected: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    blocked_seconds: float = 0.0   # time the pipeline waited on the output writer
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _open(path: Path) -> BinaryIO:
+    return gzip.open(path, "rb") if path.suffix == ".gz" else path.open("rb")
+
+
+def read_lines(source: str | Path | BinaryIO) -> Iterator[Tuple[int, bytes]]:
+    """(1-based line number, line) for every non-blank line of a JSONL file or binary stream."""
+    fh = _open(Path(source)) if isinstance(source, (str, Path)) else source
+    try:
+        for number, line in enumerate(fh, 1):
+            if line.strip():
+                yield number, line
+    finally:
+        if fh is not source:
+            fh.close()
+
+
+def dead_letter_entry(number: int, raw: Any, ex: Exception) -> dict:
+    """Dead-letter record for a row that failed to parse or validate."""
+    if hasattr(ex, "errors"):
+        error: Any = ex.errors(include_url=False, include_context=False, include_input=False)
+    else:
+        error = str(ex)
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+    return {"line": number, "error": error, "raw": raw}
+
+
+def read_requests(lines: Iterable[Tuple[int, bytes]], dead_letter: Callable[[dict], None] | None = None,
+                  trusted: bool = False) -> Iterator[EvaluateRequest | dict]:
+    """
+    Validate each line into an `EvaluateRequest` as it is pulled; bad rows go
+    to `dead_letter`. `trusted` yields the decoded dicts without validation.
+    """
+    parse = orjson.loads if trusted else REQUEST_ADAPTER.validate_json
+    for number, line in lines:
+        try:
+            yield parse(line)
+        except ValueError as ex:  # pydantic.ValidationError or orjson.JSONDecodeError
+            if dead_letter is not None:
+                dead_letter(dead_letter_entry(number, line, ex))
+
+
+def _application_id(request: EvaluateRequest | dict) -> Any:
+    return request["application"]["applicationId"] if isinstance(request, dict) else request.application.applicationId
+
+
+def batched(items: Iterable[Any], size: int = BATCH_SIZE) -> Iterator[List[Any]]:
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+class BackpressureWriter:
+    """
+    Writes JSON lines to a binary file on a background thread.
+
+    `write` hands a batch of objects to a queue of at most `max_pending`
+    batches and returns; once the queue is full it blocks until the thread
+    catches up, so a slow disk throttles the producer instead of buffering
+    output in memory. Writer errors are re-raised on the next `write` or
+    on `close`.
+    """
+
+    def __init__(self, fh: BinaryIO, max_pending: int = MAX_PENDING):
+        self.fh = fh
+        self.blocked_seconds = 0.0
+        self._queue: "queue.Queue[List[Any] | None]" = queue.Queue(maxsize=max_pending)
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="uw-ingest-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while (batch := self._queue.get()) is not None:
+            if self._error is None:
+                try:
+                    self.fh.write(b"".join(orjson.dumps(obj) + b"\n" for obj in batch))
+                except BaseException as ex:  # keep draining so producers never block forever
+                    self._error = ex
+        self.fh.flush()
+
+    def _raise(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def write(self, batch: List[Any]) -> None:
+        self._raise()
+        try:
+            self._queue.put_nowait(batch)
+        except queue.Full:
+            started = time.perf_counter()
+            self._queue.put(batch)
+            self.blocked_seconds += time.perf_counter() - started
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raise()
+
+    def __enter__(self) -> "BackpressureWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def ingest(source: str | Path | BinaryIO, output: str | Path, *, batch_size: int = BATCH_SIZE,
+           dead_letter: str | Path | None = None, store: bool = False, max_pending: int = MAX_PENDING,
+           progress: Callable[[IngestStats], None] | None = None, trusted: bool = False) -> IngestStats:
+    """
+    Evaluate every request in `source` and write one response line per valid
+    row to `output` (each with its `applicationId`). Malformed rows go to
+    `dead_letter` (default `<output>.errors.jsonl`). With `store=True` the
+    responses are also kept in the decision store, batch by batch.
+    `trusted` skips pydantic validation (see module doc).
+    """
+    from uw_batch import evaluate_batch
+
+    output = Path(output)
+    dead_letter = Path(dead_letter) if dead_letter else output.with_name(output.name + ".errors.jsonl")
+    stats = IngestStats()
+    started = time.perf_counter()
+    with output.open("wb") as out_fh, dead_letter.open("wb") as dead_fh, \
+            BackpressureWriter(out_fh, max_pending) as writer:
+        def reject(entry: dict) -> None:
+            stats.rejected += 1
+            dead_fh.write(orjson.dumps(entry) + b"\n")
+
+        for batch in batched(read_requests(read_lines(source), reject, trusted), batch_size):
+            responses = evaluate_batch(batch, store=store)
+            writer.write([{"applicationId": _application_id(request), **response}
+                          for request, response in zip(batch, responses)])
+            stats.rows += len(batch)
+            stats.batches += 1
+            if progress:
+                stats.seconds = time.perf_counter() - started
+                stats.blocked_seconds = writer.blocked_seconds
+                progress(stats)
+    stats.seconds = time.perf_counter() - started
+    stats.blocked_seconds = writer.blocked_seconds
+    return stats
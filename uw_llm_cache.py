@@ -0,0 +1,300 @@
+"""Response cache in front of `uw_chain`.
+
+Two levels, both persisted in SQLite:
+
+1. Exact: key is a hash of the normalized message history, the model name,
+   the prompt version and the rule-config version.
+2. Semantic (optional): for single-turn questions whose answer made no tool
+   call, a query embedding is compared against a local in-memory vector index;
+   a cosine similarity above the threshold reuses the stored answer.
+
+Entries expire after `ttl` seconds, the least recently hit are evicted past
+`max_entries`, and entries from other rule-config versions are purged when the
+config changes.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Volatile fields of evaluate tool results that must not break exact matches
+_VOLATILE_KEYS = {"decisionId", "evaluatedAt", "cachedFrom"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    cache_key      TEXT PRIMARY KEY,
+    model          TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    config_version TEXT NOT NULL,
+    created_at     REAL NOT NULL,
+    last_hit_at    REAL NOT NULL,
+    hits           INTEGER NOT NULL DEFAULT 0,
+    latency_ms     REAL NOT NULL,
+    message        TEXT NOT NULL,
+    query          TEXT,
+    embedding      TEXT
+)
+"""
+
+
+def _strip_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items() if k not in _VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    return value
+
+
+def normalize_messages(messages: Sequence[Any]) -> List[dict]:
+    """Canonical form of a message history: collapsed whitespace, case-folded human text,
+    tool calls without ids, tool results without decision ids/timestamps."""
+    out = []
+    for msg in messages:
+        content = msg.content if isinstance(msg.content, str) else json.dumps(msg.content, sort_keys=True)
+        item: Dict[str, Any] = {"type": msg.type}
+        if msg.type == "tool":
+            try:
+                content = json.dumps(_strip_volatile(json.loads(content)), sort_keys=True)
+            except ValueError:
+                pass
+            item["name"] = getattr(msg, "name", None)
+        else:
+            content = " ".join(content.split())
+            if msg.type == "human":
+                content = content.casefold()
+        item["content"] = content
+        calls = getattr(msg, "tool_calls", None)
+        if calls:
+            item["tool_calls"] = [{"name": c["name"], "args": c["args"]} for c in calls]
+        out.append(item)
+    return out
+
+
+class LlmResponseCache:
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600, max_entries: int = 50_000,
+                 embedder: Callable[[str], Sequence[float]] | None = None, similarity: float = 0.95):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embedder = embedder
+        self.similarity = similarity
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.latency_saved_ms = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._index: Dict[Tuple[str, str, str], Tuple[List[str], Any]] = {}
+        self._config_version: str | None = None
+        self._writes = 0
+        self._conn().execute(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def key(messages: Sequence[Any], model: str, prompt_version: str, config_version: str) -> str:
+        canonical = json.dumps([model, prompt_version, config_version, normalize_messages(messages)],
+                               sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    @staticmethod
+    def single_turn_query(messages: Sequence[Any]) -> str | None:
+        if len(messages) == 1 and messages[0].type == "human" and isinstance(messages[0].content, str):
+            return " ".join(messages[0].content.split())
+        return None
+
+    def _on_config_version(self, config_version: str) -> None:
+        if config_version == self._config_version:
+            return
+        with self._lock:
+            if config_version == self._config_version:
+                return
+            deleted = self._conn().execute(
+                "DELETE FROM llm_cache WHERE config_version != ?", (config_version,)).rowcount
+            self._index.clear()
+            self._config_version = config_version
+        if deleted:
+            logger.info("LLM cache: purged %d entries from previous rule config versions", deleted)
+
+    def lookup(self, messages: Sequence[Any], model: str, prompt_version: str, config_version: str):
+        """Cached AIMessage for this history, or None."""
+        from langchain_core.messages import messages_from_dict
+        self._on_config_version(config_version)
+        key = self.key(messages, model, prompt_version, config_version)
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT message, latency_ms, created_at FROM llm_cache WHERE cache_key = ?", (key,)).fetchone()
+        hit_key = key if row and now - row[2] <= self.ttl else None
+        if hit_key:
+            self.exact_hits += 1
+        elif self.embedder is not None:
+            query = self.single_turn_query(messages)
+            if query:
+                hit_key = self._nearest(query, (model, prompt_version, config_version))
+                if hit_key:
+                    row = self._conn().execute(
+                        "SELECT message, latency_ms, created_at FROM llm_cache WHERE cache_key = ?", (hit_key,)).fetchone()
+                    if row is None or now - row[2] > self.ttl:
+                        hit_key = None
+                    else:
+                        self.semantic_hits += 1
+        if not hit_key:
+            self.misses += 1
+            return None
+        self._conn().execute("UPDATE llm_cache SET hits = hits + 1, last_hit_at = ? WHERE cache_key = ?", (now, hit_key))
+        self.latency_saved_ms += row[1]
+        return messages_from_dict([json.loads(row[0])])[0]
+
+    def store(self, messages: Sequence[Any], model: str, prompt_version: str, config_version: str,
+              response: Any, latency_ms: float) -> None:
+        from langchain_core.messages import message_to_dict
+        key = self.key(messages, model, prompt_version, config_version)
+        query = embedding = None
+        # Only tool-free answers to single-turn questions are safe to reuse for a *similar* question
+        if self.embedder is not None and not getattr(response, "tool_calls", None):
+            query = self.single_turn_query(messages)
+            if query:
+                embedding = [float(x) for x in self.embedder(query)]
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO llm_cache (cache_key, model, prompt_version, config_version, created_at, "
+            "last_hit_at, hits, latency_ms, message, query, embedding) VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?)",
+            (key, model, prompt_version, config_version, now, now, latency_ms,
+             json.dumps(message_to_dict(response)), query, json.dumps(embedding) if embedding else None))
+        if embedding:
+            self._add_to_index((model, prompt_version, config_version), key, embedding)
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.evict()
+
+    def evict(self) -> None:
+        """Drop expired entries, then the least recently hit ones beyond max_entries."""
+        conn = self._conn()
+        expired = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl,)).rowcount
+        over = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+        if over > 0:
+            conn.execute("DELETE FROM llm_cache WHERE cache_key IN "
+                         "(SELECT cache_key FROM llm_cache ORDER BY last_hit_at LIMIT ?)", (over,))
+        if expired or over > 0:
+            with self._lock:
+                self._index.clear()
+
+    def _load_index(self, scope: Tuple[str, str, str]) -> Tuple[List[str], Any]:
+        import numpy as np
+        rows = self._conn().execute(
+            "SELECT cache_key, embedding FROM llm_cache WHERE model = ? AND prompt_version = ? "
+            "AND config_version = ? AND embedding IS NOT NULL", scope).fetchall()
+        keys = [r[0] for r in rows]
+        matrix = np.array([json.loads(r[1]) for r in rows], dtype=np.float32) if rows else None
+        if matrix is not None:
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        return keys, matrix
+
+    def _add_to_index(self, scope: Tuple[str, str, str], key: str, embedding: Sequence[float]) -> None:
+        import numpy as np
+        with self._lock:
+            if scope not in self._index:
+                return  # loaded from SQLite (including this row) on next lookup
+            keys, matrix = self._index[scope]
+            vec = np.asarray(embedding, dtype=np.float32)[None, :]
+            vec /= np.linalg.norm(vec)
+            self._index[scope] = (keys + [key], vec if matrix is None else np.vstack([matrix, vec]))
+
+    def _nearest(self, query: str, scope: Tuple[str, str, str]) -> str | None:
+        import numpy as np
+        with self._lock:
+            if scope not in self._index:
+                self._index[scope] = self._load_index(scope)
+            keys, matrix = self._index[scope]
+        if matrix is None:
+            return None
+        vec = np.asarray(self.embedder(query), dtype=np.float32)
+        scores = matrix @ (vec / np.linalg.norm(vec))
+        best = int(np.argmax(scores))
+        return keys[best] if scores[best] >= self.similarity else None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "entries": self._conn().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0],
+            "exactHits": self.exact_hits,
+            "semanticHits": self.semantic_hits,
+            "misses": self.misses,
+            "hitRate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+            "latencySavedMs": round(self.latency_saved_ms, 1),
+        }
+
+
+class CachedChain:
+    """Wraps a `{"uw_messages": [...]}` chain with an LlmResponseCache."""
+
+    def __init__(self, chain: Any, cache: LlmResponseCache, model: str, prompt_version: str,
+                 config_version: Callable[[], str]):
+        self.chain = chain
+        self.cache = cache
+        self.model = model
+        self.prompt_version = prompt_version
+        self.config_version = config_version
+
+    def invoke(self, inputs: dict, config: Any = None, **kwargs) -> Any:
+        messages = inputs["uw_messages"]
+        version = self.config_version()
+        cached = self.cache.lookup(messages, self.model, self.prompt_version, version)
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        response = self.chain.invoke(inputs, config, **kwargs)
+        self.cache.store(messages, self.model, self.prompt_version, version, response,
+                         (time.perf_counter() - started) * 1000)
+        return response
+
+    async def ainvoke(self, inputs: dict, config: Any = None, **kwargs) -> Any:
+        messages = inputs["uw_messages"]
+        version = self.config_version()
+        cached = self.cache.lookup(messages, self.model, self.prompt_version, version)
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        response = await self.chain.ainvoke(inputs, config, **kwargs)
+        self.cache.store(messages, self.model, self.prompt_version, version, response,
+                         (time.perf_counter() - started) * 1000)
+        return response
+
+
+def default_llm_cache() -> LlmResponseCache | None:
+    """
+    Cache configured by the environment, or None when disabled.
+
+    UW_LLM_CACHE_DB: SQLite path ("" disables the cache).
+    UW_LLM_CACHE_TTL / UW_LLM_CACHE_MAX_ENTRIES: expiry and size bounds.
+    UW_LLM_CACHE_SEMANTIC=1 enables the embedding tier (OpenAI embeddings,
+    EMBEDDING_MODEL), matched at UW_LLM_CACHE_SIMILARITY cosine similarity.
+    """
+    path = os.environ.get("UW_LLM_CACHE_DB", "uw_llm_cache.db")
+    if not path:
+        return None
+    embedder = None
+    if os.environ.get("UW_LLM_CACHE_SEMANTIC") == "1":
+        from langchain_openai import OpenAIEmbeddings
+        embedder = OpenAIEmbeddings(model=os.environ.get("EMBEDDING_MODEL", "text-embedding-3-small"),
+                                    api_key=os.environ.get("OPENAI_API_KEY")).embed_query
+    return LlmResponseCache(
+        path,
+        ttl=float(os.environ.get("UW_LLM_CACHE_TTL", 7 * 24 * 3600)),
+        max_entries=int(os.environ.get("UW_LLM_CACHE_MAX_ENTRIES", 50_000)),
+        embedder=embedder,
+        similarity=float(os.environ.get("UW_LLM_CACHE_SIMILARITY", 0.95)),
+    )
@@ -0,0 +1,257 @@
+"""Local instrumentation for the agent graph and the rules engine.
+
+Metrics live in a process-wide registry and are exported in the Prometheus
+text format (`render_prometheus`, or `write_prometheus` for a node-exporter
+textfile collector; UW_METRICS_FILE rewrites that file after every graph run). Each graph run is tracked by a `RunMetrics` callback
+handler that times the graph nodes and counts LLM calls and tokens; its
+summary is returned with the run and, when UW_TRACE_FILE is set, appended to
+that file as a JSON line ("-" writes to stderr).
+
+Rule blocks are timed with `RuleTimer`. With UW_DEBUG_AUDIT=1 (or
+`set_debug_audit(True)`) the per-rule durations are added to the evaluate
+audit as `ruleTimingsMs`.
+"""
+from __future__ import annotations
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_DEBUG_AUDIT = os.environ.get("UW_DEBUG_AUDIT") == "1"
+
+
+def set_debug_audit(enabled: bool) -> None:
+    global _DEBUG_AUDIT
+    _DEBUG_AUDIT = enabled
+
+
+def debug_audit() -> bool:
+    return _DEBUG_AUDIT
+
+
+INF_BUCKET = 'le="+Inf"'
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels] + ([extra] if extra else [])
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.help, self.buckets = name, help, buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[Tuple[str, str], ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        slot = bisect_left(self.buckets, seconds)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            row[slot] += 1
+            row[-1] += seconds
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, row in sorted(self._values.items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, row):
+                    cumulative += count
+                    le = 'le="%g"' % bound
+                    lines.append(f"{self.name}_bucket{_labels(key, le)} {cumulative:g}")
+                cumulative += row[len(self.buckets)]
+                lines.append(f"{self.name}_bucket{_labels(key, INF_BUCKET)} {cumulative:g}")
+                lines.append(f"{self.name}_sum{_labels(key)} {row[-1]:.6f}")
+                lines.append(f"{self.name}_count{_labels(key)} {cumulative:g}")
+        return lines
+
+
+GRAPH_RUNS = Counter("uw_graph_runs_total", "Graph runs by entry point and outcome.")
+NODE_SECONDS = Histogram("uw_node_seconds", "Graph node duration.")
+LLM_CALLS = Counter("uw_llm_calls_total", "Chat model calls (cache hits excluded).")
+LLM_TOKENS = Counter("uw_llm_tokens_total", "Chat model tokens by kind (prompt/completion).")
+EVALUATIONS = Counter("uw_evaluations_total", "Rules engine evaluations by decision cache result.")
+DECISION_OVERFLOW = Counter("uw_decision_store_overflow_total",
+                            "Decision writes that found the SQLite writer queue full, by outcome (held/dropped).")
+RULE_SECONDS = Histogram("uw_rule_seconds", "Rules engine rule block duration.",
+                         (0.000001, 0.000005, 0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.01))
+
+REGISTRY = [GRAPH_RUNS, NODE_SECONDS, LLM_CALLS, LLM_TOKENS, EVALUATIONS, DECISION_OVERFLOW, RULE_SECONDS]
+
+
+def render_prometheus() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+def write_prometheus(path: str | Path) -> None:
+    """Write the registry atomically, for the node-exporter textfile collector."""
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(render_prometheus())
+    tmp.replace(path)
+
+
+class RuleTimer:
+    """Lap timer for the rule chain: `lap(rule)` charges the time since the previous lap to `rule`."""
+
+    __slots__ = ("laps", "_last")
+
+    def __init__(self):
+        self.laps: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def lap(self, rule: str) -> None:
+        now = time.perf_counter()
+        self.laps[rule] = self.laps.get(rule, 0.0) + now - self._last
+        self._last = now
+
+    def record(self) -> None:
+        for rule, seconds in self.laps.items():
+            RULE_SECONDS.observe(seconds, rule=rule)
+
+    def as_ms(self) -> Dict[str, float]:
+        return {rule: round(seconds * 1000, 4) for rule, seconds in self.laps.items()}
+
+
+def _trace_sink():
+    target = os.environ.get("UW_TRACE_FILE")
+    if not target:
+        return None
+    return sys.stderr if target == "-" else target
+
+
+_TRACE_LOCK = threading.Lock()
+
+
+def _make_run_metrics():
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class RunMetrics(BaseCallbackHandler):
+        """Callback handler for one graph run: node spans, LLM calls and token counts."""
+
+        def __init__(self, entry: str, nodes: Tuple[str, ...]):
+            self.entry = entry
+            self.nodes = set(nodes)
+            self.started = time.perf_counter()
+            self.spans: List[Dict[str, Any]] = []
+            self.llm_calls = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self._open: Dict[Any, Tuple[str, float]] = {}
+            self._lock = threading.Lock()
+
+        def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, name=None,
+                           **kwargs):
+            node = (metadata or {}).get("langgraph_node")
+            if node in self.nodes and (name or (serialized or {}).get("name")) == node:
+                parent = self._open.get(parent_run_id)
+                if parent is None or parent[0] != node:  # the node's runnable may share its name
+                    self._open[run_id] = (node, time.perf_counter())
+
+        def _close(self, run_id, error: bool) -> None:
+            opened = self._open.pop(run_id, None)
+            if opened is None:
+                return
+            node, t0 = opened
+            took = time.perf_counter() - t0
+            NODE_SECONDS.observe(took, node=node)
+            with self._lock:
+                self.spans.append({"node": node, "ms": round(took * 1000, 3), "error": error})
+
+        def on_chain_end(self, outputs, *, run_id, **kwargs):
+            self._close(run_id, False)
+
+        def on_chain_error(self, error, *, run_id, **kwargs):
+            self._close(run_id, True)
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            prompt = completion = 0
+            for generations in response.generations:
+                for gen in generations:
+                    usage = getattr(getattr(gen, "message", None), "usage_metadata", None) or {}
+                    prompt += usage.get("input_tokens", 0)
+                    completion += usage.get("output_tokens", 0)
+            with self._lock:
+                self.llm_calls += 1
+                self.prompt_tokens += prompt
+                self.completion_tokens += completion
+            LLM_CALLS.inc()
+            LLM_TOKENS.inc(prompt, kind="prompt")
+            LLM_TOKENS.inc(completion, kind="completion")
+
+        def summary(self) -> Dict[str, Any]:
+            node_ms: Dict[str, float] = {}
+            for span in self.spans:
+                node_ms[span["node"]] = round(node_ms.get(span["node"], 0.0) + span["ms"], 3)
+            return {
+                "totalMs": round((time.perf_counter() - self.started) * 1000, 3),
+                "llmCalls": self.llm_calls,
+                "promptTokens": self.prompt_tokens,
+                "completionTokens": self.completion_tokens,
+                "nodeMs": node_ms,
+                "spans": self.spans,
+            }
+
+        def finish(self, error: bool = False) -> Dict[str, Any]:
+            """Count the run, export its trace line and return the summary."""
+            GRAPH_RUNS.inc(entry=self.entry, outcome="error" if error else "ok")
+            if os.environ.get("UW_METRICS_FILE"):
+                with _TRACE_LOCK:
+                    write_prometheus(os.environ["UW_METRICS_FILE"])
+            summary = self.summary()
+            sink = _trace_sink()
+            if sink is not None:
+                line = json.dumps({"ts": time.time(), "entry": self.entry, **summary}, separators=(",", ":"))
+                with _TRACE_LOCK:
+                    if sink is sys.stderr:
+                        print(line, file=sys.stderr)
+                    else:
+                        with open(sink, "a") as fh:
+                            fh.write(line + "\n")
+            return summary
+
+    return RunMetrics
+
+
+_RUN_METRICS_CLS = None
+
+
+def run_metrics(entry: str, nodes: Tuple[str, ...]):
+    """New RunMetrics handler; pass it in the run config's `callbacks`."""
+    global _RUN_METRICS_CLS
+    if _RUN_METRICS_CLS is None:
+        # langchain_core is only imported once a graph actually runs
+        _RUN_METRICS_CLS = _make_run_metrics()
+    return _RUN_METRICS_CLS(entry, nodes)
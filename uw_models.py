@@ -1,15 +1,29 @@
 from __future__ import annotations
-from pydantic import BaseModel, Field
-from typing import Literal
-from langchain_core.tools import tool
+from datetime import date
+from pydantic import AfterValidator, BaseModel, Field, PrivateAttr, TypeAdapter
+from typing import Annotated, Any, Literal, Mapping
 
 from pydantic import BaseModel, Field
 from typing import Optional, List, Literal
 
+from uw_dates import parse_date
+
+
+def _check_iso_date(value: str) -> str:
+    parse_date(value)  # memoized; model_post_init reuses the parsed date
+    return value
+
+
+# YYYY-MM-DD string on the wire, checked at validation; the models below keep
+# the parsed `date` in a private attribute for the rules engine. Private
+# attributes are read and written through `__pydantic_private__` directly:
+# plain `self._x` access goes through BaseModel.__getattr__, which costs ~3 us.
+IsoDate = Annotated[str, AfterValidator(_check_iso_date)]
+
 
 class Application(BaseModel):
     applicationId: str = Field(..., description="Unique identifier for the application")
-    receivedDate: str = Field(..., description="Date the application was received (YYYY-MM-DD)")
+    receivedDate: IsoDate = Field(..., description="Date the application was received (YYYY-MM-DD)")
     requestedEffectiveDate: str = Field(..., description="Requested policy effective date")
     channel: Optional[Literal['AGENT','BROKER','DIRECT','MGA']] = Field(
         'AGENT', description="Sales channel through which the application was submitted"
@@ -18,33 +32,65 @@ class Application(BaseModel):
         None, description="Carrier identifier when supporting multiple carriers"
     )
 
+    _received: date = PrivateAttr()
+
+    def model_post_init(self, __context) -> None:
+        self.__pydantic_private__["_received"] = parse_date(self.receivedDate)
+
+    @property
+    def received_date(self) -> date:
+        return self.__pydantic_private__["_received"]
+
 
 class Applicant(BaseModel):
     firstName: Optional[str] = Field(None, description="Applicant's first name")
     lastName: Optional[str] = Field(None, description="Applicant's last name")
-    dateOfBirth: str = Field(..., description="Applicant's date of birth (YYYY-MM-DD)")
+    dateOfBirth: IsoDate = Field(..., description="Applicant's date of birth (YYYY-MM-DD)")
     state: str = Field(..., description="State of residence (2-letter code)")
     zip: Optional[str] = Field(None, description="ZIP code of residence")
     tobaccoUse: Optional[bool] = Field(False, description="Whether the applicant uses tobacco")
     heightInches: Optional[int] = Field(None, description="Height in inches (used for BMI)")
     weightPounds: Optional[int] = Field(None, description="Weight in pounds (used for BMI)")
     partAEffectiveDate: str = Field(..., description="Medicare Part A effective date")
-    partBEffectiveDate: str = Field(..., description="Medicare Part B effective date")
+    partBEffectiveDate: IsoDate = Field(..., description="Medicare Part B effective date")
     currentlyOnMA: Optional[bool] = Field(
         False, description="Whether the applicant is currently enrolled in Medicare Advantage"
     )
     currentCoverageType: Optional[
         Literal['NONE','MEDIGAP','MA','EMPLOYER_GROUP','UNION','SELECT','OTHER']
     ] = Field('NONE', description="Type of existing coverage at time of application")
-    medicareEligibilityDate: Optional[str] = Field(
+    medicareEligibilityDate: Optional[IsoDate] = Field(
         None, description="Date the applicant first became eligible for Medicare"
     )
 
+    _dob: date = PrivateAttr()
+    _partb: date = PrivateAttr()
+    _medicare_elig: date | None = PrivateAttr()
+
+    def model_post_init(self, __context) -> None:
+        private = self.__pydantic_private__
+        private["_dob"] = parse_date(self.dateOfBirth)
+        private["_partb"] = parse_date(self.partBEffectiveDate)
+        private["_medicare_elig"] = parse_date(self.medicareEligibilityDate) if self.medicareEligibilityDate else None
+
+    @property
+    def birth_date(self) -> date:
+        return self.__pydantic_private__["_dob"]
+
+    @property
+    def part_b_date(self) -> date:
+        return self.__pydantic_private__["_partb"]
+
+    @property
+    def medicare_eligibility_date(self) -> date | None:
+        return self.__pydantic_private__["_medicare_elig"]
+
+
+PlanLetter = Literal['A','B','C','D','F','G','K','L','M','N','HDG','HDF']
+
 
 class Coverage(BaseModel):
-    requestedPlanLetter: Literal[
-        'A','B','C','D','F','G','K','L','M','N','HDG','HDF'
-    ] = Field(..., description="Requested Medigap plan letter")
+    requestedPlanLetter: PlanLetter = Field(..., description="Requested Medigap plan letter")
     replacingCoverage: Optional[bool] = Field(
         False, description="Whether the applicant is replacing existing coverage"
     )
@@ -89,7 +135,16 @@ class GiEvent(BaseModel):
         'EMPLOYER_GROUP_ENDING','MEDIGAP_INSOLVENCY','SELECT_MOVE_OUT_OF_AREA',
         'CARRIER_RULE_VIOLATION_OR_MISLEADING'
     ] = Field(..., description="Type of Guaranteed Issue qualifying event")
-    triggeringDate: str = Field(..., description="Date the GI event occurred")
+    triggeringDate: IsoDate = Field(..., description="Date the GI event occurred")
+
+    _triggered: date = PrivateAttr()
+
+    def model_post_init(self, __context) -> None:
+        self.__pydantic_private__["_triggered"] = parse_date(self.triggeringDate)
+
+    @property
+    def triggering_date(self) -> date:
+        return self.__pydantic_private__["_triggered"]
 
 
 class EvaluateRequest(BaseModel):
@@ -107,6 +162,33 @@ class EvaluateRequest(BaseModel):
     )
 
 
+class ScenarioGrid(BaseModel):
+    requestedPlanLetters: List[PlanLetter] = Field(
+        default_factory=list, description="Plan letters to compare; empty keeps the application's plan"
+    )
+    receivedDates: List[IsoDate] = Field(
+        default_factory=list, description="Received dates (YYYY-MM-DD) to compare; empty keeps the application's date"
+    )
+    giEventSets: List[List[GiEvent]] = Field(
+        default_factory=list,
+        description="Alternative GI event lists, each replacing the application's giEvents; empty keeps them"
+    )
+
+
+# Built once at import; reused by every JSON/dict entry point
+REQUEST_ADAPTER: TypeAdapter[EvaluateRequest] = TypeAdapter(EvaluateRequest)
+REQUEST_LIST_ADAPTER: TypeAdapter[List[EvaluateRequest]] = TypeAdapter(List[EvaluateRequest])
+
+
+def parse_request(data: str | bytes | Mapping[str, Any] | EvaluateRequest) -> EvaluateRequest:
+    """JSON text, a dict or a model -> validated EvaluateRequest, through the prebuilt adapter."""
+    if isinstance(data, EvaluateRequest):
+        return data
+    if isinstance(data, (str, bytes)):
+        return REQUEST_ADAPTER.validate_json(data)
+    return REQUEST_ADAPTER.validate_python(data)
+
+
 class Reason(BaseModel):
     code: str = Field(..., description="Machine-readable reason code")
     message: str = Field(..., description="Human-readable explanation")
@@ -187,6 +269,56 @@ class DeclineCondition(BaseModel):
     code: str = Field(..., description="Unique decline condition code")
     label: str = Field(..., description="Short label for the decline condition")
     description: Optional[str] = Field(None, description="Detailed explanation")
+    synonyms: List[str] = Field(
+        default_factory=list, description="Alternate names or codes that also match this condition"
+    )
+
+
+class AutoDeclineRule(BaseModel):
+    code: str = Field(..., description="Decline code reported when the rule fires")
+    conditions: List[str] = Field(..., description="Disclosed conditions that trigger the rule (exact match)")
+    oxygenUse: Optional[bool] = Field(
+        None, description="When true, the rule only fires if the applicant also uses oxygen"
+    )
+
+
+class DecisionRuleWhen(BaseModel):
+    fact: Literal["continuousGiState", "openEnrollment", "giEvent", "currentlyOnMA", "stateIn", "always"] = Field(
+        ..., description="Request fact the rule tests"
+    )
+    states: Optional[List[str]] = Field(None, description="States matched by the stateIn fact")
+
+
+class DecisionRuleOutcome(BaseModel):
+    status: Literal["ACCEPT_NO_UW", "ACCEPT_WITH_UW", "DECLINE", "PENDED"] = Field(..., description="Decision status")
+    underwritingRequired: bool = Field(..., description="Whether medical underwriting is required")
+    reason: str = Field(..., description="Reason message; may use {state} and {giType}")
+    plans: Literal["ALL", "GI", "NONE"] = Field(
+        "NONE", description="Allowed plans: all plans, the GI event's permitted plans, or none"
+    )
+    macraFilter: bool = Field(False, description="Remove C/F/HDF for applicants newly eligible after MACRA")
+    notes: List[str] = Field(default_factory=list, description="Plan restriction notes")
+    requestsForInformation: List[str] = Field(default_factory=list, description="Information to request")
+
+
+class DecisionRuleMacraAudit(BaseModel):
+    ruleId: str = Field(..., description="Audit rule id added when the MACRA filter applied")
+    details: str = Field(..., description="Audit details")
+
+
+class DecisionRuleAudit(BaseModel):
+    fired: str = Field("", description="Audit details when the rule decides; may use {state} and {giType}")
+    skipped: str = Field("", description="Audit details when the rule does not match")
+    macra: Optional[DecisionRuleMacraAudit] = Field(
+        None, description="Extra FIRED audit entry when the applicant is newly eligible after MACRA"
+    )
+
+
+class DecisionRule(BaseModel):
+    ruleId: str = Field(..., description="Rule id, also the reason code of its decision")
+    when: DecisionRuleWhen = Field(..., description="Predicate; the first matching rule decides")
+    outcome: DecisionRuleOutcome = Field(..., description="Decision template")
+    audit: DecisionRuleAudit = Field(default_factory=DecisionRuleAudit, description="Audit details")
 
 
 class GiScenario(BaseModel):
@@ -0,0 +1,118 @@
+"""Incremental re-evaluation of stored decisions after a rule-data change.
+
+    report = reevaluate(old_cfg, new_cfg)     # dry run against the active decision store
+    report.as_dict()                          # keys, counts, and old -> new status/reasons per changed decision
+
+Every decision stored through `evaluate_request` or `evaluate_batch` keeps
+its request row and the dependency keys of the config entries it read
+(`uw_rules_engine.decision_dependencies`). `changed_keys` maps the diff
+between two RuleConfigs onto those keys, so only decisions that read a
+changed entry are looked up and run through the rule chain again:
+
+    state:XX          continuousGi flipped for XX
+    gi:TYPE           GI scenario TYPE added, removed, or lookback/permitted plans changed
+    lookback:default  defaultLookbackDays changed
+    condition:ITEM    the decline table now matches a disclosed condition differently
+
+Decline-table edits are resolved against the distinct condition strings the
+store has indexed: each is matched with the old and the new matcher, with
+and without oxygen use. A decision-table edit changes every rule path, so
+it re-runs every indexed decision.
+"""
+from __future__ import annotations
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set
+
+import uw_rules_engine as engine
+from uw_config import RuleConfig
+from uw_decision_store import DecisionStore
+
+CONDITION_PREFIX = "condition:"
+
+
+def changed_keys(old: RuleConfig, new: RuleConfig, store: DecisionStore) -> Set[str] | None:
+    """Dependency keys whose config entries differ between `old` and `new`; None when every decision is affected."""
+    if old.decision_table.spec != new.decision_table.spec:
+        return None
+    keys = {f"state:{state}" for state in old.continuous_gi_states ^ new.continuous_gi_states}
+    for gi_type in set(old.gi_scenarios) | set(new.gi_scenarios):
+        if (old.gi_lookback_days.get(gi_type) != new.gi_lookback_days.get(gi_type)
+                or old.gi_plan_letters.get(gi_type) != new.gi_plan_letters.get(gi_type)
+                or (gi_type in old.gi_scenarios) != (gi_type in new.gi_scenarios)):
+            keys.add(f"gi:{gi_type}")
+    if old.default_lookback_days != new.default_lookback_days:
+        keys.add("lookback:default")
+    if (dict(old.decline_conditions) != dict(new.decline_conditions)
+            or old.decline_matcher.rules != new.decline_matcher.rules):
+        for key in store.dependency_keys(CONDITION_PREFIX):
+            item = key[len(CONDITION_PREFIX):]
+            if any(old.decline_matcher.match([item], oxygen) != new.decline_matcher.match([item], oxygen)
+                   for oxygen in (False, True)):
+                keys.add(key)
+    return keys
+
+
+def _outcome(decision: dict) -> Dict[str, Any]:
+    return {"status": decision["status"], "reasons": [r["code"] for r in decision["reasons"]]}
+
+
+@dataclass
+class ChangeReport:
+    from_version: str
+    to_version: str
+    keys: List[str] | None  # None: the decision table changed, every decision was a candidate
+    candidates: int = 0
+    reevaluated: int = 0
+    missing: int = 0  # indexed but no longer stored (evicted from a memory store)
+    errors: int = 0  # stored rows the rule chain rejects (e.g. a batch row without a received date)
+    changes: List[dict] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {"fromVersion": self.from_version, "toVersion": self.to_version, "keys": self.keys,
+                "candidates": self.candidates, "reevaluated": self.reevaluated, "missing": self.missing,
+                "errors": self.errors, "changed": len(self.changes), "seconds": round(self.seconds, 6),
+                "changes": self.changes}
+
+
+def reevaluate(old: RuleConfig, new: RuleConfig, store: DecisionStore | None = None,
+               apply: bool = False) -> ChangeReport:
+    """
+    Re-run the stored decisions that `old` -> `new` can affect under `new`
+    and report those whose status or reasons changed, against the decision
+    as stored. With `apply`, every re-run decision is written back under its
+    decision id with the new config version and `audit.previousConfigVersion`.
+    """
+    started = time.perf_counter()
+    store = store or engine.get_decision_store()
+    keys = changed_keys(old, new, store)
+    report = ChangeReport(old.version, new.version, sorted(keys) if keys is not None else None)
+    if keys is None:
+        candidates = sorted(store.indexed_ids())
+    else:
+        candidates = sorted(store.dependents(keys)) if keys else []
+    report.candidates = len(candidates)
+
+    for decision_id in candidates:
+        previous, inputs = store.get(decision_id), store.get_inputs(decision_id)
+        if previous is None or inputs is None:
+            report.missing += 1
+            continue
+        rec = engine.RequestRecord.from_row(inputs[0])
+        try:
+            decision, audit = engine._decide(rec, new, engine._NO_TIMER)
+        except (TypeError, ValueError):
+            report.errors += 1
+            continue
+        report.reevaluated += 1
+        if decision["status"] != previous["status"] or decision["reasons"] != previous["reasons"]:
+            report.changes.append({"decisionId": decision_id, "applicationId": rec.application_id,
+                                   "old": _outcome(previous), "new": _outcome(decision)})
+        if apply:
+            response = engine._assemble_response(decision_id, decision, audit, new.version)
+            response["audit"]["previousConfigVersion"] = previous["audit"]["configVersion"]
+            deps = engine.decision_dependencies(rec.state, [t for t, _ in rec.gi_events], rec.conditions, audit)
+            store.put(decision_id, response, (inputs[0], deps))
+    report.seconds = time.perf_counter() - started
+    return report
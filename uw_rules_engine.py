@@ -1,63 +1,165 @@
 
 from __future__ import annotations
-from typing import Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
 from datetime import date, datetime
-from dateutil.relativedelta import relativedelta
+from pathlib import Path
+import hashlib
+import itertools
+import json
+import os
+import threading
+import orjson
 from uw_models import (
-    EvaluateRequest, WaitingPeriod, RatingGuidance
+    EvaluateRequest, ScenarioGrid, WaitingPeriod, RatingGuidance
 )
+from uw_dates import EPOCH_ORDINAL, days_between, in_open_enrollment, parse_date
+from uw_cache import LruTtlCache
+from uw_decision_store import DecisionStore, default_decision_store
+from uw_config import DATA_DIR, RuleConfig, RuleConfigWatcher, load_rule_config, as_legacy_tables
+from uw_metrics import EVALUATIONS, RuleTimer, debug_audit
+from uw_decision_table import MACRA_CUTOFF, MACRA_PLANS, GI_BASE_PLANS, OPTIONAL_GI_PLANS, ALL_PLANS
 from langchain_core.tools import tool
 
-# In-memory decision store for demo purposes
-_DECISIONS: Dict[str, dict] = {}
+# Decision store behind get_decision; created from the environment on first use
+_DECISION_STORE: DecisionStore | None = None
+_DECISION_STORE_LOCK = threading.Lock()
+_DECISION_SEQ = itertools.count()
 
-# Data-driven configurations (loaded by main at startup)
+# Data-driven configurations (loaded by main at startup). Plain-dict mirrors of
+# the active RuleConfig; the rules below read the compiled tables directly.
 STATE_OVERRIDES: Dict[str, dict] = {}
 DECLINE_CONDITIONS: Dict[str, dict] = {}
 GI_SCENARIOS: Dict[str, dict] = {}
 
-# Constants
-MACRA_CUTOFF = date(2020, 1, 1)
+# Active rule config. Swapped atomically by install_rule_config; each evaluation
+# reads it once so in-flight calls finish against the version they started with.
+_RULE_CONFIG: RuleConfig | None = None
+_RULE_CONFIG_LOCK = threading.Lock()
+_RULE_WATCHER: RuleConfigWatcher | None = None
+
+# Memoized decisions keyed by canonical request + config version (see configure_evaluation_cache)
+_EVAL_CACHE: LruTtlCache | None = None
+
+# Constants (plan letters and the MACRA cutoff live with the decision table)
 GI_DEFAULT_LOOKBACK_DAYS = 63
-GI_BASE_PLANS = {"A","B","C","D","F","G","K","L"}
-OPTIONAL_GI_PLANS = {"N"}  # May be carrier-dependent
-ALL_PLANS = ["A","B","C","D","F","G","K","L","M","N","HDG","HDF"]
+MAX_SCENARIOS = 1000
+
+
+def install_rule_config(cfg: RuleConfig) -> RuleConfig:
+    """Make `cfg` the rule configuration used by `evaluate`."""
+    with _RULE_CONFIG_LOCK:
+        return _install_locked(cfg)
+
+
+def _install_locked(cfg: RuleConfig) -> RuleConfig:
+    global _RULE_CONFIG
+    states, declines, scenarios = as_legacy_tables(cfg)
+    _RULE_CONFIG = cfg
+    for table, values in ((STATE_OVERRIDES, states), (DECLINE_CONDITIONS, declines), (GI_SCENARIOS, scenarios)):
+        table.clear()
+        table.update(values)
+    return cfg
+
+
+def get_rule_config() -> RuleConfig:
+    """The active rule configuration, loading `data/` on first use."""
+    cfg = _RULE_CONFIG
+    if cfg is None:
+        with _RULE_CONFIG_LOCK:
+            # Concurrent first callers wait here and share the one compiled config
+            cfg = _RULE_CONFIG
+            if cfg is None:
+                cfg = _install_locked(load_rule_config())
+    return cfg
+
+
+def watch_rule_config(data_dir: str | Path = DATA_DIR, snapshot: str | Path | None = None,
+                      interval: float = 2.0) -> RuleConfigWatcher:
+    """Start (once per process) a background watcher that hot-swaps the rule config on file changes."""
+    global _RULE_WATCHER
+    with _RULE_CONFIG_LOCK:
+        if _RULE_WATCHER is None:
+            current = _RULE_CONFIG.version if _RULE_CONFIG else None
+            _RULE_WATCHER = RuleConfigWatcher(install_rule_config, data_dir, snapshot, interval, current).start()
+    return _RULE_WATCHER
+
+
+def get_decision_store() -> DecisionStore:
+    global _DECISION_STORE
+    if _DECISION_STORE is None:
+        with _DECISION_STORE_LOCK:
+            if _DECISION_STORE is None:
+                _DECISION_STORE = default_decision_store()
+    return _DECISION_STORE
+
 
+def set_decision_store(store: DecisionStore) -> DecisionStore:
+    """Replace the decision store (e.g. an in-memory one for batch jobs)."""
+    global _DECISION_STORE
+    _DECISION_STORE = store
+    return store
 
-def _parse_date(s: str) -> date:
-    return datetime.strptime(s, "%Y-%m-%d").date()
 
+def configure_evaluation_cache(maxsize: int = 4096, ttl: float | None = 900.0) -> LruTtlCache | None:
+    """Replace the evaluation cache; `maxsize=0` disables memoization."""
+    global _EVAL_CACHE
+    _EVAL_CACHE = LruTtlCache(maxsize, ttl) if maxsize > 0 else None
+    return _EVAL_CACHE
 
-def _is_open_enrollment(applicant_dob: date, partb: date, asof: date) -> bool:
-    age_years = relativedelta(asof, applicant_dob).years
-    if age_years < 65:
-        return False
-    start = date(partb.year, partb.month, 1)
-    end = start + relativedelta(months=+6) - relativedelta(days=+1)
-    return start <= asof <= end
 
+configure_evaluation_cache(int(os.environ.get("UW_EVAL_CACHE_SIZE", 4096)),
+                           float(os.environ.get("UW_EVAL_CACHE_TTL", 900)))
 
-def _gi_applies(gi_events: List[dict], received: date) -> Tuple[bool, dict]:
+
+def evaluation_cache_stats() -> dict:
+    return _EVAL_CACHE.stats() if _EVAL_CACHE is not None else {"size": 0, "maxsize": 0, "hits": 0, "misses": 0}
+
+
+def _request_cache_key(rec: RequestRecord, config_version: str) -> str:
+    """Canonical hash of the request fields the rule chain reads, plus the rule-config version."""
+    canonical = (
+        config_version,
+        rec.received.toordinal(), rec.dob.toordinal(), rec.state, rec.tobacco, rec.height, rec.weight,
+        rec.partb.toordinal(), rec.on_ma, rec.medicare_elig.toordinal() if rec.medicare_elig else None,
+        rec.plan, rec.prior_months, rec.gap_days,
+        [(gi_type, trig.toordinal()) for gi_type, trig in rec.gi_events],
+        sorted({c.upper() for c in rec.conditions}),
+        rec.oxygen,
+    )
+    return hashlib.sha256(json.dumps(canonical, separators=(",", ":")).encode()).hexdigest()
+
+
+_is_open_enrollment = in_open_enrollment  # see uw_dates
+
+
+def _gi_applies(gi_events: List[dict], received: date, lookback_days: Mapping[str, int] | None = None,
+                default_lookback: int = GI_DEFAULT_LOOKBACK_DAYS) -> Tuple[bool, dict]:
     for ev in gi_events:
-        trig = _parse_date(ev["triggeringDate"]) if isinstance(ev["triggeringDate"], str) else ev["triggeringDate"]
-        diff = (received - trig).days
-        if 0 <= diff <= GI_DEFAULT_LOOKBACK_DAYS:
+        trig = parse_date(ev["triggeringDate"]) if isinstance(ev["triggeringDate"], str) else ev["triggeringDate"]
+        diff = days_between(trig, received)
+        lookback = lookback_days.get(ev["type"], default_lookback) if lookback_days else default_lookback
+        if 0 <= diff <= lookback:
             return True, ev
     return False, {}
 
 
-def _apply_macra_filter(plan_letters: List[str], medicare_elig_date: date | None) -> List[str]:
-    if medicare_elig_date and medicare_elig_date >= MACRA_CUTOFF:
-        return [p for p in plan_letters if p not in ("C","F","HDF")]
-    return plan_letters
+def _gi_event_type(gi_events: Tuple[Tuple[str, date], ...], received: date, lookback_days: Mapping[str, int],
+                   default_lookback: int) -> str | None:
+    """Type of the first GI event within its lookback; `_gi_applies` over parsed (type, date) pairs."""
+    for gi_type, trig in gi_events:
+        diff = days_between(trig, received)
+        if 0 <= diff <= lookback_days.get(gi_type, default_lookback):
+            return gi_type
+    return None
 
 
-def _compute_waiting_period(prior_months: int | None, gap_days: int | None, in_protected: bool) -> WaitingPeriod:
+def _compute_waiting_period(prior_months: int | None, gap_days: int | None, in_protected: bool,
+                            max_gap_days: int = GI_DEFAULT_LOOKBACK_DAYS) -> WaitingPeriod:
     if in_protected:
         return WaitingPeriod(applies=False, months=0)
     prior = prior_months or 0
     gap = gap_days or 0
-    if gap <= GI_DEFAULT_LOOKBACK_DAYS and prior >= 6:
+    if gap <= max_gap_days and prior >= 6:
         return WaitingPeriod(applies=False, months=0)
     months = max(0, 6 - prior)
     if months == 0:
@@ -82,8 +184,157 @@ def _rating_guidance(tobacco: bool | None, height: int | None, weight: int | Non
             cls, factor = 'PREFERRED', 1.0
     return RatingGuidance(**{"class": cls}, suggestedFactor=factor)
 
-@tool
-def evaluate(payload: EvaluateRequest) -> dict:
+
+class RequestRecord:
+    """
+    The request fields the rule chain reads, flattened into one slotted
+    record with dates already parsed. `evaluate_request` builds one from the
+    `EvaluateRequest`; the engine never walks the nested pydantic models.
+    """
+
+    __slots__ = ("application_id", "received", "dob", "partb", "medicare_elig", "state", "tobacco", "height",
+                 "weight", "on_ma", "plan", "prior_months", "gap_days", "gi_events", "conditions", "oxygen")
+
+    @classmethod
+    def from_request(cls, payload: EvaluateRequest) -> "RequestRecord":
+        appl, cov, health = payload.applicant, payload.coverage, payload.health
+        rec = cls()
+        rec.application_id = payload.application.applicationId
+        rec.received = payload.application.received_date
+        rec.dob = appl.birth_date
+        rec.partb = appl.part_b_date
+        rec.medicare_elig = appl.medicare_eligibility_date
+        rec.state = (appl.state or '').upper()
+        rec.tobacco = bool(appl.tobaccoUse)
+        rec.height = appl.heightInches
+        rec.weight = appl.weightPounds
+        rec.on_ma = bool(appl.currentlyOnMA)
+        rec.plan = cov.requestedPlanLetter
+        rec.prior_months = cov.priorCreditableCoverageMonths or 0
+        rec.gap_days = cov.gapSinceCreditableCoverageEndDays or 0
+        rec.gi_events = tuple((g.type, g.triggering_date) for g in payload.giEvents)
+        rec.conditions = health.conditions if health else []
+        rec.oxygen = bool(health.oxygenUse) if health else False
+        return rec
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "RequestRecord":
+        """
+        Record straight from a request dict that a trusted upstream system has
+        already validated: no pydantic models are built, only dates are
+        parsed. Missing required fields raise KeyError; nothing else is checked.
+        """
+        appl, cov = data["applicant"], data["coverage"]
+        health = data.get("health") or {}
+        elig = appl.get("medicareEligibilityDate")
+        rec = cls()
+        rec.application_id = data["application"].get("applicationId")
+        rec.received = parse_date(data["application"]["receivedDate"])
+        rec.dob = parse_date(appl["dateOfBirth"])
+        rec.partb = parse_date(appl["partBEffectiveDate"])
+        rec.medicare_elig = parse_date(elig) if elig else None
+        rec.state = (appl.get("state") or '').upper()
+        rec.tobacco = bool(appl.get("tobaccoUse"))
+        rec.height = appl.get("heightInches")
+        rec.weight = appl.get("weightPounds")
+        rec.on_ma = bool(appl.get("currentlyOnMA"))
+        rec.plan = cov["requestedPlanLetter"]
+        rec.prior_months = cov.get("priorCreditableCoverageMonths") or 0
+        rec.gap_days = cov.get("gapSinceCreditableCoverageEndDays") or 0
+        rec.gi_events = tuple((g["type"], parse_date(g["triggeringDate"])) for g in data.get("giEvents") or ())
+        rec.conditions = health.get("conditions") or []
+        rec.oxygen = bool(health.get("oxygenUse"))
+        return rec
+
+    def replace(self, **changes: Any) -> "RequestRecord":
+        rec = RequestRecord()
+        for name in RequestRecord.__slots__:
+            setattr(rec, name, changes[name] if name in changes else getattr(self, name))
+        return rec
+
+    def to_row(self) -> list:
+        """JSON-ready list in `__slots__` order, dates as epoch days; kept by the decision store."""
+        return [self.application_id, _days(self.received), _days(self.dob), _days(self.partb),
+                _days(self.medicare_elig), self.state, self.tobacco, self.height, self.weight, self.on_ma,
+                self.plan, self.prior_months, self.gap_days,
+                [[gi_type, _days(trig)] for gi_type, trig in self.gi_events], list(self.conditions), self.oxygen]
+
+    @classmethod
+    def from_row(cls, row: list) -> "RequestRecord":
+        rec = cls()
+        for name, value in zip(cls.__slots__, row):
+            setattr(rec, name, value)
+        rec.received, rec.dob, rec.partb, rec.medicare_elig = (
+            _from_days(rec.received), _from_days(rec.dob), _from_days(rec.partb), _from_days(rec.medicare_elig))
+        rec.gi_events = tuple((gi_type, _from_days(trig)) for gi_type, trig in rec.gi_events)
+        return rec
+
+
+def _days(d: date | None) -> int | None:
+    return None if d is None else d.toordinal() - EPOCH_ORDINAL
+
+
+def _from_days(days: int | None) -> date | None:
+    return None if days is None else date.fromordinal(days + EPOCH_ORDINAL)
+
+
+def decision_dependencies(state: str, gi_types: Sequence[str], conditions: Iterable[str] | None,
+                          audit: List[dict]) -> List[str]:
+    """
+    Keys of the rule-config entries a decision read, for `uw_reevaluate`:
+    ``state:XX`` (continuous GI and state rules), ``gi:TYPE`` per GI event
+    type (lookback and permitted plans), ``lookback:default`` when GI events
+    or R-500 used the default lookback, and ``condition:ITEM`` per disclosed
+    condition when R-410 consulted the decline table. Decision-table edits
+    affect every decision and are not keyed.
+    """
+    keys = ["state:" + state]
+    r410 = r500 = False
+    for entry in audit:
+        rule_id = entry["ruleId"]
+        r410 = r410 or rule_id == "R-410"
+        r500 = r500 or rule_id == "R-500"
+    if gi_types:
+        keys.extend(["gi:" + gi_type for gi_type in sorted(set(gi_types))])
+    if gi_types or r500:
+        keys.append("lookback:default")
+    if r410 and conditions:
+        keys.extend(["condition:" + item for item in sorted({c.upper() for c in conditions})])
+    return keys
+
+
+def _new_decision_id(suffix: str = "") -> str:
+    # The sequence keeps ids unique when several decisions land in the same millisecond
+    return f"DEC-{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')[:-3]}-{next(_DECISION_SEQ) % 1_000_000:06d}{suffix}"
+
+
+def _utc_timestamp() -> str:
+    return datetime.utcnow().isoformat() + 'Z'
+
+
+def _assemble_response(decision_id: str, decision: dict, audit: List[dict], config_version: str,
+                       evaluated_at: str | None = None) -> dict:
+    return {
+        "decisionId": decision_id,
+        **decision,
+        "audit": {
+            "evaluatedAt": evaluated_at or _utc_timestamp(),
+            "configVersion": config_version,
+            "matchedRules": audit
+        }
+    }
+
+
+def llm_summary(response: dict) -> dict:
+    """LLM-facing view of an evaluate response: the decision plus only the audit entries that FIRED."""
+    summary = {k: v for k, v in response.items() if k != "audit"}
+    summary["firedRules"] = [{"ruleId": r["ruleId"], "details": r["details"]}
+                             for r in response["audit"]["matchedRules"] if r["outcome"] == "FIRED"]
+    return summary
+
+
+@tool(response_format="content_and_artifact")
+def evaluate(payload: EvaluateRequest) -> Tuple[str, dict]:
     """
         Evaluate a Medicare application and return an underwriting decision.
 
@@ -95,101 +346,181 @@ def evaluate(payload: EvaluateRequest) -> dict:
         Returns
         -------
         response: EvaluateResponse
-            The underwriting decision including decisionId, status, Reasons supporting the decision, Plan eligibility restrictions, any Waiting period, rating Guidance, rule audit trail and
+            The underwriting decision including decisionId, status, Reasons supporting the decision, Plan eligibility restrictions, any Waiting period, rating Guidance, the rules that fired and
             whether manual underwriting is required.
         """
+    # The model reads the compact summary; the full response (with the audit
+    # trail) rides along as the ToolMessage artifact for run_graph and the UI
+    response = evaluate_request(payload)
+    return orjson.dumps(llm_summary(response)).decode(), response
 
-    app = payload.application
-    appl = payload.applicant
-    cov = payload.coverage
-
-    asof = _parse_date(app.receivedDate)
-    dob = _parse_date(appl.dateOfBirth)
-    partb = _parse_date(appl.partBEffectiveDate)
-    medicare_elig = _parse_date(appl.medicareEligibilityDate) if appl.medicareEligibilityDate else None
-
-    state = (appl.state or '').upper()
-    audit = []
-    decision = None
-
-    # R-600: State overrides first
-    state_rule = STATE_OVERRIDES.get(state)
-    if state_rule and state_rule.get('continuousGi'):
-        allowed = _apply_macra_filter(ALL_PLANS, medicare_elig)
-        decision = {
-            "status": "ACCEPT_NO_UW",
-            "underwritingRequired": False,
-            "reasons": [{"code": "R-600", "message": f"State {state} continuous GI protections - no underwriting."}],
-            "planRestrictions": {"allowedPlanLetters": allowed, "disallowedPlanLetters": []},
-            "waitingPeriod": {"applies": False, "months": 0}
-        }
-        audit.append({"ruleId": "R-600", "outcome": "FIRED", "details": f"Continuous GI for {state}"})
+
+@tool(response_format="content_and_artifact")
+def evaluate_scenarios(payload: EvaluateRequest, grid: ScenarioGrid) -> Tuple[str, dict]:
+    """
+        Compare underwriting outcomes for one Medicare application across alternative requested plan
+        letters, received dates and GI event lists, e.g. "what if they apply for G instead of F" or
+        "what if the application is received a month later". Use this instead of repeated evaluate calls.
+
+        Parameters
+        ----------
+        payload : EvaluateRequest
+            The base application.
+        grid : ScenarioGrid
+            Values to vary; every combination is evaluated.
+
+        Returns
+        -------
+        matrix: dict
+            One row per combination with status, reason codes, allowed plans, waiting period and rating class.
+        """
+    matrix = evaluate_scenarios_request(payload, grid)
+    return orjson.dumps(matrix).decode(), matrix
+
+
+def evaluate_request(payload: EvaluateRequest | RequestRecord) -> dict:
+    """
+    Plain-function form of the `evaluate` tool for non-LLM callers. Takes a
+    validated request or, for trusted upstream data, a `RequestRecord`
+    built with `RequestRecord.from_dict`.
+    """
+    cfg = get_rule_config()
+    rec = payload if isinstance(payload, RequestRecord) else RequestRecord.from_request(payload)
+    cache = _EVAL_CACHE
+    key = _request_cache_key(rec, cfg.version) if cache is not None else None
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        # The entry holds serialized bytes, so every hit builds its own decision and audit
+        source_id, body = cached
+        decision, audit = orjson.loads(body)
+        decision_id = _new_decision_id()
+        response = _assemble_response(decision_id, decision, audit, cfg.version)
+        response["audit"]["cachedFrom"] = source_id
+        EVALUATIONS.inc(cache="hit")
     else:
-        audit.append({"ruleId": "R-600", "outcome": "SKIPPED", "details": f"No continuous GI for {state}"})
-        # R-100: Open Enrollment
-        if _is_open_enrollment(dob, partb, asof):
-            allowed = _apply_macra_filter(ALL_PLANS, medicare_elig)
-            decision = {
-                "status": "ACCEPT_NO_UW",
-                "underwritingRequired": False,
-                "reasons": [{"code": "R-100", "message": "Within 6-month Medigap Open Enrollment; underwriting not permitted."}],
-                "planRestrictions": {"allowedPlanLetters": allowed, "disallowedPlanLetters": []},
-                "waitingPeriod": {"applies": False, "months": 0}
-            }
-            audit.append({"ruleId": "R-100", "outcome": "FIRED", "details": "Age>=65 and within OE window."})
-        else:
-            audit.append({"ruleId": "R-100", "outcome": "SKIPPED", "details": "Outside OE window."})
-            # R-200: GI
-            gi_applies, gi_event = _gi_applies([g.model_dump() for g in payload.giEvents], asof)
-            if gi_applies:
-                allowed = sorted(GI_BASE_PLANS.union(OPTIONAL_GI_PLANS))
-                allowed = _apply_macra_filter(allowed, medicare_elig)
-                decision = {
-                    "status": "ACCEPT_NO_UW",
-                    "underwritingRequired": False,
-                    "reasons": [{"code": "R-200", "message": f"Guaranteed Issue applies: {gi_event.get('type')} within lookback."}],
-                    "planRestrictions": {"allowedPlanLetters": allowed, "disallowedPlanLetters": list(set(ALL_PLANS) - set(allowed)), "notes": ["Plan N availability may vary by carrier."]},
-                    "waitingPeriod": {"applies": False, "months": 0}
-                }
-                audit.append({"ruleId": "R-200", "outcome": "FIRED", "details": "GI within lookback."})
-                if medicare_elig and medicare_elig >= MACRA_CUTOFF:
-                    audit.append({"ruleId": "R-210", "outcome": "FIRED", "details": "MACRA removed C/F for newly eligible."})
-            else:
-                audit.append({"ruleId": "R-200", "outcome": "SKIPPED", "details": "No GI event in lookback."})
-                # R-300: Medigap cannot be combined with MA
-                if appl.currentlyOnMA:
-                    decision = {
-                        "status": "PENDED",
-                        "underwritingRequired": True,
-                        "reasons": [{"code": "R-300", "message": "Currently on Medicare Advantage; require disenrollment or GI path."}],
-                        "planRestrictions": {"allowedPlanLetters": [], "disallowedPlanLetters": []},
-                        "waitingPeriod": {"applies": False, "months": 0},
-                        "requestsForInformation": ["Proof of MA disenrollment effective date"]
-                    }
-                    audit.append({"ruleId": "R-300", "outcome": "FIRED", "details": "MA present without GI."})
-                else:
-                    audit.append({"ruleId": "R-300", "outcome": "SKIPPED", "details": "Not on MA."})
-                    # R-400: Medical underwriting required
-                    decision = {
-                        "status": "ACCEPT_WITH_UW",
-                        "underwritingRequired": True,
-                        "reasons": [{"code": "R-400", "message": "Outside OE/GI; medical underwriting required."}],
-                        "planRestrictions": {"allowedPlanLetters": ALL_PLANS, "disallowedPlanLetters": []},
-                        "waitingPeriod": {"applies": False, "months": 0}
-                    }
-                    audit.append({"ruleId": "R-400", "outcome": "FIRED", "details": "Proceed to UW checks."})
+        timer = RuleTimer()
+        decision, audit = _decide(rec, cfg, timer)
+        timer.record()
+        decision_id = _new_decision_id()
+        response = _assemble_response(decision_id, decision, audit, cfg.version)
+        if debug_audit():
+            response["audit"]["ruleTimingsMs"] = timer.as_ms()
+        if cache is not None:
+            cache.put(key, (decision_id, orjson.dumps((decision, audit))))
+        EVALUATIONS.inc(cache="miss" if cache is not None else "off")
+
+    deps = decision_dependencies(rec.state, [gi_type for gi_type, _ in rec.gi_events], rec.conditions, audit)
+    get_decision_store().put(decision_id, response, (rec.to_row(), deps))
+    return response
+
+
+def _undecided() -> dict:
+    """R-900 fallback when no decision-table rule matched."""
+    return {
+        "status": "PENDED",
+        "underwritingRequired": True,
+        "reasons": [{"code": "R-900", "message": "Insufficient data"}],
+        "planRestrictions": {"allowedPlanLetters": [], "disallowedPlanLetters": []},
+        "waitingPeriod": {"applies": False, "months": 0}
+    }
+
+
+class _RequestFacts:
+    """Decision-table facts for one request; OE and GI are only computed if a rule asks for them."""
+
+    __slots__ = ("state", "macra", "_rec", "_cfg", "_gi_type")
+
+    def __init__(self, rec: RequestRecord, cfg: RuleConfig, macra: bool):
+        self.state = rec.state
+        self.macra = macra
+        self._rec = rec
+        self._cfg = cfg
+        self._gi_type = _UNSET
+
+    @property
+    def continuous_gi_state(self) -> bool:
+        return self.state in self._cfg.continuous_gi_states
+
+    @property
+    def open_enrollment(self) -> bool:
+        rec = self._rec
+        return in_open_enrollment(rec.dob, rec.partb, rec.received)
+
+    @property
+    def gi_type(self) -> str | None:
+        if self._gi_type is _UNSET:
+            self._gi_type = _gi_event_type(self._rec.gi_events, self._rec.received, self._cfg.gi_lookback_days,
+                                           self._cfg.default_lookback_days)
+        return self._gi_type
+
+    @property
+    def currently_on_ma(self) -> bool:
+        return self._rec.on_ma
+
+
+_UNSET = object()
+
+
+class _ApplicantFacts:
+    """
+    Rule inputs that do not depend on the requested plan, the received date
+    or the GI events: MACRA eligibility, decline-condition hits, rating
+    guidance and waiting period (by underwriting path). Computed on first
+    use and shared by every variant in evaluate_scenarios_request.
+    """
+
+    __slots__ = ("macra", "_rec", "_cfg", "_declines", "_rating", "_waiting")
+
+    def __init__(self, rec: RequestRecord, cfg: RuleConfig):
+        self.macra = bool(rec.medicare_elig and rec.medicare_elig >= MACRA_CUTOFF)
+        self._rec = rec
+        self._cfg = cfg
+        self._declines = _UNSET
+        self._rating: Dict[bool, dict] = {}
+        self._waiting: Dict[bool, dict] = {}
+
+    def decline_hits(self) -> List[str]:
+        if self._declines is _UNSET:
+            self._declines = self._cfg.decline_matcher.match(self._rec.conditions, self._rec.oxygen)
+        return self._declines
+
+    def rating(self, uw_required: bool) -> dict:
+        rg = self._rating.get(uw_required)
+        if rg is None:
+            rec = self._rec
+            rg = self._rating[uw_required] = _rating_guidance(rec.tobacco, rec.height, rec.weight,
+                                                              uw_required).model_dump(by_alias=True)
+        return dict(rg)
+
+    def waiting_period(self, in_protected: bool) -> dict:
+        wp = self._waiting.get(in_protected)
+        if wp is None:
+            rec = self._rec
+            wp = self._waiting[in_protected] = _compute_waiting_period(
+                rec.prior_months, rec.gap_days, in_protected, self._cfg.default_lookback_days).model_dump()
+        return dict(wp)
+
+
+def _decide(rec: RequestRecord, cfg: RuleConfig, timer: RuleTimer | None = None,
+            applicant: _ApplicantFacts | None = None) -> Tuple[dict, List[dict]]:
+    """
+    Run the rule chain; returns the decision body and its matched-rules audit.
+    `timer` gets a lap per rule block; `applicant` carries facts already
+    computed for another variant of the same application.
+    """
+    timer = timer or RuleTimer()
+    applicant = applicant or _ApplicantFacts(rec, cfg)
+    macra = applicant.macra
+    timer.lap("parse")
+
+    # R-600 -> R-100 -> R-200 -> R-300 -> R-400: compiled decision table (uw_decision_table)
+    decision, audit = cfg.decision_table.decide(_RequestFacts(rec, cfg, macra), timer)
 
     if not decision:
-        decision = {
-            "status": "PENDED",
-            "underwritingRequired": True,
-            "reasons": [{"code": "R-900", "message": "Insufficient data"}],
-            "planRestrictions": {"allowedPlanLetters": [], "disallowedPlanLetters": []},
-            "waitingPeriod": {"applies": False, "months": 0}
-        }
+        decision = _undecided()
 
     # R-700: MACRA check for requested plan (C/F/HDF)
-    if payload.coverage.requestedPlanLetter in ("C","F","HDF") and (medicare_elig and medicare_elig >= MACRA_CUTOFF):
+    if rec.plan in MACRA_PLANS and macra:
         audit.append({"ruleId": "R-700", "outcome": "FIRED", "details": "Requested C/F not allowed for newly eligible."})
         if decision["status"] in ("ACCEPT_NO_UW","ACCEPT_WITH_UW"):
             decision["status"] = "PENDED"
@@ -197,53 +528,96 @@ def evaluate(payload: EvaluateRequest) -> dict:
             decision["reasons"].append({"code": "R-700", "message": "Requested plan not available for newly eligible (MACRA). Suggest G/HDG."})
     else:
         audit.append({"ruleId": "R-700", "outcome": "SKIPPED", "details": "MACRA not applicable to requested plan."})
+    timer.lap("R-700")
 
     # R-410: common automatic declines if UW path
-    health = payload.health or {}
-    conds = set([c.upper() for c in (health.conditions if hasattr(health, 'conditions') else [])])
-    oxygen = bool(getattr(health, 'oxygenUse', False))
     if decision["underwritingRequired"] and decision["status"] != "PENDED":
-        decline_hits = []
-        for code, item in DECLINE_CONDITIONS.items():
-            labels = [item.get('label','').upper(), item.get('description','').upper()]
-            if any(lbl and any(lbl in c for c in conds) for lbl in labels):
-                decline_hits.append(code)
-        if ("CHF" in conds and oxygen) or ("ESRD" in conds) or ("ALZHEIMER" in conds) or ("DEMENTIA" in conds):
-            decline_hits.append("AUTO")
+        decline_hits = applicant.decline_hits()
         if decline_hits:
             decision["status"] = "DECLINE"
             decision["reasons"].insert(0, {"code": "R-410", "message": "Automatic decline based on health conditions."})
             audit.append({"ruleId": "R-410", "outcome": "FIRED", "details": f"Decline hits: {decline_hits}"})
         else:
             audit.append({"ruleId": "R-410", "outcome": "SKIPPED", "details": "No automatic decline condition matched."})
+        timer.lap("R-410")
 
     # R-500: pre-existing waiting period
     in_protected = decision["status"] == "ACCEPT_NO_UW"
     if decision["status"] in ("ACCEPT_NO_UW","ACCEPT_WITH_UW"):
-        wp = _compute_waiting_period(cov.priorCreditableCoverageMonths, cov.gapSinceCreditableCoverageEndDays, in_protected)
-        decision["waitingPeriod"] = wp.model_dump()
-        audit.append({"ruleId": "R-500", "outcome": "FIRED" if wp.applies else "SKIPPED", "details": f"Waiting period months={wp.months}"})
+        wp = applicant.waiting_period(in_protected)
+        decision["waitingPeriod"] = wp
+        audit.append({"ruleId": "R-500", "outcome": "FIRED" if wp["applies"] else "SKIPPED", "details": f"Waiting period months={wp['months']}"})
+        timer.lap("R-500")
 
     # Rating guidance
-    rg = _rating_guidance(appl.tobaccoUse, appl.heightInches, appl.weightPounds, decision["underwritingRequired"])
-    decision["ratingGuidance"] = rg.model_dump(by_alias=True)
+    decision["ratingGuidance"] = applicant.rating(decision["underwritingRequired"])
+    timer.lap("rating")
 
-    # Assemble response
-    decision_id = f"DEC-{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')[:-3]}"
-    response = {
-        "decisionId": decision_id,
-        **decision,
-        "audit": {
-            "evaluatedAt": datetime.utcnow().isoformat() + 'Z',
-            "matchedRules": audit
-        }
-    }
+    return decision, audit
 
-    _DECISIONS[decision_id] = response
-    return response
+
+class _NoTimer:
+    """RuleTimer stand-in for variants whose timings are never recorded."""
+
+    __slots__ = ()
+
+    def lap(self, rule: str) -> None:
+        pass
+
+
+_NO_TIMER = _NoTimer()
+
+
+def evaluate_scenarios_request(payload: EvaluateRequest | RequestRecord, grid: ScenarioGrid | None = None) -> dict:
+    """
+    What-if matrix for one application: the decision for every combination
+    of the grid's plan letters, received dates and GI event sets (an empty
+    axis keeps the application's own value). Applicant facts are computed
+    once; each variant re-runs only the decision table, R-700 and the
+    status-dependent R-500/R-410 lookups. Variants are neither stored nor
+    cached and carry no decision ids.
+    """
+    cfg = get_rule_config()
+    rec = payload if isinstance(payload, RequestRecord) else RequestRecord.from_request(payload)
+    grid = grid or ScenarioGrid()
+    plans = grid.requestedPlanLetters or [rec.plan]
+    dates = [parse_date(d) for d in grid.receivedDates] or [rec.received]
+    gi_sets = [tuple((g.type, g.triggering_date) for g in events) for events in grid.giEventSets] or [rec.gi_events]
+    count = len(plans) * len(dates) * len(gi_sets)
+    if count > MAX_SCENARIOS:
+        raise ValueError(f"{count} scenarios requested; at most {MAX_SCENARIOS} per call")
+
+    applicant = _ApplicantFacts(rec, cfg)
+    rows = []
+    for received in dates:
+        received_iso = received.isoformat()
+        for gi_index, gi_events in enumerate(gi_sets):
+            for plan in plans:
+                decision, _ = _decide(rec.replace(received=received, gi_events=gi_events, plan=plan), cfg,
+                                      _NO_TIMER, applicant)
+                rows.append({
+                    "requestedPlanLetter": plan,
+                    "receivedDate": received_iso,
+                    "giEventSet": gi_index,
+                    "status": decision["status"],
+                    "underwritingRequired": decision["underwritingRequired"],
+                    "reasons": [r["code"] for r in decision["reasons"]],
+                    "allowedPlanLetters": decision["planRestrictions"]["allowedPlanLetters"],
+                    "waitingPeriodMonths": decision["waitingPeriod"]["months"],
+                    "ratingClass": decision["ratingGuidance"]["class"],
+                })
+    return {
+        "configVersion": cfg.version,
+        "axes": {
+            "requestedPlanLetter": plans,
+            "receivedDate": [d.isoformat() for d in dates],
+            "giEventSets": [[{"type": t, "triggeringDate": d.isoformat()} for t, d in events] for events in gi_sets],
+        },
+        "scenarios": rows,
+    }
 
 
 def get_decision(decision_id: str) -> dict | None:
-    return _DECISIONS.get(decision_id)
+    return get_decision_store().get(decision_id)
 
-uw_tools =[evaluate]
\ No newline at end of file
+uw_tools =[evaluate, evaluate_scenarios]
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""HTTP service in front of the rules engine and the agent graph.
+
+    python uw_cli.py serve --workers 4 [--host 0.0.0.0] [--port 8000]
+    uvicorn uw_service:app --workers 4 --timeout-graceful-shutdown 30
+
+    POST /evaluate         EvaluateRequest -> evaluate response (rules engine only, no LLM)
+    POST /evaluate/batch   [EvaluateRequest, ...] -> [response, ...] (uw_batch, one columnar pass)
+    POST /evaluate/scenarios  {"request", "grid": ScenarioGrid} -> what-if matrix
+    POST /chat             {"query", "threadId"?, "stream"?} -> run_graph result; with
+                           "stream": true, the stream_graph events as server-sent events
+    GET  /health           rule-config version and LLM cache stats
+    GET  /metrics          Prometheus text for this worker
+
+Every worker process loads the rule config (UW_RULES_SNAPSHOT, hot-reloaded
+as in the Streamlit app), compiles the graph and opens its checkpoint
+connection in the lifespan hook, before it accepts traffic. Chat turns run on
+the worker's event loop through `arun_graph`/`astream_graph`, so LLM calls
+share the pooled keep-alive clients from `uw_chains.get_http_clients` and the
+UW_GRAPH_CONCURRENCY / UW_GRAPH_QUEUE limiter; a full queue answers 503. On
+shutdown uvicorn stops accepting connections and drains in-flight requests,
+then the lifespan hook closes the checkpoint connection and the LLM clients
+and flushes the decision store.
+"""
+from __future__ import annotations
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Optional
+
+import orjson
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+
+from uw_models import REQUEST_ADAPTER, REQUEST_LIST_ADAPTER, EvaluateRequest, ScenarioGrid
+
+MAX_BATCH = int(os.environ.get("UW_SERVICE_MAX_BATCH", 10_000))
+
+os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
+os.environ.setdefault("LANGCHAIN_PROJECT", "uw-agent")
+
+
+class ChatRequest(BaseModel):
+    query: str = Field(..., description="The agent's question or application description")
+    threadId: Optional[str] = Field(None, description="Continue this checkpointed session")
+    stream: bool = Field(False, description="Stream stream_graph events as server-sent events")
+
+
+class ScenarioRequest(BaseModel):
+    request: EvaluateRequest = Field(..., description="The base application")
+    grid: ScenarioGrid = Field(default_factory=ScenarioGrid, description="Values to vary")
+
+
+def _json(body: Any, status_code: int = 200) -> Response:
+    return Response(orjson.dumps(body), status_code=status_code, media_type="application/json")
+
+
+def _sse(event: dict) -> bytes:
+    return b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+
+
+def _load_rules() -> None:
+    from uw_config import load_rule_config
+    from uw_rules_engine import install_rule_config, watch_rule_config
+    snapshot = os.environ.get("UW_RULES_SNAPSHOT")
+    install_rule_config(load_rule_config(snapshot=snapshot))
+    watch_rule_config(snapshot=snapshot, interval=float(os.environ.get("UW_RULES_POLL_SECONDS", "2")))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    from uw_chains import get_http_clients
+    from uw_graph_flow import aclose_session_graph, aget_session_graph, get_graph
+    from uw_rules_engine import get_decision_store
+
+    _load_rules()
+    get_graph()
+    await aget_session_graph()
+    get_http_clients()  # the chat model itself is built on the first /chat, so /evaluate needs no LLM settings
+    yield
+    await aclose_session_graph()
+    http_client, http_async_client = get_http_clients()
+    await http_async_client.aclose()
+    http_client.close()
+    get_decision_store().flush()
+
+
+app = FastAPI(title="uw-agent", lifespan=lifespan)
+
+
+async def _parse(request: Request, adapter) -> Any:
+    # One pydantic-core pass over the raw body (FastAPI body params would json.loads first);
+    # errors leave out the input, which carries health data
+    try:
+        return adapter.validate_json(await request.body())
+    except ValidationError as ex:
+        raise RequestValidationError(ex.errors(include_url=False, include_input=False)) from None
+
+
+_REF = "#/components/schemas/{model}"
+
+
+_REQUEST_REF = {"$ref": _REF.format(model="EvaluateRequest")}
+
+
+def _request_body(schema: dict) -> dict:
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": schema}}}}
+
+
+def _openapi() -> dict:
+    # The evaluate routes parse their own bodies, so their models are registered by hand
+    if app.openapi_schema is None:
+        from fastapi.openapi.utils import get_openapi
+        schema = get_openapi(title=app.title, version=app.version, routes=app.routes)
+        defs = REQUEST_ADAPTER.json_schema(ref_template=_REF)
+        components = schema.setdefault("components", {}).setdefault("schemas", {})
+        components.update(defs.pop("$defs", {}))
+        components["EvaluateRequest"] = defs
+        app.openapi_schema = schema
+    return app.openapi_schema
+
+
+app.openapi = _openapi
+
+
+@app.post("/evaluate", summary="Evaluate one application", openapi_extra=_request_body(_REQUEST_REF))
+async def evaluate(request: Request) -> Response:
+    from uw_rules_engine import evaluate_request
+    # Microseconds of CPU and a non-blocking decision-store put: cheaper inline than on the thread pool
+    return _json(evaluate_request(await _parse(request, REQUEST_ADAPTER)))
+
+
+@app.post("/evaluate/batch", summary="Evaluate a list of applications",
+          openapi_extra=_request_body({"type": "array", "items": _REQUEST_REF}))
+async def evaluate_batch(request: Request) -> Response:
+    from starlette.concurrency import run_in_threadpool
+    from uw_batch import evaluate_batch as run_batch
+    requests: List[EvaluateRequest] = await _parse(request, REQUEST_LIST_ADAPTER)
+    if len(requests) > MAX_BATCH:
+        raise HTTPException(413, f"at most {MAX_BATCH} requests per batch")
+    responses = await run_in_threadpool(run_batch, requests)
+    return _json([{"applicationId": r.application.applicationId, **response}
+                  for r, response in zip(requests, responses)])
+
+
+@app.post("/evaluate/scenarios", summary="What-if matrix for one application")
+async def evaluate_scenarios(body: ScenarioRequest) -> Response:
+    from uw_rules_engine import evaluate_scenarios_request
+    try:
+        return _json(evaluate_scenarios_request(body.request, body.grid))
+    except ValueError as ex:  # grid over MAX_SCENARIOS
+        raise HTTPException(413, str(ex)) from None
+
+
+@app.post("/chat")
+async def chat(body: ChatRequest) -> Response:
+    from uw_graph_flow import GraphBusyError, arun_graph, astream_graph
+    if body.stream:
+        async def events() -> AsyncIterator[bytes]:
+            try:
+                async for event in astream_graph(body.query, body.threadId):
+                    yield _sse(event)
+            except GraphBusyError as ex:
+                yield _sse({"type": "error", "status": 503, "detail": str(ex)})
+            except Exception as ex:  # headers are already sent; report in-band
+                yield _sse({"type": "error", "status": 500, "detail": f"{type(ex).__name__}: {ex}"})
+
+        return StreamingResponse(events(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    try:
+        return _json(await arun_graph(body.query, body.threadId))
+    except GraphBusyError as ex:
+        raise HTTPException(503, str(ex), headers={"Retry-After": "1"}) from None
+
+
+@app.get("/health")
+async def health() -> Response:
+    from uw_chains import get_llm_cache
+    from uw_rules_engine import get_rule_config
+    rules = get_rule_config()
+    cache = get_llm_cache()
+    return _json({"status": "ok", "pid": os.getpid(), "rulesVersion": rules.version, "rulesSource": str(rules.source),
+                  "rulesLoadSeconds": rules.load_seconds, "llmCache": cache.stats() if cache is not None else None})
+
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    from uw_metrics import render_prometheus
+    return Response(render_prometheus(), media_type="text/plain; version=0.0.4")